@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for deploy.py
+
+Runs the BuildFinder and Deployer hot paths against scripted stand-ins for
+`gh`, `adb`, `ideviceinstaller`, `idevice_id` and `ios-deploy` put on PATH,
+plus a local stand-in for api.github.com, so no devices or GitHub access are
+needed.
+Latency, transfer rate, artifact size, run count and device count are
+configurable.
+
+Scenarios:
+    discovery       find_github_builds, cold (no cache) and warm (cached),
+                    through gh subprocesses and the built-in HTTP client;
+                    also checks that a depth ending mid-page lists each run once
+    download        artifact fetch + APK lookup, cold and from the store
+    fanout          install one APK on N devices, sequential vs parallel
+    fallback        fan-out where every device reports a signature mismatch
+    ios             IPA fan-out over N devices through ideviceinstaller
+    fast            local APK upgrade, full install vs --fast (incremental)
+    startup         --bench-startup: cold starts on N devices (am start -W)
+
+Progress goes to stderr, results to stdout (or --output) as JSON.
+
+Usage:
+    ./scripts/bench_deploy.py                               # All scenarios
+    ./scripts/bench_deploy.py --scenario discovery fanout   # Some scenarios
+    ./scripts/bench_deploy.py --latency 0.3 --devices 12    # Slower, bigger rack
+    ./scripts/bench_deploy.py --output bench.json           # Write JSON to a file
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import plistlib
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Launches per device in the startup scenario
+STARTUP_LAUNCHES = 3
+
+SCENARIOS = ["discovery", "download", "fanout", "fallback", "ios", "fast", "startup"]
+
+# Stand-in for the GitHub CLI. Serves the workflow runs listing (with
+# page/per_page), per-run artifact listings and the artifact ZIP download,
+# honouring If-None-Match with a 304 like `gh api -i` does.
+FAKE_GH = '''#!/usr/bin/env python3
+import json, os, sys, time, zlib
+from urllib.parse import parse_qs, urlsplit
+
+time.sleep(float(os.environ.get("FAKE_LATENCY", "0.1")))
+args = sys.argv[1:]
+
+
+def respond(body):
+    etag = '"%x"' % zlib.crc32(body.encode())
+    if "If-None-Match: " + etag in args:
+        sys.stdout.write("HTTP/2.0 304 Not Modified\\r\\nEtag: %s\\r\\n\\r\\n" % etag)
+        sys.exit(1)
+    sys.stdout.write("HTTP/2.0 200 OK\\r\\nEtag: %s\\r\\n\\r\\n%s" % (etag, body))
+
+
+path = next((a for a in args[1:] if a.startswith("repos/")), "") if args[:1] == ["api"] else ""
+url = urlsplit(path)
+query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+if "/workflows/" in url.path:
+    count = int(os.environ.get("FAKE_GH_RUNS", "10"))
+    per_page = int(query.get("per_page", 30))
+    page = int(query.get("page", 1))
+    runs = [{
+        "id": 1000 + i,
+        "run_number": count - i,
+        "status": "completed",
+        "conclusion": "success",
+        "event": "push",
+        "head_branch": "main",
+        "head_sha": "%040x" % i,
+        "display_title": "Commit %d" % i,
+        "created_at": "2025-01-01T00:00:00Z",
+    } for i in range(count)]
+    respond(json.dumps({
+        "total_count": count,
+        "workflow_runs": runs[(page - 1) * per_page:page * per_page],
+    }))
+elif url.path.endswith("/artifacts"):
+    artifact = os.environ["FAKE_GH_ARTIFACT"]
+    respond(json.dumps({"artifacts": [{
+        "id": 7000,
+        "name": "android-debug-apk",
+        "size_in_bytes": os.path.getsize(artifact),
+        "digest": os.environ.get("FAKE_GH_DIGEST"),
+    }]}))
+elif url.path.endswith("/zip"):
+    artifact = os.environ["FAKE_GH_ARTIFACT"]
+    rate = float(os.environ.get("FAKE_RATE", "0"))
+    if rate:
+        time.sleep(os.path.getsize(artifact) / rate)
+    with open(artifact, "rb") as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            sys.stdout.buffer.write(chunk)
+else:
+    sys.exit(1)
+'''
+
+# Stand-in for adb. FAKE_ADB_DEVICES devices are attached (read from the file
+# FAKE_ADB_DEVICES_FILE instead if set, so devices can come and go, which
+# `track-devices` reports); installs take latency + size / FAKE_RATE. Serials
+# listed in FAKE_ADB_MISMATCH ("all" for every device) reject upgrades with a
+# signature error until uninstalled.
+FAKE_ADB = '''#!/usr/bin/env python3
+import os, random, sys, time
+
+args = sys.argv[1:]
+serial = None
+if args[:1] == ["-s"]:
+    serial, args = args[1], args[2:]
+
+state_dir = os.environ["FAKE_STATE_DIR"]
+mismatch = os.environ.get("FAKE_ADB_MISMATCH", "")
+uninstalled = os.path.join(state_dir, "uninstalled-%s" % serial)
+rejects_upgrade = (mismatch == "all" or serial in mismatch.split(",")) and not os.path.exists(uninstalled)
+
+
+def transfer(size):
+    rate = float(os.environ.get("FAKE_RATE", "0"))
+    time.sleep(float(os.environ.get("FAKE_LATENCY", "0.1")) + (size / rate if rate else 0))
+
+
+def device_list():
+    count_file = os.environ.get("FAKE_ADB_DEVICES_FILE")
+    try:
+        count = int(open(count_file).read()) if count_file else int(os.environ.get("FAKE_ADB_DEVICES", "1"))
+    except (OSError, ValueError):
+        count = 0
+    return "".join("emulator-%d\\tdevice product:sdk model:Pixel_%d transport_id:%d\\n" % (5554 + 2 * i, i, i + 1)
+                   for i in range(count))
+
+
+if args == ["devices"]:
+    print("List of devices attached")
+    for line in device_list().splitlines():
+        print(line.split()[0] + "\\tdevice")
+elif args[:1] == ["track-devices"]:
+    last = None
+    while True:
+        current = device_list()
+        if current != last:
+            sys.stdout.write("%04x%s" % (len(current.encode()), current))
+            sys.stdout.flush()
+            last = current
+        time.sleep(0.2)
+elif args[:1] == ["install"]:
+    # Incremental and delta installs only move a fraction of the APK up front
+    fast = "--incremental" in args or "--fastdeploy" in args
+    transfer(os.path.getsize(args[-1]) // (10 if fast else 1))
+    if "-r" in args and rejects_upgrade:
+        sys.stderr.write("Failure [INSTALL_FAILED_UPDATE_INCOMPATIBLE: signatures do not match]\\n")
+        sys.exit(1)
+    print("Success")
+elif args[:1] == ["exec-in"]:
+    size = len(sys.stdin.buffer.read())
+    transfer(size)
+    if "-r" in args and rejects_upgrade:
+        print("Failure [INSTALL_FAILED_UPDATE_INCOMPATIBLE: signatures do not match]")
+    else:
+        print("Success")
+elif args[:1] == ["uninstall"]:
+    open(uninstalled, "w").close()
+    print("Success")
+elif args[:3] == ["shell", "dumpsys", "package"]:
+    print("Unable to find package: %s" % args[3])
+elif args[:4] == ["shell", "am", "start", "-W"]:
+    total = random.randint(400, 600)
+    time.sleep(total / 1000.0)
+    print("Starting: Intent { cmp=%s }" % args[-1])
+    print("Status: ok\\nLaunchState: COLD\\nActivity: %s\\nTotalTime: %d\\nWaitTime: %d\\nComplete"
+          % (args[-1], total, total + 12))
+elif args[:2] == ["shell", "getprop"]:
+    prop = args[2] if len(args) > 2 else ""
+    print({"ro.product.cpu.abilist": "arm64-v8a,armeabi-v7a,armeabi",
+           "ro.product.cpu.abi": "arm64-v8a"}.get(prop, "34"))
+else:
+    print("")
+'''
+
+FAKE_IDEVICEINSTALLER = '''#!/usr/bin/env python3
+import os, plistlib, sys, time
+
+args = sys.argv[1:]
+time.sleep(float(os.environ.get("FAKE_LATENCY", "0.1")))
+if "-o" in args and "xml" in args:
+    sys.stdout.buffer.write(plistlib.dumps([]))
+elif "-i" in args:
+    rate = float(os.environ.get("FAKE_RATE", "0"))
+    if rate:
+        time.sleep(os.path.getsize(args[args.index("-i") + 1]) / rate)
+    print("Install: Complete")
+'''
+
+FAKE_IOS_DEPLOY = '''#!/usr/bin/env python3
+import os, sys, time
+
+time.sleep(float(os.environ.get("FAKE_LATENCY", "0.1")))
+if "--detect" in sys.argv:
+    print("[....] Found 00008030-0000000000000000 (iPhone)")
+'''
+
+FAKE_IDEVICE_ID = '''#!/usr/bin/env python3
+import os, time
+
+time.sleep(float(os.environ.get("FAKE_LATENCY", "0.1")))
+for i in range(int(os.environ.get("FAKE_ADB_DEVICES", "1"))):
+    print("00008030-%016X" % i)
+'''
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Stand-in for api.github.com serving the same data as FAKE_GH
+
+    The artifact ZIP endpoint redirects to another host name, like the real
+    API redirects to blob storage.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, etag: str = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def respond_json(self, data):
+        body = json.dumps(data).encode()
+        etag = '"%x"' % zlib.crc32(body)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_body(304, b"", etag)
+        else:
+            self.send_body(200, body, etag)
+
+    def do_GET(self):
+        time.sleep(float(os.environ.get("FAKE_LATENCY", "0.1")))
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        artifact = os.environ["FAKE_GH_ARTIFACT"]
+
+        if url.path.startswith("/repos/") and not self.headers.get("Authorization"):
+            self.send_body(401, b'{"message": "Requires authentication"}')
+        elif "/workflows/" in url.path:
+            count = int(os.environ.get("FAKE_GH_RUNS", "10"))
+            per_page = int(query.get("per_page", 30))
+            page = int(query.get("page", 1))
+            runs = [{
+                "id": 1000 + i,
+                "run_number": count - i,
+                "status": "completed",
+                "conclusion": "success",
+                "event": "push",
+                "head_branch": "main",
+                "head_sha": "%040x" % i,
+                "display_title": "Commit %d" % i,
+                "created_at": "2025-01-01T00:00:00Z",
+            } for i in range(count)]
+            self.respond_json({
+                "total_count": count,
+                "workflow_runs": runs[(page - 1) * per_page:page * per_page],
+            })
+        elif url.path.endswith("/artifacts"):
+            self.respond_json({"artifacts": [{
+                "id": 7000,
+                "name": "android-debug-apk",
+                "size_in_bytes": os.path.getsize(artifact),
+                "digest": os.environ.get("FAKE_GH_DIGEST"),
+            }]})
+        elif url.path.endswith("/zip"):
+            self.send_response(302)
+            self.send_header("Location", f"http://localhost:{self.server.server_port}/blob/artifact.zip")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif url.path == "/blob/artifact.zip":
+            if self.headers.get("Authorization"):
+                self.send_body(400, b"Authorization must not be forwarded to blob storage")
+                return
+            rate = float(os.environ.get("FAKE_RATE", "0"))
+            if rate:
+                time.sleep(os.path.getsize(artifact) / rate)
+            self.send_body(200, Path(artifact).read_bytes())
+        else:
+            self.send_body(404, b'{"message": "Not Found"}')
+
+
+def start_fake_github() -> ThreadingHTTPServer:
+    """Serve FakeGitHubHandler on a free local port in a background thread"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def log(msg: str):
+    """Progress output (stderr, so stdout stays machine-readable)"""
+    print(msg, file=sys.stderr, flush=True)
+
+
+def load_deploy_module():
+    """Import deploy.py as a module"""
+    spec = importlib.util.spec_from_file_location("deploy", SCRIPT_DIR / "deploy.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def install_stub(bin_dir: Path, name: str, source: str):
+    """Write an executable stub into bin_dir"""
+    stub = bin_dir / name
+    stub.write_text(source)
+    stub.chmod(0o755)
+
+
+def make_apk_artifact(path: Path, size: int):
+    """Write an artifact ZIP holding an APK with `size` bytes of native code"""
+    apk = io.BytesIO()
+    with zipfile.ZipFile(apk, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("lib/arm64-v8a/libapp.so", os.urandom(size))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("app-debug.apk", apk.getvalue())
+
+
+def make_ipa(path: Path, size: int):
+    """Write an IPA with an Info.plist and `size` bytes of app binary"""
+    info = plistlib.dumps({
+        "CFBundleIdentifier": "com.repertoirecoach.repertoireCoach",
+        "CFBundleVersion": "1",
+        "CFBundleShortVersionString": "1.0.0",
+    })
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("Payload/Runner.app/Info.plist", info)
+        zf.writestr("Payload/Runner.app/Runner", os.urandom(size))
+
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    """Time fn() `repeat` times (after an untimed setup()) with deploy.py output muted"""
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+class Bench:
+    """Benchmark scenarios sharing one stub environment"""
+
+    def __init__(self, deploy, work_dir: Path, args: argparse.Namespace, api_url: str):
+        self.deploy = deploy
+        self.work_dir = work_dir
+        self.args = args
+        self.results = []
+        self.transports = {
+            "gh": deploy.GhCliTransport,
+            "http": lambda: deploy.HttpTransport(api_url),
+        }
+
+    def record(self, scenario: str, params: dict, timing: dict):
+        self.results.append({"scenario": scenario, "params": params, **timing})
+        details = ", ".join(f"{k}={v}" for k, v in params.items())
+        log(f"  {scenario:<10} {details:<40} {timing['median']:8.3f}s (median)")
+
+    def fresh_dir(self, name: str) -> Path:
+        path = self.work_dir / name
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        return path
+
+    def github_build(self):
+        return self.deploy.Build(
+            platform=self.deploy.Platform.ANDROID,
+            source=self.deploy.BuildSource.GITHUB,
+            run_id="1000",
+            run_number=1,
+            build_type="debug",
+            artifact_name="android-debug-apk",
+            artifact_id="7000",
+            artifact_digest=os.environ["FAKE_GH_DIGEST"],
+        )
+
+    def reset_devices(self):
+        self.fresh_dir("state")
+
+    def discovery(self):
+        deploy = self.deploy
+        for runs in self.args.runs:
+            os.environ["FAKE_GH_RUNS"] = str(runs)
+            for name, transport in self.transports.items():
+                for jobs in (1, self.args.jobs):
+                    # No metadata cache, so every call goes to the (fake) network
+                    api = deploy.GitHubApi(transport=transport())
+                    finder = deploy.BuildFinder(self.work_dir, jobs=jobs, api=api)
+                    self.record("discovery", {"runs": runs, "transport": name, "jobs": jobs, "cache": "cold"},
+                                measure(finder.find_github_builds, self.args.repeat))
+
+            self.check_depth(runs)
+
+            cache = deploy.MetadataCache(self.fresh_dir("metadata") / "github-metadata.json")
+            finder = deploy.BuildFinder(self.work_dir, jobs=self.args.jobs, api=deploy.GitHubApi(cache))
+            self.record("discovery", {"runs": runs, "jobs": self.args.jobs, "cache": "warm"},
+                        measure(finder.find_github_builds, self.args.repeat,
+                                setup=finder.find_github_builds))
+
+    def check_depth(self, runs: int):
+        """Fail unless a depth ending mid-page lists each of the newest runs exactly once"""
+        deploy = self.deploy
+        depth = deploy.RUNS_PAGE_SIZE + deploy.RUNS_PAGE_SIZE // 2
+        for name, transport in self.transports.items():
+            finder = deploy.BuildFinder(self.work_dir, api=deploy.GitHubApi(transport=transport()))
+            numbers = [build.run_number for build in finder.find_github_builds(depth=depth)]
+            expected = list(range(runs, max(0, runs - depth), -1))
+            if numbers != expected:
+                raise RuntimeError(f"--depth {depth} over {runs} runs ({name}) listed runs {numbers}, "
+                                   f"expected {expected}")
+
+    def download(self):
+        deploy = self.deploy
+        build = self.github_build()
+        temp_dir = self.fresh_dir("download-temp")
+        store = None
+
+        def fetch():
+            if deploy.Deployer.download_github_artifact(build, temp_dir, store) is None:
+                raise RuntimeError("Artifact download failed")
+
+        for name, transport in self.transports.items():
+            api = deploy.GitHubApi(transport=transport())
+
+            def cold_store():
+                nonlocal store
+                store = deploy.ArtifactStore(self.fresh_dir("artifacts"), api=api)
+
+            params = {"size": self.args.artifact_size, "transport": name}
+            self.record("download", {**params, "cache": "cold"},
+                        measure(fetch, self.args.repeat, setup=cold_store))
+        self.record("download", {"size": self.args.artifact_size, "cache": "warm"},
+                    measure(fetch, self.args.repeat))
+
+    def _fanout(self, scenario: str):
+        deploy = self.deploy
+        store = deploy.ArtifactStore(self.fresh_dir("fanout-artifacts"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            apk = deploy.Deployer.download_github_artifact(self.github_build(), self.work_dir, store)
+            serials = deploy.Deployer.list_android_devices()
+
+        def install():
+            results = deploy.Deployer.deploy_android_fanout(apk, serials, parallel=parallel, force=True)
+            if not all(r.success for r in results):
+                raise RuntimeError(f"{scenario}: install failed on some devices")
+
+        for parallel in sorted({1, self.args.parallel}):
+            self.record(scenario, {"devices": len(serials), "parallel": parallel},
+                        measure(install, self.args.repeat, setup=self.reset_devices))
+
+    def fanout(self):
+        os.environ["FAKE_ADB_MISMATCH"] = ""
+        self._fanout("fanout")
+
+    def fallback(self):
+        os.environ["FAKE_ADB_MISMATCH"] = "all"
+        try:
+            self._fanout("fallback")
+        finally:
+            os.environ["FAKE_ADB_MISMATCH"] = ""
+
+    def ios(self):
+        deploy = self.deploy
+        ipa = self.work_dir / "Runner.ipa"
+        make_ipa(ipa, self.args.artifact_size)
+        with contextlib.redirect_stdout(io.StringIO()):
+            udids = deploy.Deployer.list_ios_devices()
+
+        def install():
+            results = deploy.Deployer.deploy_ios_fanout(ipa, udids, parallel=parallel, force=True)
+            if not all(r.success for r in results):
+                raise RuntimeError("iOS install failed on some devices")
+
+        for parallel in sorted({1, self.args.parallel}):
+            self.record("ios", {"devices": len(udids), "parallel": parallel, "size": self.args.artifact_size},
+                        measure(install, self.args.repeat))
+
+    def fast(self):
+        deploy = self.deploy
+        apk = self.work_dir / "fast" / "app-debug.apk"
+        apk.parent.mkdir(exist_ok=True)
+        apk.write_bytes(os.urandom(self.args.artifact_size))
+        # The v4 signature file that makes the device eligible for --incremental
+        apk.with_name(apk.name + ".idsig").write_bytes(b"idsig")
+        with contextlib.redirect_stdout(io.StringIO()):
+            serials = deploy.Deployer.list_android_devices()
+
+        for fast in (False, True):
+            def install():
+                results = deploy.Deployer.deploy_android_fanout(apk, serials, parallel=self.args.parallel,
+                                                                force=True, fast=fast)
+                if not all(r.success for r in results):
+                    raise RuntimeError("fast: install failed on some devices")
+
+            self.record("fast", {"devices": len(serials), "fast": fast, "size": self.args.artifact_size},
+                        measure(install, self.args.repeat, setup=self.reset_devices))
+
+    def startup(self):
+        deploy = self.deploy
+        build = self.github_build()
+        with contextlib.redirect_stdout(io.StringIO()):
+            serials = deploy.Deployer.list_android_devices()
+
+        def bench():
+            with contextlib.redirect_stdout(io.StringIO()):
+                if not deploy.bench_startup(build, serials, STARTUP_LAUNCHES):
+                    raise RuntimeError("startup: no successful launch on some devices")
+
+        self.record("startup", {"devices": len(serials), "launches": STARTUP_LAUNCHES},
+                    measure(bench, self.args.repeat))
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark deploy.py against stubbed tools")
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=SCENARIOS,
+                        help="Scenarios to run (default: all)")
+    parser.add_argument("--latency", type=float, default=0.1,
+                        help="Seconds each fake tool call takes (default: 0.1)")
+    parser.add_argument("--rate", type=float, default=50e6,
+                        help="Fake transfer rate in bytes/s for downloads and installs (default: 50e6)")
+    parser.add_argument("--artifact-size", type=int, default=8 * 1024 * 1024,
+                        help="Size of the fake APK/IPA payload in bytes (default: 8 MiB)")
+    parser.add_argument("--runs", type=int, nargs="+", default=[1, 5, 10, 20],
+                        help="Run counts for discovery (default: 1 5 10 20)")
+    parser.add_argument("--devices", type=int, default=4,
+                        help="Number of fake Android and iOS devices (default: 4)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Concurrent discovery jobs (default: deploy.py default)")
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="Parallel installs in fan-out (default: number of devices)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Samples per measurement (default: 3)")
+    parser.add_argument("--output", type=Path,
+                        help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    deploy = load_deploy_module()
+    args.jobs = args.jobs or deploy.DEFAULT_JOBS
+    args.parallel = args.parallel or args.devices
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        bin_dir = work_dir / "bin"
+        bin_dir.mkdir()
+        for name, source in [("gh", FAKE_GH), ("adb", FAKE_ADB),
+                             ("ideviceinstaller", FAKE_IDEVICEINSTALLER),
+                             ("ios-deploy", FAKE_IOS_DEPLOY), ("idevice_id", FAKE_IDEVICE_ID)]:
+            install_stub(bin_dir, name, source)
+
+        artifact = work_dir / "artifact.zip"
+        make_apk_artifact(artifact, args.artifact_size)
+        server = start_fake_github()
+
+        os.environ.update({
+            "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}",
+            "REPERTOIRE_COACH_CACHE_DIR": str(work_dir / "cache"),
+            "FAKE_LATENCY": str(args.latency),
+            "FAKE_RATE": str(args.rate),
+            "FAKE_GH_ARTIFACT": str(artifact),
+            "FAKE_GH_DIGEST": "sha256:" + hashlib.sha256(artifact.read_bytes()).hexdigest(),
+            "FAKE_ADB_DEVICES": str(args.devices),
+            "FAKE_STATE_DIR": str(work_dir / "state"),
+            "GITHUB_TOKEN": "bench",
+            "GITHUB_REPOSITORY": "bench/repertoire-coach",
+        })
+
+        bench = Bench(deploy, work_dir, args, f"http://127.0.0.1:{server.server_port}")
+        bench.reset_devices()
+        log(f"Fake tool latency {args.latency:.3f}s, rate {args.rate / 1e6:.0f} MB/s, "
+            f"artifact {args.artifact_size / 1024 / 1024:.1f} MiB, {args.devices} device(s)\n")
+        for scenario in SCENARIOS:
+            if scenario in args.scenario:
+                getattr(bench, scenario)()
+        server.shutdown()
+
+    report = {
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": bench.results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+        log(f"\nResults written to {args.output}")
+    else:
+        print(output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,26 +15,107 @@ Usage:
 """
 
 import argparse
+import ctypes
+import ctypes.util
+import functools
+import gzip
+import hashlib
+import http.client
 import json
+import mimetypes
 import os
 import platform
+import plistlib
+import queue
 import re
+import select
 import shutil
+import statistics
+import struct
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 import zipfile
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from enum import Enum
-from pathlib import Path
-from typing import List, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path, PurePosixPath
+from urllib.parse import parse_qs, unquote, urlencode, urljoin, urlsplit
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import brotli  # Optional: adds brotli variants to --platform web
+except ImportError:
+    brotli = None
+
+
+# Android package name of the app, and its launcher activity
+ANDROID_PACKAGE = "com.repertoirecoach.repertoire_coach"
+ANDROID_ACTIVITY = f"{ANDROID_PACKAGE}/.MainActivity"
+
+# Default number of concurrent gh calls when resolving per-run artifact listings
+DEFAULT_JOBS = 8
+
+# CI workflow that produces the deployable artifacts
+WORKFLOW_FILE = "build.yml"
+
+# GitHub REST API root used by the built-in HTTP client
+DEFAULT_API_URL = "https://api.github.com"
+
+# How long the "latest runs" listing is served from cache without revalidating
+RUNS_CACHE_TTL = 60
+
+# Metadata cache entries not confirmed by GitHub for this long are dropped (days)
+METADATA_MAX_AGE_DAYS = 30
+
+# Successful runs fetched per page, and how many runs discovery looks back by default
+RUNS_PAGE_SIZE = 10
+DEFAULT_RUN_DEPTH = 30
+
+# Watch mode: GitHub polling interval and its backoff ceiling (seconds), and
+# how long a local package must be unchanged before it is deployed
+DEFAULT_POLL_INTERVAL = 30
+WATCH_MAX_INTERVAL = 300
+WATCH_SETTLE_TIME = 2.0
+
+# Default number of devices installed to at the same time in fan-out mode
+DEFAULT_PARALLEL_INSTALLS = 4
+
+# Default byte budget of the downloaded artifact store
+DEFAULT_ARTIFACT_CACHE_SIZE = 2 * 1024 ** 3
+
+# --prefetch: artifacts downloaded at the same time
+DEFAULT_PREFETCH_JOBS = 2
+
+# --capture: how long the app runs between resetting and reading its frame
+# stats (seconds), and the lowest SDK level with the perfetto command
+DEFAULT_CAPTURE_SECONDS = 15
+PERFETTO_MIN_SDK = 28
+
+# --platform web: first port builds are served on (later builds take the next ones)
+DEFAULT_SERVE_PORT = 8080
+
+# Localhost port of the shared deploy daemon (--daemon)
+DEFAULT_DAEMON_PORT = 8747
+DEFAULT_DAEMON_URL = f"http://127.0.0.1:{DEFAULT_DAEMON_PORT}"
+DAEMON_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Lowest Android SDK levels for adb's incremental (Android 11) and delta
+# (--fastdeploy, Android 7) installs
+INCREMENTAL_MIN_SDK = 30
+FASTDEPLOY_MIN_SDK = 24
 
 
 class Platform(Enum):
     """Supported platforms"""
     ANDROID = "android"
     IOS = "ios"
+    WEB = "web"  # Served from a local HTTP server instead of installed
 
 
 class BuildSource(Enum):
@@ -43,6 +124,13 @@ class BuildSource(Enum):
     GITHUB = "github"
 
 
+class CacheMode(Enum):
+    """How GitHub metadata is resolved against the local cache"""
+    NORMAL = "normal"    # Serve fresh entries from cache, revalidate stale ones
+    REFRESH = "refresh"  # Revalidate every entry with the server
+    OFFLINE = "offline"  # Never touch the network
+
+
 class Color:
     """Terminal colors"""
     RED = '\033[91m'
@@ -55,6 +143,113 @@ class Color:
     RESET = '\033[0m'
 
 
+class Profiler:
+    """Collects timed spans of deploy phases and subprocesses
+
+    Spans cost nothing until the profiler is enabled (--profile/--trace).
+    Each span carries free-form args, e.g. the argv and exit code of a
+    subprocess or the number of bytes it moved.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args):
+        """Time the enclosed block; the yielded dict can be filled with more args"""
+        if not self.enabled:
+            yield args
+            return
+
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "cat": category,
+                    "start": start - self._origin,
+                    "dur": end - start,
+                    "tid": thread.ident,
+                    "thread": thread.name,
+                    "args": args,
+                })
+
+    def phase(self, name: str):
+        """Decorator recording every call of a function as a span"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def print_summary(self):
+        """Print count, total and max time per span name"""
+        totals: Dict[str, List[float]] = {}
+        for span in self.spans:
+            totals.setdefault(span["name"], []).append(span["dur"])
+
+        width = max([len("Phase")] + [len(name) for name in totals])
+        print(f"\n{Color.BOLD}{'Phase':<{width}}  Count     Total       Max{Color.RESET}")
+        for name, durations in sorted(totals.items(), key=lambda item: -sum(item[1])):
+            print(f"{name:<{width}}  {len(durations):5d}  {sum(durations):7.2f}s  {max(durations):7.2f}s")
+        print(f"\nWall time: {time.perf_counter() - self._origin:.2f}s "
+              f"(phases overlap, so totals can exceed it)")
+
+    def write_trace(self, path: Path):
+        """Write spans in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for span in self.spans:
+            threads[span["tid"]] = span["thread"]
+            events.append({
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6),
+                "dur": round(span["dur"] * 1e6),
+                "pid": pid,
+                "tid": span["tid"],
+                "args": span["args"],
+            })
+        for tid, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str))
+
+
+PROFILER = Profiler()
+
+
+def run_command(cmd: List[str], name: Optional[str] = None, bytes_sent: int = 0,
+                **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run() recorded as a profiler span
+
+    The span is named after the tool and its subcommand unless a name is
+    given, and records argv, exit code and bytes moved.
+    """
+    if name is None:
+        args = cmd[3:] if cmd[:2] == ["adb", "-s"] else cmd[1:]
+        name = " ".join([cmd[0]] + args[:1])
+
+    with PROFILER.span(name, "subprocess", argv=cmd) as span:
+        result = subprocess.run(cmd, **kwargs)
+        span["exit_code"] = result.returncode
+        span["bytes_received"] = sum(len(out) for out in (result.stdout, result.stderr) if out)
+        if bytes_sent:
+            span["bytes_sent"] = bytes_sent
+        return result
+
+
 @dataclass
 class Build:
     """Represents a build artifact"""
@@ -68,14 +263,22 @@ class Build:
     date: Optional[datetime] = None
     build_type: Optional[str] = None  # debug, release, etc.
     artifact_name: Optional[str] = None
+    artifact_id: Optional[str] = None
+    artifact_digest: Optional[str] = None  # "sha256:<hex>" of the artifact ZIP, if known
+    abi_splits: Optional["AbiSplits"] = None  # Local --split-per-abi APKs (path is one of them)
+
+    def install_source(self) -> "Installable":
+        """What to install for a local build: the APK/IPA, or its per-ABI split set"""
+        return self.abi_splits or self.path
 
     def __str__(self) -> str:
         """String representation for menu display"""
         if self.source == BuildSource.LOCAL:
             age = self._format_age() if self.date else "unknown age"
+            splits = f"\n    Split per ABI: {', '.join(sorted(self.abi_splits.splits))}" if self.abi_splits else ""
             return (f"{self.source.value.capitalize()} - "
                    f"{self.platform.value.capitalize()} {self.build_type or 'build'} "
-                   f"({age})\n    {self.path}")
+                   f"({age})\n    {self.path}{splits}")
         else:
             age = self._format_age() if self.date else "unknown date"
             commit_short = self.commit[:7] if self.commit else "unknown"
@@ -104,6 +307,769 @@ class Build:
             return "just now"
 
 
+@dataclass
+class ArtifactMember:
+    """An APK/IPA inside an artifact ZIP, used in place without unpacking the archive"""
+    archive: Path
+    member: str
+    size: int  # Uncompressed size, from the ZIP central directory
+    crc: int = 0  # CRC-32 of the member, from the ZIP central directory
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    def open(self) -> BinaryIO:
+        """Open the member for streaming reads"""
+        # The returned stream keeps the archive file open after the
+        # ZipFile itself is closed
+        with zipfile.ZipFile(self.archive) as zf:
+            return zf.open(self.member)
+
+    def extract(self, dest_dir: Path) -> Path:
+        """Write only this member to dest_dir and return its path"""
+        dest = dest_dir / self.name
+        with PROFILER.span("artifact extract", member=self.member, bytes=self.size):
+            with self.open() as src, open(dest, "wb") as out:
+                shutil.copyfileobj(src, out, ArtifactStore.CHUNK_SIZE)
+        return dest
+
+
+# A build file on disk, or one still inside its artifact ZIP
+InstallSource = Union[Path, ArtifactMember]
+
+
+def open_install_source(source: InstallSource) -> BinaryIO:
+    """Open a build file for (seekable) binary reads"""
+    if isinstance(source, Path):
+        return open(source, "rb")
+    return source.open()
+
+
+# Flutter `build apk --split-per-abi` output, e.g. app-arm64-v8a-release.apk
+SPLIT_APK_RE = re.compile(r"app-(arm64-v8a|armeabi-v7a|x86_64|x86)-(\w+)\.apk")
+
+
+@dataclass
+class AbiSplits:
+    """Per-ABI APKs of one build, plus the universal APK if there is one
+
+    Each split only carries libflutter.so/libapp.so for its ABI, so a device
+    gets a fraction of the universal APK's bytes.
+    """
+    splits: Dict[str, InstallSource]
+    universal: Optional[InstallSource] = None
+
+    @property
+    def name(self) -> str:
+        base = self.universal.name if self.universal else "split APKs"
+        return f"{base} [{', '.join(sorted(self.splits))}]"
+
+    def for_abis(self, abis: List[str]) -> Optional[InstallSource]:
+        """The split for the device's most preferred ABI, else the universal APK"""
+        for abi in abis:
+            if abi in self.splits:
+                return self.splits[abi]
+        return self.universal
+
+    @staticmethod
+    def group(sources: List[InstallSource]) -> Dict[str, "AbiSplits"]:
+        """Group APKs by build type, keeping only groups that have splits
+
+        Files that are not splits are taken as the universal APK of the
+        build type in their name (app-release.apk).
+        """
+        groups: Dict[str, AbiSplits] = {}
+        universal: Dict[str, InstallSource] = {}
+        for source in sources:
+            match = SPLIT_APK_RE.fullmatch(source.name)
+            if match:
+                abi, build_type = match.groups()
+                groups.setdefault(build_type, AbiSplits({})).splits[abi] = source
+            else:
+                match = re.fullmatch(r"app-(\w+)\.apk", source.name)
+                if match:
+                    universal[match.group(1)] = source
+        for build_type, group in groups.items():
+            group.universal = universal.get(build_type)
+        return groups
+
+
+# What a build installs from: one APK/IPA, or a set of ABI splits
+Installable = Union[InstallSource, AbiSplits]
+
+
+@dataclass
+class ApkSet:
+    """The split APKs bundletool generated for one device spec, inside a .apks archive"""
+    archive: Path
+    splits: List[ArtifactMember]
+    bundle_name: str = ""  # The .aab the set was generated from
+
+    @property
+    def name(self) -> str:
+        return f"{self.bundle_name or self.archive.name} ({len(self.splits)} splits)"
+
+    @property
+    def base(self) -> ArtifactMember:
+        """The base module's master split, which carries the manifest and signature"""
+        for split in self.splits:
+            if split.name in ("base-master.apk", "standalone.apk") or split.name.startswith("standalone-"):
+                return split
+        return self.splits[0]
+
+    @staticmethod
+    def read(archive: Path, bundle_name: str = "") -> "ApkSet":
+        with zipfile.ZipFile(archive) as zf:
+            splits = [ArtifactMember(archive, info.filename, info.file_size, info.CRC)
+                      for info in zf.infolist() if info.filename.endswith(".apk")]
+        if not splits:
+            raise zipfile.BadZipFile(f"No APKs in {archive.name}")
+        return ApkSet(archive, splits, bundle_name)
+
+
+# What gets installed on one Android device: an APK, or the splits of an APK set
+DeviceApk = Union[InstallSource, ApkSet]
+
+
+@dataclass
+class ApkInfo:
+    """Identity of an APK, as read from its manifest and signature"""
+    package: str
+    version_code: Optional[int] = None
+    version_name: Optional[str] = None
+    signature: Optional[str] = None  # Signing certificate hash, see ApkSignature
+    min_sdk: Optional[int] = None
+    target_sdk: Optional[int] = None
+    abis: List[str] = field(default_factory=list)  # Native ABIs under lib/
+
+
+@dataclass
+class IosAppInfo:
+    """Identity of an iOS app bundle"""
+    bundle_id: str
+    bundle_version: Optional[str] = None        # CFBundleVersion
+    short_version: Optional[str] = None         # CFBundleShortVersionString
+
+
+class ApkSignature:
+    """Read the signing certificate of an APK without external tools
+
+    The certificate comes from the APK Signing Block (v3, then v2 scheme) or
+    the v1 JAR signature. It is reduced to the hash `dumpsys package` prints
+    in its "signatures:[...]" field, so it can be compared with a device.
+    """
+
+    SIG_BLOCK_MAGIC = b"APK Sig Block 42"
+    V2_BLOCK_ID = 0x7109871a
+    V3_BLOCK_ID = 0xf05368c0
+
+    @staticmethod
+    def read_hash(apk: InstallSource) -> Optional[str]:
+        """Return the package-manager hash of the APK's signing certificate"""
+        try:
+            with open_install_source(apk) as fp:
+                cert = ApkSignature._from_signing_block(fp) or ApkSignature._from_jar_signature(fp)
+        except (OSError, zipfile.BadZipFile, struct.error, IndexError, ValueError):
+            return None
+        return ApkSignature.package_manager_hash(cert) if cert else None
+
+    @staticmethod
+    def package_manager_hash(cert: bytes) -> str:
+        """Java's Arrays.hashCode(byte[]) as hex, which is what
+        android.content.pm.Signature.hashCode() returns"""
+        h = 1
+        for b in cert:
+            h = (31 * h + (b - 256 if b > 127 else b)) & 0xffffffff
+        return format(h, "x")
+
+    @staticmethod
+    def _from_signing_block(fp: BinaryIO) -> Optional[bytes]:
+        """First signer certificate from the APK Signing Block, if present"""
+        fp.seek(0, os.SEEK_END)
+        file_size = fp.tell()
+        tail_size = min(file_size, 65535 + 22)
+        fp.seek(file_size - tail_size)
+        tail = fp.read(tail_size)
+
+        eocd = tail.rfind(b"PK\x05\x06")
+        if eocd < 0:
+            return None
+        cd_offset = struct.unpack_from("<I", tail, eocd + 16)[0]
+
+        # The block ends right before the central directory with its size
+        # and magic; the same size also prefixes the block
+        if cd_offset < 32:
+            return None
+        fp.seek(cd_offset - 24)
+        block_size, magic = struct.unpack("<Q16s", fp.read(24))
+        if magic != ApkSignature.SIG_BLOCK_MAGIC or block_size > cd_offset:
+            return None
+        fp.seek(cd_offset - block_size)
+        pairs = fp.read(block_size - 24)
+
+        schemes = {}
+        offset = 0
+        while offset + 12 <= len(pairs):
+            length, block_id = struct.unpack_from("<QI", pairs, offset)
+            schemes[block_id] = pairs[offset + 12:offset + 8 + length]
+            offset += 8 + length
+
+        block = schemes.get(ApkSignature.V3_BLOCK_ID) or schemes.get(ApkSignature.V2_BLOCK_ID)
+        if block is None:
+            return None
+
+        # signers -> first signer -> signed data -> (digests, certificates)
+        signers, _ = ApkSignature._length_prefixed(block, 0)
+        signer, _ = ApkSignature._length_prefixed(signers, 0)
+        signed_data, _ = ApkSignature._length_prefixed(signer, 0)
+        _, offset = ApkSignature._length_prefixed(signed_data, 0)
+        certificates, _ = ApkSignature._length_prefixed(signed_data, offset)
+        cert, _ = ApkSignature._length_prefixed(certificates, 0)
+        return cert
+
+    @staticmethod
+    def _length_prefixed(data: bytes, offset: int) -> Tuple[bytes, int]:
+        """Read a uint32 length-prefixed value, returning it and the next offset"""
+        length = struct.unpack_from("<I", data, offset)[0]
+        start = offset + 4
+        if start + length > len(data):
+            raise ValueError("Truncated APK signature block")
+        return data[start:start + length], start + length
+
+    @staticmethod
+    def _from_jar_signature(fp: BinaryIO) -> Optional[bytes]:
+        """First certificate of the v1 (JAR) PKCS#7 signature, if present"""
+        fp.seek(0)
+        with zipfile.ZipFile(fp) as zf:
+            names = [n for n in zf.namelist()
+                     if re.fullmatch(r"META-INF/[^/]+\.(RSA|DSA|EC)", n, re.IGNORECASE)]
+            if not names:
+                return None
+            pkcs7 = zf.read(names[0])
+
+        # ContentInfo { contentType, [0] SignedData { version, digestAlgorithms,
+        #   encapContentInfo, [0] certificates, ... } }
+        _, start, _ = ApkSignature._der(pkcs7, 0)
+        offset = ApkSignature._der(pkcs7, start)[2]               # skip contentType
+        _, explicit, _ = ApkSignature._der(pkcs7, offset)         # [0]
+        _, offset, end = ApkSignature._der(pkcs7, explicit)       # SignedData
+        while offset < end:
+            tag, content, next_offset = ApkSignature._der(pkcs7, offset)
+            if tag == 0xa0:
+                cert_end = ApkSignature._der(pkcs7, content)[2]
+                return pkcs7[content:cert_end]
+            offset = next_offset
+        return None
+
+    @staticmethod
+    def _der(data: bytes, offset: int) -> Tuple[int, int, int]:
+        """Parse a DER header: (tag, content offset, end offset)"""
+        tag = data[offset]
+        length = data[offset + 1]
+        offset += 2
+        if length & 0x80:
+            count = length & 0x7f
+            length = int.from_bytes(data[offset:offset + count], "big")
+            offset += count
+        return tag, offset, offset + length
+
+
+class BinaryManifest:
+    """Parser for the compiled binary XML AndroidManifest.xml inside an APK
+
+    Only the attributes deploy.py needs are read: the package name and
+    version from <manifest>, and the SDK levels from <uses-sdk>.
+    """
+
+    RES_STRING_POOL_TYPE = 0x0001
+    RES_XML_TYPE = 0x0003
+    RES_XML_START_ELEMENT_TYPE = 0x0102
+    RES_XML_RESOURCE_MAP_TYPE = 0x0180
+    UTF8_FLAG = 1 << 8
+
+    TYPE_REFERENCE = 0x01
+    TYPE_STRING = 0x03
+    TYPE_INT_DEC = 0x10
+    TYPE_INT_HEX = 0x11
+
+    # android: attribute resource IDs, used when attribute names are stripped
+    ATTRIBUTE_IDS = {
+        0x0101021b: "versionCode",
+        0x0101021c: "versionName",
+        0x0101020c: "minSdkVersion",
+        0x01010270: "targetSdkVersion",
+    }
+
+    @staticmethod
+    def parse(data: bytes) -> Dict[str, Dict[str, object]]:
+        """Return {element: {attribute: value}} for <manifest> and <uses-sdk>"""
+        chunk_type, header_size, _ = struct.unpack_from("<HHI", data, 0)
+        if chunk_type != BinaryManifest.RES_XML_TYPE:
+            raise ValueError("Not a binary XML file")
+
+        strings: List[str] = []
+        resource_ids: List[int] = []
+        elements: Dict[str, Dict[str, object]] = {}
+
+        offset = header_size
+        while offset + 8 <= len(data):
+            chunk_type, header_size, chunk_size = struct.unpack_from("<HHI", data, offset)
+            if chunk_size < 8:
+                raise ValueError("Corrupt binary XML chunk")
+
+            if chunk_type == BinaryManifest.RES_STRING_POOL_TYPE:
+                strings = BinaryManifest._string_pool(data, offset)
+            elif chunk_type == BinaryManifest.RES_XML_RESOURCE_MAP_TYPE:
+                count = (chunk_size - header_size) // 4
+                resource_ids = list(struct.unpack_from(f"<{count}I", data, offset + header_size))
+            elif chunk_type == BinaryManifest.RES_XML_START_ELEMENT_TYPE:
+                name, attributes = BinaryManifest._element(data, offset + header_size, strings, resource_ids)
+                if name in ("manifest", "uses-sdk") and name not in elements:
+                    elements[name] = attributes
+
+            offset += chunk_size
+
+        return elements
+
+    @staticmethod
+    def _string_pool(data: bytes, offset: int) -> List[str]:
+        """Decode every string of a string pool chunk"""
+        (_, header_size, _, count, _, flags,
+         strings_start) = struct.unpack_from("<HHIIIII", data, offset)
+        offsets = struct.unpack_from(f"<{count}I", data, offset + header_size)
+        base = offset + strings_start
+        utf8 = bool(flags & BinaryManifest.UTF8_FLAG)
+
+        strings = []
+        for string_offset in offsets:
+            pos = base + string_offset
+            if utf8:
+                # Character count, then byte count; each 1 or 2 bytes
+                pos += 2 if data[pos] & 0x80 else 1
+                length = data[pos]
+                if length & 0x80:
+                    length = ((length & 0x7f) << 8) | data[pos + 1]
+                    pos += 2
+                else:
+                    pos += 1
+                strings.append(data[pos:pos + length].decode("utf-8", errors="replace"))
+            else:
+                length = struct.unpack_from("<H", data, pos)[0]
+                pos += 2
+                if length & 0x8000:
+                    length = ((length & 0x7fff) << 16) | struct.unpack_from("<H", data, pos)[0]
+                    pos += 2
+                strings.append(data[pos:pos + length * 2].decode("utf-16-le", errors="replace"))
+        return strings
+
+    @staticmethod
+    def _element(data: bytes, offset: int, strings: List[str],
+                 resource_ids: List[int]) -> Tuple[str, Dict[str, object]]:
+        """Decode a start-element chunk body into its name and attributes"""
+        _, name_index, attr_start, attr_size, attr_count = struct.unpack_from("<IIHHH", data, offset)
+        name = strings[name_index] if name_index < len(strings) else ""
+
+        attributes: Dict[str, object] = {}
+        for i in range(attr_count):
+            pos = offset + attr_start + i * attr_size
+            _, attr_name, raw_value, _, _, data_type, value = struct.unpack_from("<IIIHBBI", data, pos)
+
+            if attr_name < len(resource_ids) and resource_ids[attr_name] in BinaryManifest.ATTRIBUTE_IDS:
+                key = BinaryManifest.ATTRIBUTE_IDS[resource_ids[attr_name]]
+            elif attr_name < len(strings):
+                key = strings[attr_name]
+            else:
+                continue
+
+            if data_type == BinaryManifest.TYPE_STRING and value < len(strings):
+                attributes[key] = strings[value]
+            elif raw_value != 0xffffffff and raw_value < len(strings):
+                attributes[key] = strings[raw_value]
+            elif data_type in (BinaryManifest.TYPE_INT_DEC, BinaryManifest.TYPE_INT_HEX):
+                attributes[key] = struct.unpack("<i", struct.pack("<I", value))[0]
+            elif data_type == BinaryManifest.TYPE_REFERENCE:
+                attributes[key] = f"@0x{value:08x}"
+        return name, attributes
+
+
+class ApkInspector:
+    """Read APK metadata in-process, memoized per APK content
+
+    Results are keyed by a content hash that is cheap to compute: the CRC-32
+    of an APK inside an artifact ZIP, or a digest of a local APK's signing
+    block and central directory (which holds the CRC of every entry). They
+    are kept in memory and in a small JSON cache shared between runs.
+    """
+
+    MAX_CACHED = 256
+
+    _lock = threading.Lock()
+    _memo: Optional[Dict[str, dict]] = None
+
+    @staticmethod
+    @PROFILER.phase("apk inspect")
+    def inspect(apk: InstallSource) -> Optional[ApkInfo]:
+        """Return the APK's identity, or None if it cannot be parsed"""
+        try:
+            key = ApkInspector._content_key(apk)
+        except (OSError, struct.error, ValueError):
+            return None
+
+        with ApkInspector._lock:
+            memo = ApkInspector._load()
+            if key in memo:
+                return ApkInfo(**memo[key])
+
+        info = ApkInspector._parse(apk)
+        if info:
+            with ApkInspector._lock:
+                memo[key] = asdict(info)
+                ApkInspector._save()
+        return info
+
+    @staticmethod
+    def _parse(apk: InstallSource) -> Optional[ApkInfo]:
+        try:
+            with open_install_source(apk) as fp, zipfile.ZipFile(fp) as zf:
+                elements = BinaryManifest.parse(zf.read("AndroidManifest.xml"))
+                abis = sorted({name.split("/")[1] for name in zf.namelist()
+                               if name.startswith("lib/") and name.endswith(".so") and name.count("/") == 2})
+        except (OSError, KeyError, zipfile.BadZipFile, struct.error, IndexError, ValueError):
+            return None
+
+        manifest = elements.get("manifest", {})
+        uses_sdk = elements.get("uses-sdk", {})
+        if not isinstance(manifest.get("package"), str):
+            return None
+
+        def as_int(value) -> Optional[int]:
+            return value if isinstance(value, int) else None
+
+        return ApkInfo(
+            package=manifest["package"],
+            version_code=as_int(manifest.get("versionCode")),
+            version_name=str(manifest["versionName"]) if "versionName" in manifest else None,
+            signature=ApkSignature.read_hash(apk),
+            min_sdk=as_int(uses_sdk.get("minSdkVersion")),
+            target_sdk=as_int(uses_sdk.get("targetSdkVersion")),
+            abis=abis
+        )
+
+    @staticmethod
+    def _content_key(apk: InstallSource) -> str:
+        if isinstance(apk, ArtifactMember) and apk.crc:
+            return f"crc32:{apk.crc:08x}:{apk.size}"
+
+        # Everything from the signing block to the end of the file: covers
+        # the signature and the CRC of every entry
+        with open_install_source(apk) as fp:
+            fp.seek(0, os.SEEK_END)
+            file_size = fp.tell()
+            tail_size = min(file_size, 65535 + 22)
+            fp.seek(file_size - tail_size)
+            tail = fp.read(tail_size)
+            eocd = tail.rfind(b"PK\x05\x06")
+            if eocd < 0:
+                raise ValueError("Not a ZIP file")
+            start = struct.unpack_from("<I", tail, eocd + 16)[0]
+
+            if start >= 24:
+                fp.seek(start - 24)
+                block_size, magic = struct.unpack("<Q16s", fp.read(24))
+                if magic == ApkSignature.SIG_BLOCK_MAGIC and block_size + 8 <= start:
+                    start -= block_size + 8
+
+            fp.seek(start)
+            digest = hashlib.sha256(fp.read())
+        return f"sha256:{digest.hexdigest()}:{file_size}"
+
+    @staticmethod
+    def _cache_path() -> Path:
+        return user_cache_dir() / "apk-info.json"
+
+    @staticmethod
+    def _load() -> Dict[str, dict]:
+        if ApkInspector._memo is None:
+            try:
+                ApkInspector._memo = json.loads(ApkInspector._cache_path().read_text())
+            except (OSError, ValueError):
+                ApkInspector._memo = {}
+        return ApkInspector._memo
+
+    @staticmethod
+    def _save():
+        memo = ApkInspector._memo
+        while len(memo) > ApkInspector.MAX_CACHED:
+            del memo[next(iter(memo))]
+
+        path = ApkInspector._cache_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(memo))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # The cache is only an optimization
+
+
+class InstallRates:
+    """Measured full-install throughput per device, kept between runs
+
+    Used to tell how long a full install would have taken when a fast
+    install was done instead.
+    """
+
+    _lock = threading.Lock()
+    _memo: Optional[Dict[str, float]] = None
+
+    @staticmethod
+    def record(serial: Optional[str], size: int, seconds: float):
+        """Fold one full install into the device's bytes/s estimate"""
+        if size <= 0 or seconds <= 0:
+            return
+        with InstallRates._lock:
+            rates = InstallRates._load()
+            key = serial or "default"
+            rate = size / seconds
+            rates[key] = rate if key not in rates else 0.5 * rates[key] + 0.5 * rate
+            InstallRates._save()
+
+    @staticmethod
+    def estimate(serial: Optional[str], size: int) -> Optional[float]:
+        """Seconds a full install of size bytes would take, if the device was measured"""
+        with InstallRates._lock:
+            rate = InstallRates._load().get(serial or "default")
+        return size / rate if rate else None
+
+    @staticmethod
+    def _cache_path() -> Path:
+        return user_cache_dir() / "install-rates.json"
+
+    @staticmethod
+    def _load() -> Dict[str, float]:
+        if InstallRates._memo is None:
+            try:
+                InstallRates._memo = json.loads(InstallRates._cache_path().read_text())
+            except (OSError, ValueError):
+                InstallRates._memo = {}
+        return InstallRates._memo
+
+    @staticmethod
+    def _save():
+        path = InstallRates._cache_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(InstallRates._memo))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # The estimate is informational only
+
+
+class BundleToolError(Exception):
+    """bundletool is missing or failed"""
+
+
+class BundleTool:
+    """Turn App Bundles (.aab) into device-specific APK sets with bundletool
+
+    bundletool is run against each device's spec (SDK level, ABIs, screen
+    density, locales), so the set holds only the splits that device needs.
+    Generated .apks files are cached by bundle digest and spec digest:
+    another device of the same model reuses the set instead of paying for
+    another bundletool run.
+    """
+
+    MAX_CACHED = 16
+
+    _lock = threading.Lock()
+    _key_locks: Dict[str, threading.Lock] = {}
+    _specs: Dict[Optional[str], Tuple[Path, str]] = {}
+    _digests: Dict[Tuple[Path, int, int], str] = {}
+
+    @staticmethod
+    def command() -> Optional[List[str]]:
+        """bundletool on PATH, or java -jar $BUNDLETOOL_JAR"""
+        if shutil.which("bundletool"):
+            return ["bundletool"]
+        jar = os.environ.get("BUNDLETOOL_JAR")
+        if jar and Path(jar).is_file() and shutil.which("java"):
+            return ["java", "-jar", jar]
+        return None
+
+    @staticmethod
+    def cache_dir() -> Path:
+        return user_cache_dir() / "apk-sets"
+
+    @staticmethod
+    def apk_set(bundle: Path, serial: Optional[str] = None) -> ApkSet:
+        """Return the device's APK set for bundle, generating it if it is not cached
+
+        Raises BundleToolError if bundletool fails.
+        """
+        prefix = Deployer._prefix(serial)
+        spec_path, spec_digest = BundleTool.device_spec(serial)
+        key = f"{BundleTool.bundle_digest(bundle)[:16]}-{spec_digest[:16]}"
+        path = BundleTool.cache_dir() / f"{key}.apks"
+
+        # One bundletool run per key, even when several devices of the same
+        # model are being installed at once
+        with BundleTool._lock:
+            key_lock = BundleTool._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if path.exists():
+                print(f"{Color.GREEN}{prefix}✓ Using cached APK set for this device spec{Color.RESET}")
+                os.utime(path)
+            else:
+                print(f"{Color.CYAN}{prefix}Generating APK set for this device spec...{Color.RESET}")
+                tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.apks")
+                BundleTool._run("build-apks", [f"--bundle={bundle}", f"--output={tmp_path}",
+                                               f"--device-spec={spec_path}"])
+                os.replace(tmp_path, path)
+                BundleTool.evict(keep=path)
+        return ApkSet.read(path, bundle.name)
+
+    @staticmethod
+    def device_spec(serial: Optional[str] = None) -> Tuple[Path, str]:
+        """The device's spec file and a digest of its content (cached per session)"""
+        with BundleTool._lock:
+            cached = BundleTool._specs.get(serial)
+        if cached:
+            return cached
+
+        spec_dir = BundleTool.cache_dir() / "specs"
+        spec_dir.mkdir(parents=True, exist_ok=True)
+        spec_path = spec_dir / f"{serial or 'default'}.json"
+        args = [f"--output={spec_path}", "--overwrite"]
+        if serial:
+            args.append(f"--device-id={serial}")
+        adb = shutil.which("adb")
+        if adb:
+            args.append(f"--adb={adb}")
+        BundleTool._run("get-device-spec", args)
+
+        try:
+            spec = json.loads(spec_path.read_text())
+        except (OSError, ValueError) as e:
+            raise BundleToolError(f"Unreadable device spec: {e}") from e
+        digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+        with BundleTool._lock:
+            BundleTool._specs[serial] = (spec_path, digest)
+        return spec_path, digest
+
+    @staticmethod
+    def bundle_digest(bundle: Path) -> str:
+        """SHA-256 of the bundle, memoized per path, size and mtime"""
+        stat = bundle.stat()
+        memo_key = (bundle, stat.st_size, stat.st_mtime_ns)
+        with BundleTool._lock:
+            digest = BundleTool._digests.get(memo_key)
+        if digest is None:
+            sha256 = hashlib.sha256()
+            with PROFILER.span("bundle digest", bytes=stat.st_size), open(bundle, "rb") as fp:
+                for chunk in iter(lambda: fp.read(ArtifactStore.CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+            with BundleTool._lock:
+                BundleTool._digests[memo_key] = digest
+        return digest
+
+    @staticmethod
+    def evict(keep: Optional[Path] = None):
+        """Delete the least recently used APK sets beyond MAX_CACHED"""
+        sets = sorted(BundleTool.cache_dir().glob("*.apks"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in sets[BundleTool.MAX_CACHED:]:
+            if path != keep and not path.name.endswith(".tmp.apks"):
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _run(subcommand: str, args: List[str]):
+        cmd = BundleTool.command()
+        if cmd is None:
+            raise BundleToolError("bundletool is not installed")
+        BundleTool.cache_dir().mkdir(parents=True, exist_ok=True)
+        result = run_command(cmd + [subcommand] + args, name=f"bundletool {subcommand}",
+                             capture_output=True, text=True)
+        if result.returncode != 0:
+            output = (result.stderr or result.stdout).strip().splitlines()
+            raise BundleToolError(f"bundletool {subcommand} failed: {output[-1] if output else result.returncode}")
+
+
+@dataclass
+class DeviceResult:
+    """Outcome of deploying to one device"""
+    device: str
+    success: bool
+    seconds: float
+    skipped: bool = False  # Identical build was already installed
+
+
+@dataclass
+class StartupResult:
+    """Cold-start launch times of the app on one device, in milliseconds"""
+    device: str
+    total_ms: List[int] = field(default_factory=list)  # TotalTime: launch until the first frame
+    wait_ms: List[int] = field(default_factory=list)  # WaitTime: TotalTime plus am's own overhead
+    failed: int = 0  # Launches that reported an error
+
+    @staticmethod
+    def stats(values: List[int]) -> Dict[str, float]:
+        """Median, 90th percentile (nearest rank) and sample standard deviation"""
+        ordered = sorted(values)
+        return {
+            "median": statistics.median(ordered),
+            "p90": ordered[max(0, -(-len(ordered) * 9 // 10) - 1)],
+            "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        }
+
+
+@dataclass
+class CaptureResult:
+    """Frame and memory statistics of the app on one device after a capture window
+
+    Frame times are in milliseconds and memory in KB, as dumpsys reports them.
+    """
+    device: str
+    frames: Optional[int] = None
+    janky_percent: Optional[float] = None
+    frame_p50_ms: Optional[int] = None
+    frame_p90_ms: Optional[int] = None
+    frame_p95_ms: Optional[int] = None
+    frame_p99_ms: Optional[int] = None
+    pss_kb: Optional[int] = None
+    java_heap_kb: Optional[int] = None
+    native_heap_kb: Optional[int] = None
+    graphics_kb: Optional[int] = None
+    trace: Optional[str] = None  # Host path of the pulled Perfetto trace
+    error: Optional[str] = None
+
+    def read_gfxinfo(self, text: str):
+        """Take frame stats from `dumpsys gfxinfo <package>`"""
+        def number(pattern: str):
+            match = re.search(pattern, text)
+            return match.group(1) if match else None
+
+        frames = number(r"Total frames rendered:\s*(\d+)")
+        janky = number(r"Janky frames:\s*\d+\s*\(([\d.]+)%\)")
+        self.frames = int(frames) if frames else None
+        self.janky_percent = float(janky) if janky else None
+        for percentile in (50, 90, 95, 99):
+            value = number(rf"{percentile}th percentile:\s*(\d+)ms")
+            setattr(self, f"frame_p{percentile}_ms", int(value) if value else None)
+
+    def read_meminfo(self, text: str):
+        """Take PSS and heap sizes from the App Summary of `dumpsys meminfo <package>`"""
+        def kb(pattern: str) -> Optional[int]:
+            match = re.search(pattern, text)
+            return int(match.group(1)) if match else None
+
+        self.pss_kb = kb(r"TOTAL PSS:\s*(\d+)") or kb(r"(?m)^\s*TOTAL:\s*(\d+)")
+        self.java_heap_kb = kb(r"Java Heap:\s*(\d+)")
+        self.native_heap_kb = kb(r"(?m)^\s*Native Heap:\s*(\d+)")
+        self.graphics_kb = kb(r"Graphics:\s*(\d+)")
+
+
 class DependencyChecker:
     """Check for required system dependencies"""
 
@@ -144,6 +1110,21 @@ class DependencyChecker:
         error += "\nAfter installation, authenticate with: gh auth login\n"
         return False, error
 
+    @staticmethod
+    def check_bundletool() -> Tuple[bool, str]:
+        """Check if bundletool is available (needed for .aab builds only)"""
+        if BundleTool.command():
+            return True, ""
+
+        error = f"{Color.RED}Error: bundletool is not installed{Color.RESET}\n\n"
+        if platform.system() == "Darwin":
+            error += "Install with: brew install bundletool\n"
+        else:
+            error += "Download bundletool-all.jar from:\n"
+            error += "https://github.com/google/bundletool/releases\n"
+            error += "and point BUNDLETOOL_JAR at it (java must be on PATH)\n"
+        return False, error
+
     @staticmethod
     def check_ios_deploy() -> Tuple[bool, str]:
         """Check if iOS deployment tools are available"""
@@ -166,267 +1147,1360 @@ class DependencyChecker:
         return False, error
 
 
-class BuildFinder:
-    """Find available builds"""
-
-    def __init__(self, repo_root: Path):
-        self.repo_root = repo_root
-        self.build_dir = repo_root / "build"
+def user_cache_dir() -> Path:
+    """Per-user cache directory for deploy.py"""
+    override = os.environ.get("REPERTOIRE_COACH_CACHE_DIR")
+    if override:
+        return Path(override)
 
-    def find_local_android_builds(self) -> List[Build]:
-        """Find local Android APK files"""
-        builds = []
-        apk_dir = self.build_dir / "app" / "outputs" / "flutter-apk"
+    if platform.system() == "Darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "repertoire-coach"
 
-        if not apk_dir.exists():
-            return builds
 
-        for apk_file in apk_dir.glob("*.apk"):
-            # Determine build type from filename
-            build_type = "debug" if "debug" in apk_file.name else "release"
+class MetadataCache:
+    """JSON store of GitHub API responses, keyed by API path
 
-            # Get file modification time
-            mtime = datetime.fromtimestamp(apk_file.stat().st_mtime)
+    Each entry keeps the response body, its ETag and when it was last
+    confirmed by the server. Entries are read and written from several
+    threads during discovery, so access goes through a lock. Saving merges
+    with what other processes wrote meanwhile (the more recently confirmed
+    entry wins) and drops entries older than METADATA_MAX_AGE_DAYS, so the
+    file does not grow with the CI history.
+    """
 
-            builds.append(Build(
-                platform=Platform.ANDROID,
-                source=BuildSource.LOCAL,
-                path=apk_file,
-                date=mtime,
-                build_type=build_type
-            ))
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._read()
 
-        return builds
+    def _read(self) -> Dict[str, dict]:
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached entry for key, if any"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, data, etag: Optional[str]):
+        """Store a response body and its ETag"""
+        with self._lock:
+            self._entries[key] = {"data": data, "etag": etag, "checked_at": time.time()}
+            self._dirty = True
+
+    def touch(self, key: str):
+        """Mark an entry as just confirmed by the server (304 Not Modified)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["checked_at"] = time.time()
+                self._dirty = True
+
+    def save(self):
+        """Write the cache back to disk atomically"""
+        with self._lock:
+            if not self._dirty:
+                return
+            for key, entry in self._read().items():
+                if entry.get("checked_at", 0) > self._entries.get(key, {}).get("checked_at", 0):
+                    self._entries[key] = entry
+            cutoff = time.time() - METADATA_MAX_AGE_DAYS * 86400
+            self._entries = {key: entry for key, entry in self._entries.items()
+                             if entry.get("checked_at", 0) >= cutoff}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(self._entries))
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                print(f"{Color.YELLOW}Warning: Failed to write metadata cache: {e}{Color.RESET}")
 
-    def find_local_ios_builds(self) -> List[Build]:
-        """Find local iOS IPA files"""
-        builds = []
-        ipa_dir = self.build_dir / "ios" / "ipa"
 
-        if not ipa_dir.exists():
-            return builds
+class GitHubApiError(Exception):
+    """A GitHub API request failed or could not be answered from cache"""
 
-        for ipa_file in ipa_dir.glob("*.ipa"):
-            mtime = datetime.fromtimestamp(ipa_file.stat().st_mtime)
 
-            builds.append(Build(
-                platform=Platform.IOS,
-                source=BuildSource.LOCAL,
-                path=ipa_file,
-                date=mtime,
-                build_type="release"  # IPAs are typically release builds
-            ))
+class TransportUnavailable(GitHubApiError):
+    """The HTTP client has no token or repository to work with"""
 
-        return builds
 
-    def find_github_builds(self, platform_filter: Optional[Platform] = None) -> List[Build]:
-        """Find builds from GitHub Actions"""
-        builds = []
+def env_github_token() -> Optional[str]:
+    """GitHub token from the environment, if any"""
+    return os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
 
-        try:
-            # Get recent workflow runs
-            result = subprocess.run(
-                ["gh", "run", "list", "--workflow=Build Flutter App", "--json",
-                 "databaseId,number,conclusion,headBranch,headSha,displayTitle,createdAt",
-                 "--limit", "10"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
 
-            runs = json.loads(result.stdout)
+@functools.lru_cache(maxsize=None)
+def github_repository(repo_root: Path) -> Optional[str]:
+    """"owner/repo" from GITHUB_REPOSITORY or the git origin remote, if known"""
+    repo = os.environ.get("GITHUB_REPOSITORY")
+    if repo:
+        return repo
+    result = run_command(["git", "-C", str(repo_root), "remote", "get-url", "origin"],
+                         capture_output=True, text=True)
+    match = re.search(r"[:/]([^/:]+/[^/]+?)(?:\.git)?/?$", result.stdout.strip())
+    return match.group(1) if result.returncode == 0 and match else None
 
-            for run in runs:
-                # Only include successful runs
-                if run.get("conclusion") != "success":
-                    continue
 
-                run_id = str(run["databaseId"])
-                run_number = run.get("number")
-                commit = run.get("headSha", "")
-                commit_msg = run.get("displayTitle", "")
-                date_str = run.get("createdAt", "")
-                date = datetime.fromisoformat(date_str.replace('Z', '+00:00')) if date_str else None
-
-                # Get artifacts for this run
-                artifacts = self._get_run_artifacts(run_id)
-
-                for artifact in artifacts:
-                    # Determine platform and build type from artifact name
-                    artifact_name = artifact["name"]
-
-                    if "android" in artifact_name.lower():
-                        plt = Platform.ANDROID
-                        build_type = "debug" if "debug" in artifact_name.lower() else "release"
-                    elif "ios" in artifact_name.lower():
-                        plt = Platform.IOS
-                        build_type = "release"
-                    else:
-                        continue  # Unknown platform
-
-                    # Apply platform filter
-                    if platform_filter and plt != platform_filter:
-                        continue
-
-                    builds.append(Build(
-                        platform=plt,
-                        source=BuildSource.GITHUB,
-                        run_id=run_id,
-                        run_number=run_number,
-                        commit=commit,
-                        commit_msg=commit_msg,
-                        date=date,
-                        build_type=build_type,
-                        artifact_name=artifact_name
-                    ))
+class GhCliTransport:
+    """GitHub API access through one `gh api` subprocess per call"""
 
-        except subprocess.CalledProcessError as e:
-            print(f"{Color.YELLOW}Warning: Failed to fetch GitHub builds{Color.RESET}")
-            print(f"Error: {e.stderr if e.stderr else str(e)}")
-        except json.JSONDecodeError:
-            print(f"{Color.YELLOW}Warning: Failed to parse GitHub response{Color.RESET}")
+    CHUNK_SIZE = 1024 * 1024
 
-        return builds
+    def request(self, path: str, etag: Optional[str]) -> Tuple[int, Optional[str], str]:
+        """Run `gh api -i` and return (status, etag, body)"""
+        cmd = ["gh", "api", "-i", path]
+        if etag:
+            cmd += ["-H", f"If-None-Match: {etag}"]
 
-    def _get_run_artifacts(self, run_id: str) -> List[dict]:
-        """Get artifacts for a specific run"""
         try:
-            # Use GitHub API to get artifacts
-            result = subprocess.run(
-                ["gh", "api", f"repos/:owner/:repo/actions/runs/{run_id}/artifacts"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            # gh exits non-zero for anything above 2xx (including 304), but
+            # still prints the status line and headers with -i
+            result = run_command(cmd, capture_output=True, text=True)
+        except OSError as e:
+            raise GitHubApiError(f"Failed to run gh: {e}")
+
+        parts = re.split(r"\r?\n\r?\n", result.stdout, maxsplit=1)
+        head = parts[0]
+        body = parts[1] if len(parts) > 1 else ""
+        status_match = re.match(r"HTTP/\S+\s+(\d{3})", head)
+        if not status_match:
+            raise GitHubApiError(result.stderr.strip() or f"gh api {path} failed")
+
+        etag_match = re.search(r"^etag:\s*(.+?)\s*$", head, re.IGNORECASE | re.MULTILINE)
+        return int(status_match.group(1)), etag_match.group(1) if etag_match else None, body
+
+    def download(self, path: str, write: Callable[[bytes], object]) -> int:
+        """Stream a binary response body into write(); return the byte count"""
+        cmd = ["gh", "api", path]
+        try:
+            with PROFILER.span("gh api", "subprocess", argv=cmd) as span:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                received = 0
+                for chunk in iter(lambda: proc.stdout.read(self.CHUNK_SIZE), b""):
+                    write(chunk)
+                    received += len(chunk)
+                stderr = proc.stderr.read().decode(errors="replace")
+                span["exit_code"] = proc.wait()
+                span["bytes_received"] = received
+        except OSError as e:
+            raise GitHubApiError(f"Failed to run gh: {e}")
+
+        if proc.returncode != 0:
+            raise GitHubApiError(stderr.strip() or f"gh exited with {proc.returncode}")
+        return received
+
+
+class HttpTransport:
+    """GitHub API access over pooled keep-alive HTTP connections
+
+    The token comes from GITHUB_TOKEN/GH_TOKEN or `gh auth token`, and
+    :owner/:repo from GITHUB_REPOSITORY or the git origin remote. Both are
+    resolved on first use; TransportUnavailable is raised if either is
+    missing. Idle connections are kept per host and reused across threads.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    MAX_REDIRECTS = 5
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+    def __init__(self, base_url: Optional[str] = None, repo_root: Optional[Path] = None,
+                 timeout: float = 60):
+        self.base_url = (base_url or os.environ.get("REPERTOIRE_COACH_API_URL")
+                         or DEFAULT_API_URL).rstrip("/")
+        self.repo_root = repo_root or Path(__file__).parent.parent
+        self.timeout = timeout
+        self._credentials: Optional[Tuple[str, str]] = None
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def request(self, path: str, etag: Optional[str]) -> Tuple[int, Optional[str], str]:
+        """GET an API path and return (status, etag, body)"""
+        headers = {"If-None-Match": etag} if etag else {}
+        with self._get(path, headers) as (span, response):
+            try:
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                raise GitHubApiError(f"GET {path}: connection lost while reading the response: {e!r}")
+            span["bytes_received"] = len(body)
+            return response.status, response.getheader("ETag"), body.decode(errors="replace")
+
+    def download(self, path: str, write: Callable[[bytes], object]) -> int:
+        """Stream a binary response body (following redirects) into write()"""
+        with self._get(path, {}) as (span, response):
+            if response.status != 200:
+                body = response.read().decode(errors="replace")
+                raise GitHubApiError(f"GET {path} returned HTTP {response.status}: {body.strip()[:200]}")
+            received = 0
+            while True:
+                try:
+                    chunk = response.read(self.CHUNK_SIZE)
+                except (OSError, http.client.HTTPException) as e:
+                    # E.g. IncompleteRead when a kept-alive connection drops mid-body
+                    raise GitHubApiError(f"GET {path}: connection lost after {received} bytes: {e!r}")
+                if not chunk:
+                    break
+                write(chunk)
+                received += len(chunk)
+            span["bytes_received"] = received
+
+            expected = response.getheader("Content-Length")
+            if expected and expected.isdigit() and int(expected) != received:
+                raise GitHubApiError(f"GET {path}: got {received} of {expected} bytes")
+            return received
+
+    def _resolve_credentials(self) -> Tuple[str, str]:
+        """Return (token, "owner/repo"), looking them up once"""
+        with self._lock:
+            if self._credentials:
+                return self._credentials
+
+            token = env_github_token()
+            if not token and shutil.which("gh"):
+                result = run_command(["gh", "auth", "token"], capture_output=True, text=True)
+                token = result.stdout.strip() if result.returncode == 0 else None
+            if not token:
+                raise TransportUnavailable("No GitHub token (set GITHUB_TOKEN or run 'gh auth login')")
+
+            repo = github_repository(self.repo_root)
+            if not repo:
+                raise TransportUnavailable("Cannot determine the GitHub repository from the origin remote")
+
+            self._credentials = (token, repo)
+            return self._credentials
+
+    @contextmanager
+    def _get(self, path: str, headers: Dict[str, str]):
+        """GET path, following redirects; yields (span, response)
+
+        The Authorization header is only sent to the API host, never to a
+        redirect target such as the artifact blob storage.
+        """
+        token, repo = self._resolve_credentials()
+        url = f"{self.base_url}/{path.replace(':owner/:repo', repo).lstrip('/')}"
+        api_host = urlsplit(self.base_url).netloc
+
+        with PROFILER.span("http get", "http", path=path) as span:
+            for _ in range(self.MAX_REDIRECTS + 1):
+                parts = urlsplit(url)
+                request_headers = {
+                    "User-Agent": "repertoire-coach-deploy",
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                    **headers,
+                }
+                if parts.netloc == api_host:
+                    request_headers["Authorization"] = f"Bearer {token}"
+
+                key = (parts.scheme, parts.netloc)
+                target = parts.path + (f"?{parts.query}" if parts.query else "")
+                conn, response = self._send(key, target, request_headers)
+                location = response.getheader("Location")
+
+                if response.status in self.REDIRECT_STATUSES and location:
+                    response.read()
+                    self._release(key, conn, response)
+                    url = urljoin(url, location)
+                    continue
 
-            data = json.loads(result.stdout)
-            return data.get("artifacts", [])
+                span["status"] = response.status
+                try:
+                    yield span, response
+                finally:
+                    self._release(key, conn, response)
+                return
 
-        except (subprocess.CalledProcessError, json.JSONDecodeError):
-            return []
+        raise GitHubApiError(f"GET {path}: too many redirects")
 
+    def _send(self, key: Tuple[str, str], target: str,
+              headers: Dict[str, str]) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send a GET on a pooled connection, retrying once if a kept-alive one went stale"""
+        conn, reused = self._acquire(key)
+        while True:
+            try:
+                conn.request("GET", target, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                conn.close()
+                if not reused:
+                    raise GitHubApiError(f"GET {target} failed: {e}")
+                conn, reused = self._connect(key), False
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise GitHubApiError(f"GET {target} failed: {e}")
+
+    def _acquire(self, key: Tuple[str, str]) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return (connection, reused): an idle connection to the host, or a new one"""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _connect(self, key: Tuple[str, str]) -> http.client.HTTPConnection:
+        scheme, netloc = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def _release(self, key: Tuple[str, str], conn: http.client.HTTPConnection,
+                 response: http.client.HTTPResponse):
+        """Return a connection to the pool if its response was fully read"""
+        if response.isclosed() and not response.will_close:
+            with self._lock:
+                self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
 
-class Deployer:
-    """Deploy builds to devices"""
 
-    @staticmethod
-    def check_android_devices() -> Tuple[bool, str]:
-        """Check for connected Android devices"""
-        try:
-            result = subprocess.run(
-                ["adb", "devices"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+class GitHubApi:
+    """GitHub REST API access with conditional requests
 
-            # Parse device list (skip header line)
-            lines = result.stdout.strip().split('\n')[1:]
-            devices = [line.split('\t')[0] for line in lines if '\tdevice' in line]
+    Responses are cached in a MetadataCache. A cached response is served
+    without a request while it is fresh; otherwise it is revalidated with
+    If-None-Match so an unchanged response costs a 304.
 
-            if not devices:
-                return False, f"{Color.RED}No Android devices connected{Color.RESET}\n\nConnect a device and enable USB debugging."
+    Requests go through a transport: `gh api` subprocesses by default, or
+    the in-process HttpTransport, which falls back to gh if it has no
+    token or repository to work with.
+    """
 
-            return True, f"Found {len(devices)} device(s): {', '.join(devices)}"
+    def __init__(self, cache: Optional[MetadataCache] = None, mode: CacheMode = CacheMode.NORMAL,
+                 transport: Union[GhCliTransport, HttpTransport, None] = None,
+                 repo_root: Optional[Path] = None):
+        self.cache = cache
+        self.mode = mode
+        self.transport = transport or GhCliTransport()
+        self.repo_root = repo_root or Path(__file__).parent.parent
 
-        except subprocess.CalledProcessError as e:
-            return False, f"{Color.RED}Failed to check Android devices: {e}{Color.RESET}"
+    def _cache_key(self, path: str) -> str:
+        """Cache key of an API path, with :owner/:repo resolved
 
-    @staticmethod
-    def check_ios_devices() -> Tuple[bool, str]:
-        """Check for connected iOS devices"""
-        # Try ideviceinstaller first
-        if shutil.which("ideviceinstaller"):
-            try:
-                result = subprocess.run(
-                    ["ideviceinstaller", "--list-apps"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+        Checkouts of a fork and of upstream then keep separate entries
+        instead of sending each other's ETags.
+        """
+        repo = github_repository(self.repo_root) if ":owner/:repo" in path else None
+        return path.replace(":owner/:repo", repo) if repo else path
 
-                if result.returncode == 0:
-                    return True, "iOS device connected"
+    def get_json(self, path: str, ttl: Optional[float] = None):
+        """GET an API path and decode the JSON body
+
+        Args:
+            path: API path relative to the API root (may use :owner/:repo)
+            ttl: Seconds a cached response is served without revalidation.
+                 None means the response never changes once fetched.
+        """
+        key = self._cache_key(path)
+        entry = self.cache.get(key) if self.cache else None
+
+        if entry is not None:
+            if self.mode == CacheMode.OFFLINE:
+                return entry["data"]
+            if self.mode == CacheMode.NORMAL and (
+                    ttl is None or time.time() - entry["checked_at"] < ttl):
+                return entry["data"]
+        elif self.mode == CacheMode.OFFLINE:
+            raise GitHubApiError(f"{path} is not cached (offline mode)")
+
+        status, etag, body = self._call("request", path, entry["etag"] if entry else None)
+
+        if status == 304 and entry is not None:
+            self.cache.touch(key)
+            return entry["data"]
+
+        if status != 200:
+            raise GitHubApiError(f"GET {path} returned HTTP {status}: {body.strip()[:200]}")
+
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise GitHubApiError(f"Failed to parse response for {path}: {e}")
+
+        if self.cache:
+            self.cache.put(key, data, etag)
+        return data
+
+    def download(self, path: str, write: Callable[[bytes], object]) -> int:
+        """Stream a binary API response (e.g. an artifact ZIP) into write()"""
+        if self.mode == CacheMode.OFFLINE:
+            raise GitHubApiError(f"Cannot download {path} in offline mode")
+        return self._call("download", path, write)
+
+    def save(self):
+        """Persist the response cache"""
+        if self.cache:
+            self.cache.save()
+
+    def _call(self, method: str, *args):
+        """Call a transport method, falling back to gh if the HTTP client is unusable"""
+        transport = self.transport
+        try:
+            return getattr(transport, method)(*args)
+        except TransportUnavailable as e:
+            if self.transport is transport:
+                print(f"{Color.YELLOW}{e}; using gh instead{Color.RESET}")
+                self.transport = GhCliTransport()
+            return getattr(self.transport, method)(*args)
+
+
+class ArtifactError(Exception):
+    """An artifact could not be downloaded or verified"""
+
+
+class ArtifactStore:
+    """Content-addressed store of downloaded GitHub artifact ZIPs
+
+    Layout under the root directory:
+        blobs/<sha256>.zip          artifact archive, named by its digest
+        refs/<run_id>/<artifact>    digest of that run's artifact archive
+
+        locks/<artifact_id>         present while a process downloads that artifact
+        locks/<artifact_id>.wanted  a deploy waits for that download, which lifts its rate limit
+
+    Blobs are written to a temporary file and renamed into place, so several
+    deploy.py processes can share the store; a deploy that needs an artifact
+    another process (e.g. --prefetch) is downloading waits for it instead of
+    downloading it again. A blob's mtime is bumped on every hit and the least
+    recently used blobs are evicted above max_bytes.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    # A download lock not refreshed for this long belongs to a dead process
+    LOCK_STALE_SECONDS = 60
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_ARTIFACT_CACHE_SIZE,
+                 api: Optional[GitHubApi] = None, rate_limiter: Optional["RateLimiter"] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.api = api or GitHubApi()
+        self.rate_limiter = rate_limiter
+        self.blob_dir = root / "blobs"
+        self.ref_dir = root / "refs"
+        self.lock_dir = root / "locks"
+
+    def lookup(self, build: Build) -> Optional[Path]:
+        """Return the cached archive for a build, or None"""
+        ref = self._ref_path(build)
+        try:
+            digest = ref.read_text().strip()
+        except OSError:
+            return None
+
+        # A known digest from the API must match what the ref points at
+        if build.artifact_digest and build.artifact_digest != f"sha256:{digest}":
+            return None
+
+        blob = self.blob_dir / f"{digest}.zip"
+        try:
+            # Mark as recently used; fails if the blob was evicted meanwhile
+            os.utime(blob)
+        except OSError:
+            return None
+        return blob
+
+    def fetch(self, build: Build) -> Path:
+        """Return the archive for a build, downloading it on a cache miss"""
+        with PROFILER.span("artifact fetch", artifact=build.artifact_name, run_id=build.run_id) as span:
+            blob = self.lookup(build)
+            while blob is None and not self._lock(build):
+                # Another process is downloading it: use its blob, or take
+                # over if that download failed or its process died
+                self._wait_for_download(build)
+                blob = self.lookup(build)
+            span["cache_hit"] = blob is not None
+            if blob:
+                print(f"{Color.GREEN}✓ Using cached artifact{Color.RESET}")
+                return blob
+
+            print(f"{Color.CYAN}Downloading artifact...{Color.RESET}")
+            blob = self._download(build)
+            span["bytes"] = blob.stat().st_size
+            self.evict(keep=blob)
+            return blob
+
+    def evict(self, keep: Optional[Path] = None):
+        """Delete least recently used blobs until the store fits max_bytes"""
+        blobs = []
+        for blob in self.blob_dir.glob("*.zip"):
+            try:
+                st = blob.stat()
+            except OSError:
+                continue
+            blobs.append((st.st_mtime, st.st_size, blob))
+
+        total = sum(size for _, size, _ in blobs)
+        for _, size, blob in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if blob == keep:
+                continue
+            try:
+                blob.unlink()
+            except OSError:
+                pass  # Already evicted by another process
+            total -= size
+
+    def _ref_path(self, build: Build) -> Path:
+        return self.ref_dir / build.run_id / build.artifact_name
+
+    def _lock_path(self, build: Build) -> Path:
+        return self.lock_dir / str(build.artifact_id)
+
+    def _wanted_path(self, build: Build) -> Path:
+        return self.lock_dir / f"{build.artifact_id}.wanted"
+
+    def _lock(self, build: Build) -> bool:
+        """Claim the build's download; False if another process is downloading it"""
+        if not build.artifact_id:
+            raise ArtifactError(f"No artifact ID known for {build.artifact_name}")
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        lock = self._lock_path(build)
+        try:
+            if time.time() - lock.stat().st_mtime > self.LOCK_STALE_SECONDS:
+                lock.unlink()  # Left behind by a dead process
+        except OSError:
+            pass
+        try:
+            # Exclusive, so of two processes missing the same blob only one downloads it
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        except OSError as e:
+            raise ArtifactError(str(e))
+        return True
+
+    def _wait_for_download(self, build: Build) -> bool:
+        """Wait while another process downloads the build's artifact; True if it did"""
+        lock = self._lock_path(build)
+        waited = False
+        while True:
+            try:
+                age = time.time() - lock.stat().st_mtime
+            except OSError:
+                return waited
+            if age > self.LOCK_STALE_SECONDS:
+                return waited
+            if not waited:
+                print(f"{Color.CYAN}Waiting for a download already in progress...{Color.RESET}")
+                # Someone is waiting now, so a rate-limited prefetch goes full speed
+                self._wanted_path(build).touch()
+                waited = True
+            time.sleep(0.2)
+
+    def _download(self, build: Build) -> Path:
+        """Stream an artifact archive into the store and verify its digest
+
+        The caller holds the build's download lock (see _lock); it is released here.
+        """
+        tmp_path = self.blob_dir / f".{os.getpid()}-{threading.get_ident()}.tmp"
+        lock = self._lock_path(build)
+        wanted = self._wanted_path(build)
+        locked_at = time.time()
+        sha256 = hashlib.sha256()
+
+        def refresh_lock():
+            # Show processes waiting for this artifact that it is still coming
+            nonlocal locked_at
+            if time.time() - locked_at > self.LOCK_STALE_SECONDS / 4:
+                lock.touch()
+                locked_at = time.time()
+
+        path = f"repos/:owner/:repo/actions/artifacts/{build.artifact_id}/zip"
+        try:
+            wanted.unlink(missing_ok=True)  # Left behind by a waiter that came too late
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as out:
+                def write(chunk: bytes):
+                    wait = self.rate_limiter.reserve(len(chunk)) if self.rate_limiter else 0
+                    # Sleep in short steps: a long wait must neither let the lock
+                    # go stale nor hold up a deploy that starts waiting for us
+                    while wait > 0 and not wanted.exists():
+                        refresh_lock()
+                        time.sleep(min(wait, 1))
+                        wait -= 1
+                    sha256.update(chunk)
+                    out.write(chunk)
+                    refresh_lock()
+
+                self.api.download(path, write)
+
+            digest = sha256.hexdigest()
+            if build.artifact_digest and build.artifact_digest != f"sha256:{digest}":
+                raise ArtifactError(
+                    f"Digest mismatch: expected {build.artifact_digest}, got sha256:{digest}")
+
+            blob = self.blob_dir / f"{digest}.zip"
+            os.replace(tmp_path, blob)
+
+            ref = self._ref_path(build)
+            ref.parent.mkdir(parents=True, exist_ok=True)
+            tmp_ref = ref.with_name(f".{ref.name}.{os.getpid()}.tmp")
+            tmp_ref.write_text(digest)
+            os.replace(tmp_ref, ref)
+        except (OSError, GitHubApiError) as e:
+            raise ArtifactError(str(e))
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            # Waiting processes look the blob up once the lock is gone
+            wanted.unlink(missing_ok=True)
+            lock.unlink(missing_ok=True)
+        return blob
+
+
+class RateLimiter:
+    """Token bucket capping the combined byte rate of concurrent downloads"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate  # Allow a burst of one second's worth
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: int) -> float:
+        """Take amount bytes from the bucket; returns the seconds to wait before sending them"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate) - amount
+            self._last = now
+            return max(0.0, -self._tokens / self.rate)
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte size such as 500M or 2G"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)I?B?\s*", value.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** " KMGT".index(unit or " "))
+
+
+def format_size(size: int, signed: bool = False) -> str:
+    """Format a byte count as B/KB/MB/GB (binary units), optionally with a sign"""
+    sign = ("+" if size > 0 else "-" if size < 0 else "±") if signed else ("-" if size < 0 else "")
+    value = abs(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{sign}{value:.0f} {unit}" if unit == "B" else f"{sign}{value:.1f} {unit}"
+        value /= 1024
+    return f"{sign}{value:.2f} GB"
+
+
+def parse_date(value: str) -> str:
+    """Validate a YYYY-MM-DD date for --since/--until"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date (expected YYYY-MM-DD): {value}")
+
+
+@dataclass
+class RunFilter:
+    """Server-side filters for the workflow runs listing"""
+    branch: Optional[str] = None
+    event: Optional[str] = None  # push, pull_request, workflow_dispatch, ...
+    since: Optional[str] = None  # YYYY-MM-DD, inclusive
+    until: Optional[str] = None  # YYYY-MM-DD, inclusive
+
+    def query(self) -> Dict[str, str]:
+        """Query parameters for the runs endpoint"""
+        params = {"status": "success"}
+        if self.branch:
+            params["branch"] = self.branch
+        if self.event:
+            params["event"] = self.event
+        if self.since and self.until:
+            params["created"] = f"{self.since}..{self.until}"
+        elif self.since:
+            params["created"] = f">={self.since}"
+        elif self.until:
+            params["created"] = f"<={self.until}"
+        return params
+
+
+@dataclass
+class SizeBreakdown:
+    """Compressed and uncompressed bytes per component of an APK, AAB or IPA
+
+    Only the ZIP central directory is read, so nothing is extracted or
+    decompressed.
+    """
+    label: str
+    components: Dict[str, Tuple[int, int]]  # component -> (compressed, uncompressed)
+
+    @property
+    def total(self) -> Tuple[int, int]:
+        return (sum(c for c, _ in self.components.values()),
+                sum(u for _, u in self.components.values()))
+
+    @staticmethod
+    def read(source: InstallSource, label: str) -> "SizeBreakdown":
+        components: Dict[str, Tuple[int, int]] = {}
+        with open_install_source(source) as fp, zipfile.ZipFile(fp) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                name = SizeBreakdown.component(info.filename)
+                compressed, uncompressed = components.get(name, (0, 0))
+                components[name] = (compressed + info.compress_size, uncompressed + info.file_size)
+        return SizeBreakdown(label, components)
+
+    @staticmethod
+    def component(path: str) -> str:
+        """Component an archive entry counts towards"""
+        # App Bundles keep each module's files under <module>/
+        path = re.sub(r"^[^/]+/(?=(lib|assets|res|dex|root|manifest)/)", "", path)
+        name = PurePosixPath(path).name
+
+        lib = re.match(r"lib/([^/]+)/", path)
+        if lib:
+            if name in ("libapp.so", "libflutter.so"):
+                return f"{name} ({lib.group(1)})"
+            return f"other native libs ({lib.group(1)})"
+        if "App.framework/flutter_assets/" in path or path.startswith("assets/flutter_assets/"):
+            if name.lower().endswith((".ttf", ".otf")):
+                return "fonts"
+            return "flutter_assets"
+        if re.search(r"App\.framework/App$", path):
+            return "App.framework (Dart AOT)"
+        if re.search(r"Flutter\.framework/Flutter$", path):
+            return "Flutter.framework (engine)"
+        if "/Frameworks/" in path:
+            return "other frameworks"
+        if re.fullmatch(r"(dex/)?classes\d*\.dex", path):
+            return "dex"
+        if path.startswith("res/") or name in ("resources.arsc", "resources.pb") \
+                or name.endswith((".car", ".nib", ".storyboardc", ".png", ".strings")) \
+                or ".lproj/" in path or ".storyboardc/" in path:
+            return "resources"
+        if path.startswith("META-INF/") or "_CodeSignature/" in path or name == "embedded.mobileprovision":
+            return "signature"
+        if re.fullmatch(r"Payload/[^/]+\.app/[^/.]+", path):
+            return "app executable"
+        return "other"
+
+
+class BuildFinder:
+    """Find available builds"""
+
+    def __init__(self, repo_root: Path, jobs: int = DEFAULT_JOBS, api: Optional[GitHubApi] = None):
+        self.repo_root = repo_root
+        self.build_dir = repo_root / "build"
+        self.jobs = max(1, jobs)
+        self.api = api or GitHubApi()
+
+    @PROFILER.phase("discover local")
+    def find_local_android_builds(self) -> List[Build]:
+        """Find local Android APK and App Bundle files"""
+        builds = []
+        apk_dir = self.local_build_dir(Platform.ANDROID)
+
+        # App Bundles from `flutter build appbundle`, one directory per build type
+        for aab_file in sorted((self.build_dir / "app" / "outputs" / "bundle").glob("*/*.aab")):
+            builds.append(self._local_build(aab_file, Platform.ANDROID))
+
+        if not apk_dir.exists():
+            return builds
+
+        apk_files = sorted(apk_dir.glob("*.apk"))
+        split_groups = AbiSplits.group(apk_files)
+        grouped = {f for group in split_groups.values()
+                   for f in list(group.splits.values()) + [group.universal] if f}
+
+        for apk_file in apk_files:
+            if apk_file not in grouped:
+                builds.append(self._local_build(apk_file, Platform.ANDROID))
+
+        # One entry per --split-per-abi build, shown as its universal APK (if
+        # any) and dated by its newest file
+        for build_type, group in split_groups.items():
+            files = list(group.splits.values()) + ([group.universal] if group.universal else [])
+            builds.append(Build(
+                platform=Platform.ANDROID,
+                source=BuildSource.LOCAL,
+                path=group.universal or min(files),
+                date=datetime.fromtimestamp(max(f.stat().st_mtime for f in files)),
+                build_type=build_type,
+                abi_splits=group
+            ))
+
+        return builds
+
+    def find_local_builds(self, plt: Platform) -> List[Build]:
+        """Find local builds of a platform"""
+        if plt == Platform.ANDROID:
+            return self.find_local_android_builds()
+        if plt == Platform.WEB:
+            return self.find_local_web_builds()
+        return self.find_local_ios_builds()
+
+    @PROFILER.phase("discover local")
+    def find_local_web_builds(self) -> List[Build]:
+        """Find the local `flutter build web` output"""
+        web_dir = self.local_build_dir(Platform.WEB)
+        if not (web_dir / "index.html").is_file():
+            return []
+        return [self._local_build(web_dir, Platform.WEB)]
+
+    @PROFILER.phase("discover local")
+    def find_local_ios_builds(self) -> List[Build]:
+        """Find local iOS IPA files"""
+        builds = []
+        ipa_dir = self.local_build_dir(Platform.IOS)
+
+        if not ipa_dir.exists():
+            return builds
+
+        for ipa_file in ipa_dir.glob("*.ipa"):
+            builds.append(self._local_build(ipa_file, Platform.IOS))
+
+        return builds
+
+    def local_build_dir(self, plt: Platform) -> Path:
+        """Directory the Flutter build writes a platform's packages to"""
+        if plt == Platform.ANDROID:
+            return self.build_dir / "app" / "outputs" / "flutter-apk"
+        if plt == Platform.WEB:
+            return self.build_dir / "web"
+        return self.build_dir / "ios" / "ipa"
+
+    def local_build(self, path: Path, plt: Platform) -> Build:
+        """Build entry for a local APK or IPA file, grouped with its ABI splits if it has any"""
+        if plt == Platform.ANDROID:
+            for build in self.find_local_android_builds():
+                if path == build.path or (build.abi_splits and path in build.abi_splits.splits.values()):
+                    return build
+        return self._local_build(path, plt)
+
+    @staticmethod
+    def _local_build(path: Path, plt: Platform) -> Build:
+        """Build entry for a single local APK or IPA file, or a web build directory"""
+        if plt == Platform.ANDROID:
+            # Determine build type from filename
+            build_type = "debug" if "debug" in path.name else "release"
+        else:
+            build_type = "release"  # IPAs are typically release builds, as is `flutter build web`
+
+        # A web build is as old as its index.html; the directory's mtime
+        # only changes when entries are added or removed
+        stamp = path / "index.html" if plt == Platform.WEB else path
+        return Build(
+            platform=plt,
+            source=BuildSource.LOCAL,
+            path=path,
+            date=datetime.fromtimestamp(stamp.stat().st_mtime),
+            build_type=build_type
+        )
+
+    @PROFILER.phase("discover github")
+    def find_github_builds(self, platform_filter: Optional[Platform] = None,
+                           run_filter: Optional[RunFilter] = None,
+                           depth: int = DEFAULT_RUN_DEPTH) -> List[Build]:
+        """Find builds from GitHub Actions"""
+        builds = []
+        for page in self.iter_github_builds(platform_filter, run_filter, depth):
+            builds.extend(page)
+        return builds
+
+    def iter_github_builds(self, platform_filter: Optional[Platform] = None,
+                           run_filter: Optional[RunFilter] = None,
+                           depth: int = DEFAULT_RUN_DEPTH) -> Iterator[List[Build]]:
+        """Yield builds from GitHub Actions one page of runs at a time, newest first
+
+        Filtering on conclusion, branch, event and date happens on the
+        server, so every fetched run is deployable. Stops after `depth` runs.
+        """
+        run_filter = run_filter or RunFilter()
+        seen = 0
+        page_number = 1
+
+        try:
+            while seen < depth:
+                with PROFILER.span("discover github page", page=page_number):
+                    # Page numbers count in RUNS_PAGE_SIZE, so every page is
+                    # requested at that size and the last one is cut to depth
+                    page = self.get_github_runs(run_filter, RUNS_PAGE_SIZE, page_number)
+                    runs = page[:depth - seen]
+                    seen += len(runs)
+                    builds = self.builds_for_runs(runs, platform_filter)
+
+                self.api.save()
+                yield builds
+
+                if len(page) < RUNS_PAGE_SIZE:
+                    break
+                page_number += 1
+
+        except GitHubApiError as e:
+            print(f"{Color.YELLOW}Warning: Failed to fetch GitHub builds{Color.RESET}")
+            print(f"Error: {e}")
+            self.api.save()
+
+    def get_github_runs(self, run_filter: RunFilter, per_page: int, page: int = 1,
+                        ttl: float = RUNS_CACHE_TTL) -> List[dict]:
+        """One page of workflow runs matching run_filter, newest first
+
+        Run listings change with every push, so they are only served from
+        cache for `ttl` seconds before being revalidated.
+        """
+        query = urlencode({**run_filter.query(), "per_page": per_page, "page": page})
+        data = self.api.get_json(f"repos/:owner/:repo/actions/workflows/{WORKFLOW_FILE}/runs?{query}", ttl=ttl)
+        return data.get("workflow_runs", [])
+
+    def builds_for_runs(self, runs: List[dict], platform_filter: Optional[Platform]) -> List[Build]:
+        """Resolve the artifacts of each successful run into Build entries, keeping run order"""
+        # The server already filters on status=success; this also covers
+        # listings cached before that filter existed
+        runs = [run for run in runs if run.get("conclusion") == "success"]
+        builds = []
+
+        # Each artifact listing is a separate gh process plus an HTTP round
+        # trip, so resolve them concurrently. map() keeps the run order.
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            artifact_lists = list(pool.map(
+                lambda run: self._get_run_artifacts(str(run["id"])), runs))
+
+        for run, artifacts in zip(runs, artifact_lists):
+            run_id = str(run["id"])
+            run_number = run.get("run_number")
+            commit = run.get("head_sha", "")
+            commit_msg = run.get("display_title", "")
+            date_str = run.get("created_at", "")
+            date = datetime.fromisoformat(date_str.replace('Z', '+00:00')) if date_str else None
+
+            for artifact in artifacts:
+                # Determine platform and build type from artifact name
+                artifact_name = artifact["name"]
+
+                if "android" in artifact_name.lower():
+                    plt = Platform.ANDROID
+                    build_type = "debug" if "debug" in artifact_name.lower() else "release"
+                elif "ios" in artifact_name.lower():
+                    plt = Platform.IOS
+                    build_type = "release"
+                elif "web" in artifact_name.lower():
+                    plt = Platform.WEB
+                    build_type = "release"
+                else:
+                    continue  # Unknown platform
+
+                # Apply platform filter
+                if platform_filter and plt != platform_filter:
+                    continue
+
+                builds.append(Build(
+                    platform=plt,
+                    source=BuildSource.GITHUB,
+                    run_id=run_id,
+                    run_number=run_number,
+                    commit=commit,
+                    commit_msg=commit_msg,
+                    date=date,
+                    build_type=build_type,
+                    artifact_name=artifact_name,
+                    artifact_id=str(artifact["id"]) if artifact.get("id") else None,
+                    artifact_digest=artifact.get("digest")
+                ))
+
+        return builds
+
+    def _get_run_artifacts(self, run_id: str) -> List[dict]:
+        """Get artifacts for a specific run"""
+        try:
+            # Artifacts of a completed run never change, so the listing is
+            # kept until METADATA_MAX_AGE_DAYS (only revalidated with --refresh).
+            # They do expire, though, which the cached listing shows by expires_at.
+            data = self.api.get_json(f"repos/:owner/:repo/actions/runs/{run_id}/artifacts")
+            now = datetime.now().astimezone()
+            return [artifact for artifact in data.get("artifacts", [])
+                    if not artifact.get("expired") and not (
+                        artifact.get("expires_at")
+                        and datetime.fromisoformat(artifact["expires_at"].replace("Z", "+00:00")) <= now)]
+
+        except GitHubApiError:
+            return []
+
+
+class Deployer:
+    """Deploy builds to devices"""
+
+    @staticmethod
+    def list_android_devices() -> List[str]:
+        """Return serials of connected, authorized Android devices"""
+        result = run_command(
+            ["adb", "devices"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+
+        # Parse device list (skip header line)
+        lines = result.stdout.strip().split('\n')[1:]
+        return [line.split('\t')[0] for line in lines if '\tdevice' in line]
+
+    @staticmethod
+    def check_android_devices() -> Tuple[bool, str]:
+        """Check for connected Android devices"""
+        ok, msg, _ = Deployer.probe_android_devices()
+        return ok, msg
 
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+    @staticmethod
+    @PROFILER.phase("probe devices")
+    def probe_android_devices() -> Tuple[bool, str, List[str]]:
+        """Check for connected Android devices, also returning their serials"""
+        try:
+            devices = Deployer.list_android_devices()
+
+            if not devices:
+                return False, f"{Color.RED}No Android devices connected{Color.RESET}\n\nConnect a device and enable USB debugging.", []
+
+            return True, f"Found {len(devices)} device(s): {', '.join(devices)}", devices
+
+        except subprocess.CalledProcessError as e:
+            return False, f"{Color.RED}Failed to check Android devices: {e}{Color.RESET}", []
+
+    @staticmethod
+    def list_ios_devices() -> List[str]:
+        """UDIDs of connected iOS devices
+
+        `idevice_id -l` only asks usbmuxd for the attached devices, so it is
+        cheap; `ios-deploy --detect` is the fallback where libimobiledevice
+        is missing.
+        """
+        if shutil.which("idevice_id"):
+            try:
+                result = run_command(["idevice_id", "-l"], capture_output=True, text=True, timeout=5)
+                if result.returncode == 0:
+                    return list(dict.fromkeys(result.stdout.split()))
+            except subprocess.TimeoutExpired:
                 pass
 
-        # Try ios-deploy as fallback
         if shutil.which("ios-deploy"):
             try:
-                result = subprocess.run(
-                    ["ios-deploy", "--detect"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+                result = run_command(["ios-deploy", "--detect", "--timeout", "1"],
+                                     capture_output=True, text=True, timeout=10)
+                # [....] Found 00008030-001A2B3C4D5E6F70 (D421AP, iPhone 11 Pro, ...) a.k.a. ...
+                return list(dict.fromkeys(re.findall(r"Found ([0-9A-Fa-f-]{24,})", result.stdout)))
+            except subprocess.TimeoutExpired:
+                pass
 
-                if result.returncode == 0 and "Found" in result.stdout:
-                    return True, "iOS device connected"
+        return []
 
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                pass
+    @staticmethod
+    @PROFILER.phase("probe devices")
+    def probe_ios_devices() -> Tuple[bool, str, List[str]]:
+        """Check for connected iOS devices, also returning their UDIDs"""
+        devices = Deployer.list_ios_devices()
+        if not devices:
+            return False, f"{Color.RED}No iOS devices connected{Color.RESET}\n\nConnect an iOS device via USB.", []
+        return True, f"Found {len(devices)} iOS device(s): {', '.join(devices)}", devices
+
+    @staticmethod
+    def check_ios_devices() -> Tuple[bool, str]:
+        """Check for connected iOS devices"""
+        ok, msg, _ = Deployer.probe_ios_devices()
+        return ok, msg
+
+    @staticmethod
+    def _adb(serial: Optional[str] = None) -> List[str]:
+        """adb command prefix, targeting one device if a serial is given"""
+        return ["adb", "-s", serial] if serial else ["adb"]
+
+    _device_abis: Dict[Optional[str], List[str]] = {}
+
+    @staticmethod
+    def get_device_abis(serial: Optional[str] = None) -> List[str]:
+        """ABIs the device supports, most preferred first (cached per session)"""
+        abis = Deployer._device_abis.get(serial)
+        if abis is None:
+            abis = []
+            for prop in ("ro.product.cpu.abilist", "ro.product.cpu.abi"):
+                result = run_command(Deployer._adb(serial) + ["shell", "getprop", prop],
+                                     capture_output=True, text=True)
+                abis = [abi for abi in result.stdout.strip().split(",") if abi] if result.returncode == 0 else []
+                if abis:
+                    break
+            Deployer._device_abis[serial] = abis
+        return abis
+
+    @staticmethod
+    def resolve_apk(apk: Installable, serial: Optional[str] = None) -> Optional[DeviceApk]:
+        """Pick what to push to a device
 
-        return False, f"{Color.RED}No iOS devices connected{Color.RESET}\n\nConnect an iOS device via USB."
+        That is its ABI split if apk is a split set, or its bundletool APK
+        set if apk is an App Bundle.
+        """
+        if isinstance(apk, Path) and apk.suffix == ".aab":
+            ok, msg = DependencyChecker.check_bundletool()
+            if not ok:
+                print(msg)
+                return None
+            try:
+                return BundleTool.apk_set(apk, serial)
+            except (BundleToolError, OSError, zipfile.BadZipFile) as e:
+                print(f"{Color.RED}{Deployer._prefix(serial)}✗ {e}{Color.RESET}")
+                return None
+        if not isinstance(apk, AbiSplits):
+            return apk
+
+        abis = Deployer.get_device_abis(serial)
+        chosen = apk.for_abis(abis)
+        prefix = Deployer._prefix(serial)
+        if chosen is None:
+            print(f"{Color.RED}{prefix}✗ No APK for device ABIs {', '.join(abis) or '(unknown)'} "
+                  f"(have {', '.join(sorted(apk.splits))}){Color.RESET}")
+        else:
+            print(f"{Color.CYAN}{prefix}Using {chosen.name} for {abis[0] if abis else 'unknown ABI'}{Color.RESET}")
+        return chosen
+
+    @staticmethod
+    def _udid_args(tool: str, udid: Optional[str]) -> List[str]:
+        """Arguments that make an iOS tool target one device, if a UDID is given"""
+        if not udid:
+            return []
+        return ["--id", udid] if tool == "ios-deploy" else ["-u", udid]
 
     @staticmethod
-    def uninstall_android(package_name: str) -> bool:
+    def _prefix(serial: Optional[str]) -> str:
+        """Output prefix identifying the device when deploying to several"""
+        return f"[{serial}] " if serial else ""
+
+    @staticmethod
+    def uninstall_android(package_name: str, serial: Optional[str] = None) -> bool:
         """Uninstall Android app"""
-        print(f"\n{Color.CYAN}Uninstalling {package_name}...{Color.RESET}")
+        prefix = Deployer._prefix(serial)
+        print(f"{Color.CYAN}{prefix}Uninstalling {package_name}...{Color.RESET}")
 
         try:
-            result = subprocess.run(
-                ["adb", "uninstall", package_name],
+            result = run_command(
+                Deployer._adb(serial) + ["uninstall", package_name],
                 capture_output=True,
                 text=True
             )
 
+            Deployer._remember_installed(serial, package_name, None)
             if result.returncode == 0:
-                print(f"{Color.GREEN}✓ Successfully uninstalled{Color.RESET}")
+                print(f"{Color.GREEN}{prefix}✓ Successfully uninstalled{Color.RESET}")
                 return True
             else:
                 # App might not be installed, which is okay
-                print(f"{Color.YELLOW}App not installed (or already removed){Color.RESET}")
+                print(f"{Color.YELLOW}{prefix}App not installed (or already removed){Color.RESET}")
                 return True
 
         except subprocess.CalledProcessError as e:
-            print(f"{Color.RED}✗ Uninstall failed: {e}{Color.RESET}")
+            print(f"{Color.RED}{prefix}✗ Uninstall failed: {e}{Color.RESET}")
             return False
 
     @staticmethod
-    def deploy_android(apk_path: Path, clean_install: bool = False) -> bool:
+    def _install_apk(apk: DeviceApk, serial: Optional[str], replace: bool) -> Tuple[bool, str]:
+        """Run one APK install and return (success, error output)
+
+        An ArtifactMember is streamed from its archive into the package
+        manager over adb's stdin, so it never lands on disk. Devices that
+        cannot take a streamed install get the member extracted instead.
+        The splits of an APK set go in together as one split install.
+        """
+        adb = Deployer._adb(serial)
+        flags = ["-r"] if replace else []
+
+        if isinstance(apk, ApkSet):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                files = [split.extract(Path(temp_dir)) for split in apk.splits]
+                size = sum(split.size for split in apk.splits)
+                start = time.perf_counter()
+                result = run_command(
+                    adb + ["install-multiple"] + flags + [str(f) for f in files],
+                    bytes_sent=size,
+                    capture_output=True,
+                    text=True
+                )
+            if result.returncode == 0:
+                InstallRates.record(serial, size, time.perf_counter() - start)
+            return result.returncode == 0, result.stderr
+
+        if isinstance(apk, Path):
+            size = apk.stat().st_size
+            start = time.perf_counter()
+            result = run_command(
+                adb + ["install"] + flags + [str(apk)],
+                bytes_sent=size,
+                capture_output=True,
+                text=True
+            )
+            if result.returncode == 0:
+                InstallRates.record(serial, size, time.perf_counter() - start)
+            return result.returncode == 0, result.stderr
+
+        cmd = adb + ["exec-in", "cmd", "package", "install"] + flags + ["-S", str(apk.size)]
+        start = time.perf_counter()
+        with PROFILER.span("adb exec-in", "subprocess", argv=cmd, bytes_sent=apk.size) as span:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            try:
+                with apk.open() as src:
+                    shutil.copyfileobj(src, proc.stdin, ArtifactStore.CHUNK_SIZE)
+            except BrokenPipeError:
+                pass  # Install aborted early; the reason is in the output
+            # communicate() closes stdin, signalling the end of the APK
+            stdout, stderr = proc.communicate()
+            span["exit_code"] = proc.returncode
+            span["bytes_received"] = len(stdout) + len(stderr)
+        output = (stdout + stderr).decode(errors="replace")
+
+        # exec-in does not forward the remote exit status, so go by pm's output
+        if "Success" in output:
+            InstallRates.record(serial, apk.size, time.perf_counter() - start)
+            return True, ""
+        if "INSTALL_FAILED" in output or "INSTALL_PARSE_FAILED" in output:
+            return False, output
+
+        # No package manager answer: fall back to a regular file install
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return Deployer._install_apk(apk.extract(Path(temp_dir)), serial, replace)
+
+    _device_sdk: Dict[Optional[str], Optional[int]] = {}
+
+    @staticmethod
+    def get_device_sdk(serial: Optional[str] = None) -> Optional[int]:
+        """Android SDK level of the device (cached per session)"""
+        if serial not in Deployer._device_sdk:
+            result = run_command(Deployer._adb(serial) + ["shell", "getprop", "ro.build.version.sdk"],
+                                 capture_output=True, text=True)
+            sdk = result.stdout.strip()
+            Deployer._device_sdk[serial] = int(sdk) if result.returncode == 0 and sdk.isdigit() else None
+        return Deployer._device_sdk[serial]
+
+    @staticmethod
+    def _fast_install(apk: DeviceApk, serial: Optional[str], package_name: str) -> bool:
+        """Upgrade with adb's incremental or delta install; False means do a full install
+
+        --incremental (Android 11+) needs the APK's v4 signature file
+        (<apk>.idsig) next to it, and streams the rest of the APK while the
+        app is already starting. --fastdeploy (Android 7+) sends only the
+        parts that differ from the installed APK, so the app must be
+        installed with the same key.
+        """
+        prefix = Deployer._prefix(serial)
+        if isinstance(apk, ApkSet):
+            print(f"{Color.YELLOW}{prefix}Fast install is not supported for APK sets, "
+                  f"doing a full install{Color.RESET}")
+            return False
+
+        sdk = Deployer.get_device_sdk(serial)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # adb needs a file to diff or stream from
+            apk_file = apk if isinstance(apk, Path) else apk.extract(Path(temp_dir))
+            idsig = apk_file.with_name(apk_file.name + ".idsig")
+            if sdk and sdk >= INCREMENTAL_MIN_SDK and idsig.exists():
+                mode = "--incremental"
+            elif sdk and sdk >= FASTDEPLOY_MIN_SDK and Deployer.get_installed_android_app(package_name, serial):
+                mode = "--fastdeploy"
+            else:
+                reason = ("app not installed yet" if sdk and sdk >= FASTDEPLOY_MIN_SDK
+                          else f"needs Android SDK {FASTDEPLOY_MIN_SDK}+, device has {sdk or 'unknown'}")
+                print(f"{Color.YELLOW}{prefix}Fast install not available ({reason}), "
+                      f"doing a full install{Color.RESET}")
+                return False
+
+            print(f"{Color.CYAN}{prefix}Attempting fast install ({mode})...{Color.RESET}")
+            size = apk_file.stat().st_size
+            start = time.perf_counter()
+            result = run_command(
+                Deployer._adb(serial) + ["install", "-r", mode, str(apk_file)],
+                name=f"adb install {mode}",
+                capture_output=True,
+                text=True
+            )
+            seconds = time.perf_counter() - start
+
+        if result.returncode != 0:
+            print(f"{Color.YELLOW}{prefix}⚠ Fast install failed, falling back to a full install{Color.RESET}")
+            return False
+
+        print(f"{Color.GREEN}{prefix}✓ Successfully installed ({mode}, {seconds:.1f}s){Color.RESET}")
+        full = InstallRates.estimate(serial, size)
+        if full is not None:
+            saved = full - seconds
+            print(f"{prefix}A full install takes about {full:.1f}s on this device "
+                  f"({'saved' if saved >= 0 else 'lost'} {abs(saved):.1f}s)")
+        return True
+
+    @staticmethod
+    @PROFILER.phase("deploy android")
+    def deploy_android(apk_path: Installable, clean_install: bool = False,
+                       serial: Optional[str] = None, force: bool = False, fast: bool = False) -> bool:
         """Deploy APK to Android device
 
         Args:
-            apk_path: Path to the APK file
+            apk_path: Path to the APK file or App Bundle, an APK inside an
+                      artifact ZIP, or a set of ABI splits to pick from for
+                      this device
             clean_install: If True, uninstall existing app first (removes all data).
                           If False (default), upgrade existing app (preserves data).
+            serial: Target device serial. Required when more than one device is connected.
+            force: Install even if the device already runs an identical build.
+            fast: Upgrade with an incremental or delta install where the
+                  device supports it, falling back to a full install.
         """
-        print(f"\n{Color.CYAN}Deploying {apk_path.name}...{Color.RESET}")
+        apk_path = Deployer.resolve_apk(apk_path, serial)
+        if apk_path is None:
+            return False
+
+        prefix = Deployer._prefix(serial)
+        print(f"\n{Color.CYAN}{prefix}Deploying {apk_path.name}...{Color.RESET}")
+
+        if not force and not clean_install and Deployer.skip_identical_android(apk_path, serial):
+            return True
 
         try:
-            # Uninstall first if force flag is set
+            package_name = Deployer._get_android_package_name(apk_path)
+
+            if clean_install:
+                print(f"{Color.YELLOW}{prefix}Clean install requested (will remove app data){Color.RESET}")
+            elif Deployer.preflight_android(apk_path, serial):
+                # An upgrade would be rejected after the whole APK was sent
+                print(f"{Color.YELLOW}{prefix}⚠ Signature mismatch detected (different signing key){Color.RESET}")
+                print(f"{Color.YELLOW}{prefix}Installing clean instead of upgrading (will remove app data)...{Color.RESET}")
+                clean_install = True
+
             if clean_install:
-                print(f"{Color.YELLOW}Clean install requested (will remove app data){Color.RESET}")
-                # Extract package name from APK
-                package_name = Deployer._get_android_package_name(apk_path)
                 if package_name:
-                    Deployer.uninstall_android(package_name)
+                    Deployer.uninstall_android(package_name, serial)
+                success, error = Deployer._install_apk(apk_path, serial, replace=False)
+                if success:
+                    Deployer._installed_android_app_changed(apk_path, serial)
+                    print(f"{Color.GREEN}{prefix}✓ Successfully installed (clean install){Color.RESET}")
+                    return True
+                print(f"{Color.RED}{prefix}✗ Installation failed{Color.RESET}")
+                print(error)
+                return False
+
+            if fast and Deployer._fast_install(apk_path, serial, package_name):
+                Deployer._installed_android_app_changed(apk_path, serial)
+                return True
 
             # Try to upgrade first (preserves data)
-            print(f"{Color.CYAN}Attempting upgrade (preserves app data)...{Color.RESET}")
-            result = subprocess.run(
-                ["adb", "install", "-r", str(apk_path)],
-                capture_output=True,
-                text=True
-            )
+            print(f"{Color.CYAN}{prefix}Attempting upgrade (preserves app data)...{Color.RESET}")
+            success, error = Deployer._install_apk(apk_path, serial, replace=True)
 
-            if result.returncode == 0:
-                print(f"{Color.GREEN}✓ Successfully installed{Color.RESET}")
+            if success:
+                Deployer._installed_android_app_changed(apk_path, serial)
+                print(f"{Color.GREEN}{prefix}✓ Successfully installed{Color.RESET}")
                 return True
 
-            # Check if failure is due to signature mismatch
-            stderr_lower = result.stderr.lower()
+            # Signatures could not be compared up front: check if failure is
+            # due to signature mismatch
+            stderr_lower = error.lower()
             is_signature_error = any(keyword in stderr_lower for keyword in [
                 "install_failed_update_incompatible",
                 "signatures do not match",
@@ -435,245 +2509,2419 @@ class Deployer:
             ])
 
             if is_signature_error:
-                print(f"{Color.YELLOW}⚠ Signature mismatch detected (different signing key){Color.RESET}")
-                print(f"{Color.YELLOW}Falling back to clean install (will remove app data)...{Color.RESET}")
+                print(f"{Color.YELLOW}{prefix}⚠ Signature mismatch detected (different signing key){Color.RESET}")
+                print(f"{Color.YELLOW}{prefix}Falling back to clean install (will remove app data)...{Color.RESET}")
 
-                # Extract package name and uninstall
-                package_name = Deployer._get_android_package_name(apk_path)
                 if package_name:
-                    Deployer.uninstall_android(package_name)
+                    Deployer.uninstall_android(package_name, serial)
 
                 # Try installing again
-                result = subprocess.run(
-                    ["adb", "install", str(apk_path)],
-                    capture_output=True,
-                    text=True
-                )
+                success, error = Deployer._install_apk(apk_path, serial, replace=False)
 
-                if result.returncode == 0:
-                    print(f"{Color.GREEN}✓ Successfully installed (clean install){Color.RESET}")
+                if success:
+                    Deployer._installed_android_app_changed(apk_path, serial)
+                    print(f"{Color.GREEN}{prefix}✓ Successfully installed (clean install){Color.RESET}")
                     return True
                 else:
-                    print(f"{Color.RED}✗ Installation failed after uninstall{Color.RESET}")
-                    print(result.stderr)
+                    print(f"{Color.RED}{prefix}✗ Installation failed after uninstall{Color.RESET}")
+                    print(error)
                     return False
             else:
                 # Different error, show it
-                print(f"{Color.RED}✗ Installation failed{Color.RESET}")
-                print(result.stderr)
+                print(f"{Color.RED}{prefix}✗ Installation failed{Color.RESET}")
+                print(error)
                 return False
 
         except subprocess.CalledProcessError as e:
-            print(f"{Color.RED}✗ Deployment failed: {e}{Color.RESET}")
+            print(f"{Color.RED}{prefix}✗ Deployment failed: {e}{Color.RESET}")
             return False
 
     @staticmethod
-    def _get_android_package_name(apk_path: Path) -> Optional[str]:
-        """Extract package name from APK using aapt"""
+    def deploy_android_fanout(apk_path: Installable, serials: List[str], clean_install: bool = False,
+                              parallel: int = DEFAULT_PARALLEL_INSTALLS, force: bool = False,
+                              fast: bool = False) -> List[DeviceResult]:
+        """Install one APK on several Android devices concurrently
+
+        Each device runs the full deploy_android flow, including its own
+        signature-mismatch fallback. Results keep the order of serials.
+        """
+        def deploy_one(serial: str) -> DeviceResult:
+            return Deployer.deploy_android_device(apk_path, serial, clean_install, force, fast)
+
+        print(f"\n{Color.CYAN}Installing on {len(serials)} device(s), "
+              f"{min(parallel, len(serials))} at a time...{Color.RESET}")
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            return list(pool.map(deploy_one, serials))
+
+    @staticmethod
+    def deploy_android_device(apk_path: Installable, serial: str, clean_install: bool = False,
+                              force: bool = False, fast: bool = False) -> DeviceResult:
+        """Deploy to one device of several, timing it and reporting identical builds as skipped"""
+        start = time.perf_counter()
         try:
-            # Try to use aapt to get package name
-            result = subprocess.run(
-                ["aapt", "dump", "badging", str(apk_path)],
+            apk_path = Deployer.resolve_apk(apk_path, serial)
+            if apk_path is None:
+                return DeviceResult(serial, False, time.perf_counter() - start)
+            if not force and not clean_install and Deployer.skip_identical_android(apk_path, serial):
+                return DeviceResult(serial, True, time.perf_counter() - start, skipped=True)
+            success = Deployer.deploy_android(apk_path, clean_install=clean_install, serial=serial,
+                                              force=True, fast=fast)
+        except OSError as e:
+            print(f"{Color.RED}[{serial}] ✗ Deployment failed: {e}{Color.RESET}")
+            success = False
+        return DeviceResult(serial, success, time.perf_counter() - start)
+
+    @staticmethod
+    @PROFILER.phase("startup benchmark")
+    def measure_cold_starts(serial: str, launches: int) -> StartupResult:
+        """Force-stop and launch the app `launches` times, collecting am start -W timings"""
+        adb = Deployer._adb(serial)
+        result = StartupResult(serial)
+        for _ in range(launches):
+            run_command(adb + ["shell", "am", "force-stop", ANDROID_PACKAGE], capture_output=True)
+            launch = run_command(adb + ["shell", "am", "start", "-W", "-n", ANDROID_ACTIVITY],
+                                 name="adb am start", capture_output=True, text=True)
+            total = re.search(r"^TotalTime:\s*(\d+)", launch.stdout, re.MULTILINE)
+            wait = re.search(r"^WaitTime:\s*(\d+)", launch.stdout, re.MULTILINE)
+            if launch.returncode != 0 or "Error" in launch.stdout or not total:
+                result.failed += 1
+                continue
+            result.total_ms.append(int(total.group(1)))
+            if wait:
+                result.wait_ms.append(int(wait.group(1)))
+        return result
+
+    @staticmethod
+    @PROFILER.phase("capture")
+    def capture_telemetry(serial: str, seconds: int, trace_dir: Optional[Path] = None) -> CaptureResult:
+        """Launch the app, let it run for `seconds`, then read its frame and memory stats
+
+        Frame stats are reset at launch, so they cover exactly the capture
+        window. With trace_dir, a Perfetto trace of the window is recorded
+        on the device and pulled into trace_dir.
+        """
+        adb = Deployer._adb(serial)
+        prefix = Deployer._prefix(serial)
+        result = CaptureResult(serial)
+
+        launch = run_command(adb + ["shell", "am", "start", "-W", "-n", ANDROID_ACTIVITY],
+                             name="adb am start", capture_output=True, text=True)
+        if launch.returncode != 0 or "Error" in launch.stdout:
+            result.error = "launch failed"
+            return result
+        run_command(adb + ["shell", "dumpsys", "gfxinfo", ANDROID_PACKAGE, "reset"], capture_output=True)
+
+        sdk = Deployer.get_device_sdk(serial)
+        if trace_dir and sdk and sdk >= PERFETTO_MIN_SDK:
+            # The trace runs in the foreground for the capture window
+            remote = f"/data/misc/perfetto-traces/repertoire-coach-{os.getpid()}.perfetto-trace"
+            trace = run_command(
+                adb + ["shell", "perfetto", "-o", remote, "-t", f"{seconds}s", "-b", "64mb",
+                       "-a", ANDROID_PACKAGE, "sched", "freq", "idle", "am", "wm", "gfx", "view",
+                       "dalvik", "audio", "memory"],
+                capture_output=True, text=True
+            )
+            local = trace_dir / f"{serial.replace(':', '_')}.perfetto-trace"
+            if trace.returncode == 0 and run_command(adb + ["pull", remote, str(local)],
+                                                     capture_output=True).returncode == 0:
+                result.trace = str(local)
+            else:
+                print(f"{Color.YELLOW}{prefix}⚠ Perfetto trace failed, continuing without it{Color.RESET}")
+            run_command(adb + ["shell", "rm", "-f", remote], capture_output=True)
+        else:
+            if trace_dir:
+                print(f"{Color.YELLOW}{prefix}⚠ Perfetto needs Android SDK {PERFETTO_MIN_SDK}+, "
+                      f"device has {sdk or 'unknown'}{Color.RESET}")
+            time.sleep(seconds)
+
+        gfxinfo = run_command(adb + ["shell", "dumpsys", "gfxinfo", ANDROID_PACKAGE],
+                              capture_output=True, text=True)
+        meminfo = run_command(adb + ["shell", "dumpsys", "meminfo", ANDROID_PACKAGE],
+                              capture_output=True, text=True)
+        result.read_gfxinfo(gfxinfo.stdout)
+        result.read_meminfo(meminfo.stdout)
+        if result.frames is None and result.pss_kb is None:
+            result.error = "app not running"
+        return result
+
+    @staticmethod
+    def _get_android_package_name(apk_path: DeviceApk) -> Optional[str]:
+        """Extract package name from APK"""
+        info = Deployer.get_apk_info(apk_path)
+        if info:
+            return info.package
+
+        # Fallback to hardcoded package name for this app
+        return ANDROID_PACKAGE
+
+    @staticmethod
+    def get_apk_info(apk_path: DeviceApk) -> Optional[ApkInfo]:
+        """Read package name, version, SDK levels, ABIs and signature of an APK"""
+        if isinstance(apk_path, ApkSet):
+            apk_path = apk_path.base
+        return ApkInspector.inspect(apk_path)
+
+    # Installed package identity per (serial, package), for this session.
+    # Kept up to date by our own installs and uninstalls.
+    _installed: Dict[Tuple[Optional[str], str], Optional[ApkInfo]] = {}
+    _installed_lock = threading.Lock()
+
+    @staticmethod
+    def get_installed_android_app(package_name: str, serial: Optional[str] = None) -> Optional[ApkInfo]:
+        """Version and signature of the installed package (None if not installed), cached per session"""
+        key = (serial, package_name)
+        with Deployer._installed_lock:
+            if key in Deployer._installed:
+                return Deployer._installed[key]
+        info = Deployer._read_installed_android_app(package_name, serial)
+        Deployer._remember_installed(serial, package_name, info)
+        return info
+
+    @staticmethod
+    def _remember_installed(serial: Optional[str], package_name: str, info: Optional[ApkInfo]):
+        with Deployer._installed_lock:
+            Deployer._installed[(serial, package_name)] = info
+
+    @staticmethod
+    def _installed_android_app_changed(apk_path: DeviceApk, serial: Optional[str]):
+        """Record that apk_path is now what the device runs"""
+        apk = Deployer.get_apk_info(apk_path)
+        if apk:
+            Deployer._remember_installed(serial, apk.package, ApkInfo(
+                apk.package, apk.version_code, apk.version_name, apk.signature))
+        else:
+            Deployer.forget_android_device(serial)
+
+    @staticmethod
+    def forget_android_device(serial: Optional[str]):
+        """Drop cached package state, SDK level and ABIs of a device, e.g. when it is unplugged"""
+        with Deployer._installed_lock:
+            for key in [key for key in Deployer._installed if key[0] == serial]:
+                del Deployer._installed[key]
+        Deployer._device_sdk.pop(serial, None)
+        Deployer._device_abis.pop(serial, None)
+
+    @staticmethod
+    def preflight_android(apk_path: DeviceApk, serial: Optional[str] = None) -> Optional[bool]:
+        """Tell from signatures alone whether an upgrade would be rejected
+
+        Returns True if the installed app is signed with a different key than
+        the APK, False if it is signed with the same key or not installed,
+        and None if either signature is unknown. No APK bytes are sent.
+        """
+        apk = Deployer.get_apk_info(apk_path)
+        if not apk or not apk.signature:
+            return None
+        installed = Deployer.get_installed_android_app(apk.package, serial)
+        if installed is None:
+            return False
+        if not installed.signature:
+            return None
+        return installed.signature != apk.signature
+
+    @staticmethod
+    def _read_installed_android_app(package_name: str, serial: Optional[str] = None) -> Optional[ApkInfo]:
+        """Read version and signature of the installed package from dumpsys"""
+        try:
+            result = run_command(
+                Deployer._adb(serial) + ["shell", "dumpsys", "package", package_name],
                 capture_output=True,
                 text=True
             )
+        except OSError:
+            return None
 
-            if result.returncode == 0:
-                # Parse output for package name
-                for line in result.stdout.split('\n'):
-                    if line.startswith("package:"):
-                        match = re.search(r"name='([^']+)'", line)
-                        if match:
-                            return match.group(1)
-
-        except FileNotFoundError:
-            # aapt not available, use hardcoded package name for this app
-            pass
+        # Only look at the section describing this package
+        section = result.stdout.split(f"Package [{package_name}]", 1)
+        if result.returncode != 0 or len(section) < 2:
+            return None
+        section = section[1]
+
+        code = re.search(r"versionCode=(\d+)", section)
+        version = re.search(r"versionName=(\S+)", section)
+        signature = re.search(r"signatures:\[([0-9a-f]+)", section)
+        return ApkInfo(
+            package=package_name,
+            version_code=int(code.group(1)) if code else None,
+            version_name=version.group(1) if version else None,
+            signature=signature.group(1) if signature else None
+        )
 
-        # Fallback to hardcoded package name for this app
-        return "com.repertoirecoach.repertoire_coach"
+    @staticmethod
+    @PROFILER.phase("identity check")
+    def skip_identical_android(apk_path: DeviceApk, serial: Optional[str] = None) -> bool:
+        """Report and return True if the device already runs exactly this APK
+
+        Version code, version name and signing certificate must all be known
+        and equal; anything unknown means the APK gets installed.
+        """
+        apk = Deployer.get_apk_info(apk_path)
+        if not apk or apk.version_code is None or not apk.signature:
+            return False
+
+        # dumpsys does not report SDK levels or ABIs, so compare what it does
+        installed = Deployer.get_installed_android_app(apk.package, serial)
+        if installed is None or (installed.version_code, installed.version_name, installed.signature) != \
+                (apk.version_code, apk.version_name, apk.signature):
+            return False
+
+        prefix = Deployer._prefix(serial)
+        print(f"{Color.GREEN}{prefix}✓ Identical build already installed "
+              f"(versionCode {apk.version_code}, versionName {apk.version_name}, "
+              f"signature {apk.signature}){Color.RESET}")
+        print(f"{prefix}Skipping install. Use --force to reinstall anyway.")
+        return True
+
+    @staticmethod
+    def get_ipa_info(ipa_path: Path) -> Optional[IosAppInfo]:
+        """Read bundle ID and version from the IPA's Info.plist"""
+        try:
+            with zipfile.ZipFile(ipa_path) as zf:
+                names = [n for n in zf.namelist()
+                         if re.fullmatch(r"Payload/[^/]+\.app/Info\.plist", n)]
+                if not names:
+                    return None
+                plist = plistlib.loads(zf.read(names[0]))
+        except (OSError, zipfile.BadZipFile, plistlib.InvalidFileException):
+            return None
+
+        if "CFBundleIdentifier" not in plist:
+            return None
+        return IosAppInfo(
+            bundle_id=plist["CFBundleIdentifier"],
+            bundle_version=plist.get("CFBundleVersion"),
+            short_version=plist.get("CFBundleShortVersionString")
+        )
+
+    @staticmethod
+    def get_installed_ios_app(bundle_id: str, udid: Optional[str] = None) -> Optional[IosAppInfo]:
+        """Look up an installed app's version with ideviceinstaller"""
+        if not shutil.which("ideviceinstaller"):
+            return None
+
+        try:
+            result = run_command(
+                ["ideviceinstaller"] + Deployer._udid_args("ideviceinstaller", udid) + ["-l", "-o", "xml"],
+                capture_output=True,
+                timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+
+        try:
+            apps = plistlib.loads(result.stdout)
+        except (plistlib.InvalidFileException, ValueError):
+            # Plain listing: CFBundleIdentifier, "CFBundleVersion", "CFBundleDisplayName"
+            for line in result.stdout.decode(errors="replace").splitlines():
+                match = re.match(r'(\S+), "([^"]*)"', line)
+                if match and match.group(1) == bundle_id:
+                    return IosAppInfo(bundle_id, bundle_version=match.group(2))
+            return None
+
+        for app in apps:
+            if app.get("CFBundleIdentifier") == bundle_id:
+                return IosAppInfo(
+                    bundle_id=bundle_id,
+                    bundle_version=app.get("CFBundleVersion"),
+                    short_version=app.get("CFBundleShortVersionString")
+                )
+        return None
 
     @staticmethod
-    def deploy_ios(ipa_path: Path, clean_install: bool = False) -> bool:
+    @PROFILER.phase("identity check")
+    def skip_identical_ios(ipa_path: Path, udid: Optional[str] = None) -> bool:
+        """Report and return True if the device already has this bundle version"""
+        ipa = Deployer.get_ipa_info(ipa_path)
+        if not ipa or not ipa.bundle_version:
+            return False
+
+        installed = Deployer.get_installed_ios_app(ipa.bundle_id, udid)
+        if not installed or installed.bundle_version != ipa.bundle_version:
+            return False
+        # The plain listing has no short version; compare it when available
+        if installed.short_version and installed.short_version != ipa.short_version:
+            return False
+
+        prefix = Deployer._prefix(udid)
+        print(f"{Color.GREEN}{prefix}✓ Identical build already installed "
+              f"({ipa.bundle_id} {ipa.short_version or ''} ({ipa.bundle_version})){Color.RESET}")
+        print(f"{prefix}Skipping install. Use --force to reinstall anyway.")
+        return True
+
+    @staticmethod
+    @PROFILER.phase("deploy ios")
+    def deploy_ios(ipa_path: Path, clean_install: bool = False, force: bool = False,
+                   udid: Optional[str] = None) -> bool:
         """Deploy IPA to iOS device
 
         Args:
             ipa_path: Path to the IPA file
             clean_install: If True, uninstall existing app first (removes all data).
                           If False (default), upgrade existing app if possible.
+            force: Install even if the device already has the same bundle version.
+            udid: Target this device; if None the tool picks the only/first device.
 
         Note: iOS upgrade behavior depends on the tool:
         - ideviceinstaller -i: Upgrades if same bundle ID, preserves some data
         - ios-deploy --bundle: Similar upgrade behavior
         """
-        print(f"\n{Color.CYAN}Deploying {ipa_path.name}...{Color.RESET}")
+        prefix = Deployer._prefix(udid)
+        print(f"\n{Color.CYAN}{prefix}Deploying {ipa_path.name}...{Color.RESET}")
+
+        if not force and not clean_install and Deployer.skip_identical_ios(ipa_path, udid):
+            return True
 
         if clean_install:
-            print(f"{Color.YELLOW}⚠ Clean install requested - app data may be removed{Color.RESET}")
+            print(f"{Color.YELLOW}{prefix}⚠ Clean install requested - app data may be removed{Color.RESET}")
 
         # Try ideviceinstaller first
         if shutil.which("ideviceinstaller"):
+            target = Deployer._udid_args("ideviceinstaller", udid)
             try:
                 # Note: ideviceinstaller -i will upgrade if the bundle ID matches
                 # Use -U flag only if clean_install is requested (uninstall then install)
                 if clean_install:
-                    result = subprocess.run(
-                        ["ideviceinstaller", "-U", "-i", str(ipa_path)],
+                    result = run_command(
+                        ["ideviceinstaller"] + target + ["-U", "-i", str(ipa_path)],
+                        name="ideviceinstaller install",
+                        bytes_sent=ipa_path.stat().st_size,
                         capture_output=True,
                         text=True
                     )
                 else:
-                    print(f"{Color.CYAN}Installing IPA (will upgrade if already installed)...{Color.RESET}")
-                    result = subprocess.run(
-                        ["ideviceinstaller", "-i", str(ipa_path)],
+                    print(f"{Color.CYAN}{prefix}Installing IPA (will upgrade if already installed)...{Color.RESET}")
+                    result = run_command(
+                        ["ideviceinstaller"] + target + ["-i", str(ipa_path)],
+                        name="ideviceinstaller install",
+                        bytes_sent=ipa_path.stat().st_size,
                         capture_output=True,
                         text=True
                     )
 
                 if result.returncode == 0:
-                    print(f"{Color.GREEN}✓ Successfully installed{Color.RESET}")
+                    print(f"{Color.GREEN}{prefix}✓ Successfully installed{Color.RESET}")
                     return True
                 else:
-                    print(f"{Color.RED}✗ Installation failed{Color.RESET}")
+                    print(f"{Color.RED}{prefix}✗ Installation failed{Color.RESET}")
                     print(result.stderr)
                     return False
 
             except subprocess.CalledProcessError as e:
-                print(f"{Color.RED}✗ Deployment failed: {e}{Color.RESET}")
+                print(f"{Color.RED}{prefix}✗ Deployment failed: {e}{Color.RESET}")
                 return False
 
         # Try ios-deploy as fallback
         if shutil.which("ios-deploy"):
             try:
                 # ios-deploy doesn't have a clean uninstall option in the same command
-                print(f"{Color.CYAN}Installing IPA (will upgrade if already installed)...{Color.RESET}")
-                result = subprocess.run(
-                    ["ios-deploy", "--bundle", str(ipa_path)],
+                print(f"{Color.CYAN}{prefix}Installing IPA (will upgrade if already installed)...{Color.RESET}")
+                result = run_command(
+                    ["ios-deploy"] + Deployer._udid_args("ios-deploy", udid) + ["--bundle", str(ipa_path)],
+                    name="ios-deploy install",
                     capture_output=True,
                     text=True
                 )
 
                 if result.returncode == 0:
-                    print(f"{Color.GREEN}✓ Successfully installed{Color.RESET}")
+                    print(f"{Color.GREEN}{prefix}✓ Successfully installed{Color.RESET}")
                     return True
                 else:
-                    print(f"{Color.RED}✗ Installation failed{Color.RESET}")
+                    print(f"{Color.RED}{prefix}✗ Installation failed{Color.RESET}")
                     print(result.stderr)
                     return False
 
-            except subprocess.CalledProcessError as e:
-                print(f"{Color.RED}✗ Deployment failed: {e}{Color.RESET}")
-                return False
+            except subprocess.CalledProcessError as e:
+                print(f"{Color.RED}{prefix}✗ Deployment failed: {e}{Color.RESET}")
+                return False
+
+        print(f"{Color.RED}✗ No iOS deployment tool available{Color.RESET}")
+        return False
+
+    @staticmethod
+    def deploy_ios_device(ipa_path: Path, udid: str, clean_install: bool = False,
+                          force: bool = False) -> DeviceResult:
+        """Deploy to one iOS device of several, timing it and reporting identical builds as skipped"""
+        start = time.perf_counter()
+        try:
+            if not force and not clean_install and Deployer.skip_identical_ios(ipa_path, udid):
+                return DeviceResult(udid, True, time.perf_counter() - start, skipped=True)
+            success = Deployer.deploy_ios(ipa_path, clean_install=clean_install, force=True, udid=udid)
+        except OSError as e:
+            print(f"{Color.RED}[{udid}] ✗ Deployment failed: {e}{Color.RESET}")
+            success = False
+        return DeviceResult(udid, success, time.perf_counter() - start)
+
+    @staticmethod
+    def deploy_ios_fanout(ipa_path: Path, udids: List[str], clean_install: bool = False,
+                          parallel: int = DEFAULT_PARALLEL_INSTALLS, force: bool = False) -> List[DeviceResult]:
+        """Install one IPA on several iOS devices concurrently; results keep the order of udids"""
+        def deploy_one(udid: str) -> DeviceResult:
+            return Deployer.deploy_ios_device(ipa_path, udid, clean_install, force)
+
+        print(f"\n{Color.CYAN}Installing on {len(udids)} device(s), "
+              f"{min(parallel, len(udids))} at a time...{Color.RESET}")
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            return list(pool.map(deploy_one, udids))
+
+    @staticmethod
+    @PROFILER.phase("artifact download")
+    def download_github_artifact(build: Build, temp_dir: Path,
+                                 store: Optional[ArtifactStore] = None) -> Optional[Installable]:
+        """Download artifact from GitHub Actions
+
+        The artifact archive comes from the persistent store when cached.
+        Android APKs are returned as an ArtifactMember (or AbiSplits of them)
+        and streamed into adb from the archive; App Bundles and IPAs are
+        extracted alone into temp_dir.
+        """
+        store = store or ArtifactStore(user_cache_dir() / "artifacts")
+        print(f"\n{Color.CYAN}Downloading build from GitHub Actions...{Color.RESET}")
+        run_display = f"#{build.run_number}" if build.run_number else f"ID {build.run_id}"
+        print(f"  Run: {run_display}")
+        print(f"  Artifact: {build.artifact_name}")
+
+        try:
+            archive = store.fetch(build)
+            if build.platform == Platform.WEB:
+                return Deployer.extract_web_build(archive, temp_dir)
+            suffix = ".apk" if build.platform == Platform.ANDROID else ".ipa"
+
+            # Find the build file from the ZIP central directory. Artifacts
+            # that wrap another ZIP get only that inner ZIP extracted.
+            archives = [archive]
+            listed = []
+            while archives:
+                current = archives.pop(0)
+                with zipfile.ZipFile(current, 'r') as zf:
+                    infos = [info for info in zf.infolist() if not info.is_dir()]
+                listed.extend(info.filename for info in infos)
+
+                members = [ArtifactMember(current, info.filename, info.file_size, info.CRC)
+                           for info in infos if info.filename.lower().endswith(suffix)]
+                if members and build.platform == Platform.ANDROID:
+                    # Streamed straight into adb, never written out. A
+                    # --split-per-abi build is resolved per device later.
+                    split_groups = AbiSplits.group(members)
+                    found = next(iter(split_groups.values())) if split_groups else members[0]
+                    print(f"{Color.GREEN}✓ Found {found.name}{Color.RESET}")
+                    return found
+                if members:
+                    print(f"{Color.GREEN}✓ Found {members[0].name}{Color.RESET}")
+                    return members[0].extract(temp_dir)
+
+                # bundletool needs the App Bundle as a file of its own
+                bundles = [info for info in infos if info.filename.lower().endswith(".aab")]
+                if bundles and build.platform == Platform.ANDROID:
+                    bundle = ArtifactMember(current, bundles[0].filename, bundles[0].file_size, bundles[0].CRC)
+                    print(f"{Color.GREEN}✓ Found {bundle.name}{Color.RESET}")
+                    return bundle.extract(temp_dir)
+
+                for info in infos:
+                    if info.filename.lower().endswith(".zip"):
+                        print(f"{Color.CYAN}Extracting {PurePosixPath(info.filename).name}...{Color.RESET}")
+                        archives.append(ArtifactMember(current, info.filename, info.file_size).extract(temp_dir))
+
+            print(f"{Color.RED}✗ Build file not found in artifact{Color.RESET}")
+            print(f"\nFiles in artifact:")
+            for name in listed:
+                print(f"  - {name}")
+            return None
+
+        except ArtifactError as e:
+            print(f"{Color.RED}✗ Download failed: {e}{Color.RESET}")
+            return None
+        except zipfile.BadZipFile as e:
+            print(f"{Color.RED}✗ Failed to extract ZIP: {e}{Color.RESET}")
+            return None
+
+    @staticmethod
+    def extract_web_build(archive: Path, temp_dir: Path) -> Optional[Path]:
+        """Unpack a web build artifact; returns the directory holding its index.html"""
+        web_dir = temp_dir / "web"
+        with zipfile.ZipFile(archive) as zf:
+            index = min((name for name in zf.namelist() if PurePosixPath(name).name == "index.html"),
+                        key=lambda name: name.count("/"), default=None)
+            if index is None:
+                print(f"{Color.RED}✗ No index.html in the web artifact{Color.RESET}")
+                return None
+            zf.extractall(web_dir)
+        root = web_dir / PurePosixPath(index).parent
+        print(f"{Color.GREEN}✓ Extracted web build ({sum(1 for p in root.rglob('*') if p.is_file())} files){Color.RESET}")
+        return root
+
+
+def print_device_results(results: List[DeviceResult]):
+    """Print a per-device result and timing table"""
+    width = max([len("Device")] + [len(r.device) for r in results])
+    print(f"\n{Color.BOLD}{'Device':<{width}}  Result    Time{Color.RESET}")
+    for r in results:
+        if r.skipped:
+            status = f"{Color.GREEN}= same  {Color.RESET}"
+        elif r.success:
+            status = f"{Color.GREEN}✓ ok    {Color.RESET}"
+        else:
+            status = f"{Color.RED}✗ failed{Color.RESET}"
+        print(f"{r.device:<{width}}  {status}  {r.seconds:6.1f}s")
+
+    ok_count = sum(1 for r in results if r.success)
+    slowest = max((r.seconds for r in results), default=0.0)
+    print(f"\n{ok_count}/{len(results)} device(s) succeeded (slowest {slowest:.1f}s)")
+
+
+def show_menu(builds: List[Build], feed: Optional["BuildFeed"] = None) -> Optional[Build]:
+    """Show interactive menu for build selection
+
+    With a feed, older GitHub builds keep loading in the background;
+    pressing Enter lists the ones that arrived since.
+    """
+    if not builds:
+        print(f"{Color.YELLOW}No builds available{Color.RESET}")
+        return None
+
+    builds = list(builds)
+    print(f"\n{Color.BOLD}Available builds:{Color.RESET}\n")
+
+    for i, build in enumerate(builds, 1):
+        print(f"[{Color.CYAN}{i}{Color.RESET}] {build}\n")
+
+    while True:
+        loading = feed is not None and not feed.done
+        if loading:
+            print(f"{Color.YELLOW}Loading older GitHub runs... press Enter to show new builds{Color.RESET}")
+
+        try:
+            choice = input(f"Select build to deploy [1-{len(builds)}] (or 'q' to quit): ").strip()
+
+            if choice.lower() == 'q':
+                return None
+
+            if not choice and feed is not None:
+                new_builds = feed.drain()
+                for i, build in enumerate(new_builds, len(builds) + 1):
+                    print(f"[{Color.CYAN}{i}{Color.RESET}] {build}\n")
+                builds.extend(new_builds)
+                if not new_builds and feed.done:
+                    print(f"{Color.YELLOW}No more builds{Color.RESET}")
+                continue
+
+            index = int(choice) - 1
+            if 0 <= index < len(builds):
+                return builds[index]
+            else:
+                print(f"{Color.YELLOW}Invalid choice. Please enter a number between 1 and {len(builds)}{Color.RESET}")
+
+        except ValueError:
+            print(f"{Color.YELLOW}Invalid input. Please enter a number or 'q'{Color.RESET}")
+        except KeyboardInterrupt:
+            print("\n")
+            return None
+
+
+def run_in_background(fn, *args) -> Future:
+    """Run fn(*args) on a daemon thread and return a Future for its result
+
+    Daemon threads keep an early exit (e.g. no device connected) from
+    waiting for discovery that is still in flight.
+    """
+    future: Future = Future()
+
+    def runner():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=runner, daemon=True).start()
+    return future
+
+
+class BuildFeed:
+    """GitHub builds arriving page by page from a background thread
+
+    Pages are filtered with `accept` and handed out in arrival order, so
+    the menu can show the newest runs while older pages are still loading.
+    """
+
+    def __init__(self, pages: Iterator[List[Build]], accept: Callable[[Build], bool] = lambda b: True):
+        self.accept = accept
+        self.done = False
+        self._pages: "queue.Queue[Optional[List[Build]]]" = queue.Queue()
+        threading.Thread(target=self._run, args=(pages,), daemon=True).start()
+
+    def _run(self, pages: Iterator[List[Build]]):
+        try:
+            for page in pages:
+                self._pages.put(page)
+        finally:
+            self._pages.put(None)
+
+    def _take(self, block: bool) -> Optional[List[Build]]:
+        """Next filtered page, or None if the feed is finished or (non-blocking) empty"""
+        if self.done:
+            return None
+        try:
+            page = self._pages.get(block=block)
+        except queue.Empty:
+            return None
+        if page is None:
+            self.done = True
+            return None
+        return [b for b in page if self.accept(b)]
+
+    def drain(self) -> List[Build]:
+        """All builds that have arrived so far, without waiting"""
+        builds = []
+        while (page := self._take(block=False)) is not None:
+            builds.extend(page)
+        return builds
+
+    def wait_first(self) -> List[Build]:
+        """Wait until at least one build arrived (or the feed ended) and return what is there"""
+        builds = []
+        while not builds and (page := self._take(block=True)) is not None:
+            builds.extend(page)
+        return builds + self.drain()
+
+    def wait_all(self) -> List[Build]:
+        """Wait for every remaining page"""
+        builds = []
+        while (page := self._take(block=True)) is not None:
+            builds.extend(page)
+        return builds
+
+
+class Inotify:
+    """Minimal inotify(7) binding through ctypes (Linux only)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_IGNORED = 0x00008000
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: Dict[int, Path] = {}
+
+    def add_watch(self, path: Path, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.watches[wd] = path
+        return wd
+
+    def read(self, timeout: float) -> List[Tuple[Path, int, str]]:
+        """Wait up to timeout seconds and return (watched dir, mask, name) events"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+
+            path = self.watches.get(wd)
+            if mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+            if path is not None:
+                events.append((path, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LocalBuildWatcher:
+    """Report new or rewritten build packages in a local build directory
+
+    Uses inotify where available: the directory is watched for completed
+    writes and renames, and while it does not exist yet its nearest existing
+    parent is watched for it to appear (e.g. after `flutter clean`).
+    Elsewhere the directory is polled for changed files.
+    """
+
+    def __init__(self, directory: Path, suffix: str, emit: Callable[[Path], None],
+                 poll_interval: float = 2.0):
+        self.directory = directory
+        self.suffix = suffix
+        self.emit = emit
+        self.poll_interval = poll_interval
+
+    def start(self) -> "LocalBuildWatcher":
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            inotify = Inotify()
+        except OSError:
+            self._poll()
+            return
+        self._watch(inotify)
+
+    def _watch(self, inotify: Inotify):
+        files = Inotify.IN_CLOSE_WRITE | Inotify.IN_MOVED_TO
+        dirs = Inotify.IN_CREATE | Inotify.IN_MOVED_TO
+
+        def arm():
+            watched = set(inotify.watches.values())
+            if self.directory.is_dir():
+                if self.directory not in watched:
+                    inotify.add_watch(self.directory, files)
+                return
+            parent = self.directory.parent
+            while not parent.is_dir():
+                parent = parent.parent
+            if parent not in watched:
+                inotify.add_watch(parent, dirs)
+
+        arm()
+        while True:
+            rearm = False
+            for path, mask, name in inotify.read(timeout=60):
+                if path == self.directory and name.endswith(self.suffix) and mask & files:
+                    self._report(path / name)
+                else:
+                    # A parent changed or the directory went away
+                    rearm = True
+            if rearm:
+                try:
+                    arm()
+                except OSError:
+                    pass  # Raced with a delete; the next event re-arms
+
+    def _report(self, path: Path):
+        try:
+            self.emit(path)
+        except OSError as e:
+            # Deleted or renamed since the event (flutter clean, a Gradle
+            # rename); the thread must survive to see the next build
+            print(f"{Color.YELLOW}Warning: Skipping {path.name}: {e}{Color.RESET}")
+
+    def _snapshot(self) -> Dict[Path, Tuple[float, int]]:
+        snapshot = {}
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime, st.st_size)
+        return snapshot
+
+    def _poll(self):
+        known = self._snapshot()
+        while True:
+            time.sleep(self.poll_interval)
+            current = self._snapshot()
+            for path, signature in current.items():
+                if known.get(path) != signature:
+                    self._report(path)
+            known = current
+
+
+class GitHubRunWatcher:
+    """Report builds of newly completed successful runs
+
+    The newest page of runs is polled with a conditional request, so an
+    unchanged listing costs a 304. The interval grows by half while nothing
+    changes (doubles on errors) up to max_interval and drops back to
+    interval when a new run shows up. Runs present at startup are not
+    reported.
+    """
+
+    def __init__(self, finder: BuildFinder, plt: Platform, run_filter: RunFilter,
+                 emit: Callable[[Build], None], interval: float = DEFAULT_POLL_INTERVAL,
+                 max_interval: float = WATCH_MAX_INTERVAL):
+        self.finder = finder
+        self.platform = plt
+        self.run_filter = run_filter
+        self.emit = emit
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+
+    def start(self) -> "GitHubRunWatcher":
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        seen = None
+        delay = self.interval
+
+        while True:
+            try:
+                runs = self.finder.get_github_runs(self.run_filter, RUNS_PAGE_SIZE, ttl=0)
+                new_runs = [run for run in runs if seen is not None and run["id"] not in seen]
+                seen = (seen or set()) | {run["id"] for run in runs}
+
+                if new_runs:
+                    # Oldest first, so builds are deployed in the order they finished
+                    for build in reversed(self.finder.builds_for_runs(new_runs, self.platform)):
+                        self.emit(build)
+                    delay = self.interval
+                else:
+                    delay = min(delay * 1.5, self.max_interval)
+            except Exception as e:
+                # Anything a flaky network throws (OSError, HTTPException, a
+                # garbled body) must not end the thread: --watch would keep
+                # running without ever seeing CI builds again
+                print(f"{Color.YELLOW}Warning: Polling GitHub failed: {e!r}{Color.RESET}")
+                delay = min(delay * 2, self.max_interval)
+
+            self.finder.api.save()
+            time.sleep(delay)
+
+
+class DeployQueue:
+    """Builds waiting to be deployed in watch mode
+
+    Entries are keyed by build identity: a repeated event for a build that is
+    still waiting replaces it in place instead of queueing a second deploy,
+    and a build arriving during an install waits for its turn. Local files
+    must be quiet for `settle` seconds before they are handed out, so a
+    package still being written is not picked up half-way.
+    """
+
+    def __init__(self, settle: float = WATCH_SETTLE_TIME):
+        self.settle = settle
+        self._pending: Dict[Tuple, Tuple[Build, float]] = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def _key(build: Build) -> Tuple:
+        if build.source == BuildSource.LOCAL:
+            return ("local", str(build.path))
+        return ("github", build.run_id, build.artifact_name)
+
+    def put(self, build: Build):
+        ready_at = time.monotonic() + (self.settle if build.source == BuildSource.LOCAL else 0)
+        with self._cond:
+            self._pending[self._key(build)] = (build, ready_at)
+            self._cond.notify()
+
+    def get(self) -> Build:
+        """Wait for the oldest entry that has settled and remove it"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for key, (build, ready_at) in self._pending.items():
+                    if ready_at <= now:
+                        del self._pending[key]
+                        return build
+                waits = [ready_at - now for _, ready_at in self._pending.values()]
+                # Wake up regularly so Ctrl-C is handled promptly
+                self._cond.wait(timeout=min(waits + [1.0]))
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+
+@dataclass
+class DeviceInfo:
+    """A row of the live device table"""
+    serial: str
+    platform: Platform
+    state: str  # device, unauthorized, offline, ...
+    model: str = ""
+    abi: str = ""
+    status: str = ""  # Provisioning progress in hotplug mode
+
+
+class DeviceTracker:
+    """Live table of attached devices, updated as they come and go
+
+    Android devices come from the streaming `adb track-devices -l` protocol:
+    adb pushes the full device list, prefixed with its length as four hex
+    digits, whenever anything changes, so no polling is needed. iOS devices
+    are enumerated (`idevice_id -l`) every poll_interval seconds.
+
+    on_ready is called (on a worker thread) each time a device becomes
+    usable, after its ABI has been looked up; on_change after every table
+    update.
+    """
+
+    def __init__(self, plt: Platform, on_ready: Optional[Callable[[DeviceInfo], None]] = None,
+                 on_change: Optional[Callable[["DeviceTracker"], None]] = None,
+                 poll_interval: float = 2.0):
+        self.platform = plt
+        self.on_ready = on_ready
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._devices: Dict[str, DeviceInfo] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> "DeviceTracker":
+        target = self._track_android if self.platform == Platform.ANDROID else self._poll_ios
+        threading.Thread(target=target, daemon=True).start()
+        return self
+
+    def snapshot(self) -> List[DeviceInfo]:
+        with self._lock:
+            return [DeviceInfo(**asdict(d)) for d in self._devices.values()]
+
+    def set_status(self, serial: str, status: str, redraw: bool = True):
+        with self._lock:
+            device = self._devices.get(serial)
+            if device:
+                device.status = status
+        if redraw:
+            self._changed()
+
+    def print_table(self):
+        devices = self.snapshot()
+        print(f"\n{Color.BOLD}[{datetime.now():%H:%M:%S}] Devices:{Color.RESET}")
+        if not devices:
+            print("  (none - plug a device in)")
+            return
+        width = max(len(d.serial) for d in devices)
+        print(f"  {'Device':<{width}}  {'State':<12}  {'Model':<20}  {'ABI':<12}  Status")
+        for d in devices:
+            color = Color.GREEN if d.state == "device" else Color.YELLOW
+            print(f"  {d.serial:<{width}}  {color}{d.state:<12}{Color.RESET}  {d.model:<20}  "
+                  f"{d.abi:<12}  {d.status}")
+
+    @staticmethod
+    def parse_device_list(payload: str) -> Dict[str, Tuple[str, str]]:
+        """Parse `adb devices -l` style lines into {serial: (state, model)}"""
+        devices = {}
+        for line in payload.splitlines():
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            props = dict(f.split(":", 1) for f in fields[2:] if ":" in f)
+            devices[fields[0]] = (fields[1], props.get("model", "").replace("_", " "))
+        return devices
+
+    def _track_android(self):
+        while True:
+            try:
+                proc = subprocess.Popen(["adb", "track-devices", "-l"], stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+                while True:
+                    header = proc.stdout.read(4)
+                    if len(header) < 4:
+                        break
+                    payload = proc.stdout.read(int(header, 16)).decode(errors="replace")
+                    self._update(self.parse_device_list(payload))
+                proc.wait()
+            except (OSError, ValueError) as e:
+                print(f"{Color.YELLOW}Warning: adb track-devices failed: {e}{Color.RESET}")
+
+            # adb server restarted or went away: everything is detached until it is back
+            self._update({})
+            time.sleep(self.poll_interval)
+
+    def _poll_ios(self):
+        while True:
+            try:
+                udids = Deployer.list_ios_devices()
+            except OSError:
+                udids = []
+            self._update({udid: ("device", "") for udid in udids})
+            time.sleep(self.poll_interval)
+
+    def _update(self, current: Dict[str, Tuple[str, str]]):
+        """Apply a full device list; start lookups for devices that just became usable
+
+        Devices that became usable are shown once their ABI is known.
+        """
+        ready = []
+        changed = False
+        with self._lock:
+            for serial in list(self._devices):
+                if serial not in current:
+                    del self._devices[serial]
+                    if self.platform == Platform.ANDROID:
+                        Deployer.forget_android_device(serial)
+                    changed = True
+
+            for serial, (state, model) in current.items():
+                device = self._devices.get(serial)
+                if device is not None and device.state == state:
+                    continue
+                if device is None:
+                    device = self._devices[serial] = DeviceInfo(serial, self.platform, state, model)
+                device.state = state
+                device.model = model or device.model
+                if state == "device":
+                    ready.append(serial)
+                else:
+                    changed = True
+
+        if changed:
+            self._changed()
+        for serial in ready:
+            threading.Thread(target=self._device_ready, args=(serial,), daemon=True).start()
+
+    def _device_ready(self, serial: str):
+        model, abi = self._describe(serial)
+        with self._lock:
+            device = self._devices.get(serial)
+            if device is None:
+                return  # Unplugged again meanwhile
+            device.model = device.model or model
+            device.abi = abi
+            info = DeviceInfo(**asdict(device))
+        self._changed()
+        if self.on_ready:
+            self.on_ready(info)
+
+    def _describe(self, serial: str) -> Tuple[str, str]:
+        """Look up (model, primary ABI) of a device"""
+        if self.platform == Platform.ANDROID:
+            result = run_command(Deployer._adb(serial) + ["shell", "getprop", "ro.product.cpu.abi"],
+                                 capture_output=True, text=True)
+            return "", result.stdout.strip() if result.returncode == 0 else ""
+
+        model = ""
+        if shutil.which("ideviceinfo"):
+            result = run_command(["ideviceinfo", "-u", serial, "-k", "ProductType"],
+                                 capture_output=True, text=True)
+            model = result.stdout.strip() if result.returncode == 0 else ""
+        return model, "arm64"
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self)
+
+
+def probe_devices(plt: Platform) -> Tuple[bool, str, List[str]]:
+    """Check for connected devices; returns (ok, message, serials)"""
+    if plt == Platform.WEB:
+        return True, "Web builds are served locally, no device needed", []
+    if plt == Platform.ANDROID:
+        return Deployer.probe_android_devices()
+    return Deployer.probe_ios_devices()
+
+
+def watch(args: argparse.Namespace, plt: Platform, finder: BuildFinder,
+          accept: Callable[[Build], bool], run_filter: RunFilter, use_github: bool) -> int:
+    """Deploy every new local or GitHub build until interrupted"""
+    pending = DeployQueue()
+
+    def enqueue(build: Build):
+        if accept(build):
+            pending.put(build)
+
+    sources = []
+    if not (args.github or args.run_id):
+        directory = finder.local_build_dir(plt)
+        suffix = ".apk" if plt == Platform.ANDROID else ".ipa"
+        LocalBuildWatcher(directory, suffix, lambda path: enqueue(finder.local_build(path, plt))).start()
+        sources.append(str(directory.relative_to(finder.repo_root)))
+    if use_github:
+        GitHubRunWatcher(finder, plt, run_filter, enqueue, args.poll_interval).start()
+        sources.append(f'GitHub "{WORKFLOW_FILE}" runs')
+
+    print(f"\n{Color.BOLD}Watching {' and '.join(sources)} for new builds (Ctrl-C to stop){Color.RESET}")
+    store = ArtifactStore(user_cache_dir() / "artifacts", args.artifact_cache_size, finder.api)
+
+    try:
+        while True:
+            build = pending.get()
+            print(f"\n{Color.CYAN}New build:{Color.RESET} {build}")
+
+            # Devices may have come and gone since the last deploy
+            ok, msg, connected = probe_devices(plt)
+            serials, error = resolve_target_devices(plt, connected, args) if ok else (None, msg)
+            if error:
+                print(f"{error}\n{Color.YELLOW}Skipping this build{Color.RESET}")
+                continue
+
+            if build.source == BuildSource.LOCAL:
+                success = install_build(build.install_source(), plt, args, serials)
+            else:
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    build_file = Deployer.download_github_artifact(build, Path(temp_dir), store)
+                    success = bool(build_file) and install_build(build_file, plt, args, serials)
+
+            if success and args.bench_startup:
+                bench_startup(build, serials or connected, args.bench_startup)
+            if success and args.capture:
+                capture(build, serials or connected, args.capture_seconds, args.perfetto)
+
+            status = f"{Color.GREEN}✓ Deployed" if success else f"{Color.RED}✗ Deploy failed"
+            waiting = f" ({len(pending)} more waiting)" if len(pending) else ""
+            print(f"{status}{Color.RESET}{waiting}")
+    except KeyboardInterrupt:
+        print(f"\n{Color.YELLOW}Stopped watching{Color.RESET}")
+        return 0
+
+
+def hotplug(build_file: Installable, plt: Platform, args: argparse.Namespace) -> bool:
+    """Install build_file on every target device now attached or plugged in later, until Ctrl-C
+
+    --devices limits provisioning to the listed serials; otherwise every
+    device that comes up is provisioned. A device that is re-plugged is
+    provisioned again (identical builds are skipped unless --force).
+    """
+    wanted = {serial.strip() for serial in (args.devices or "").split(",") if serial.strip()}
+    pool = ThreadPoolExecutor(max_workers=max(1, args.parallel))
+    table_lock = threading.Lock()
+
+    def show(tracker: DeviceTracker):
+        with table_lock:
+            tracker.print_table()
+
+    def provision(device: DeviceInfo):
+        tracker.set_status(device.serial, "installing...", redraw=False)
+        try:
+            if plt == Platform.ANDROID:
+                result = Deployer.deploy_android_device(build_file, device.serial, args.clean_install,
+                                                        args.force, args.fast)
+            else:
+                result = Deployer.deploy_ios_device(build_file, device.serial, args.clean_install, args.force)
+        except Exception as e:
+            # The pool would keep the exception in a future nobody reads,
+            # leaving the device "installing..." forever
+            tracker.set_status(device.serial, f"{Color.RED}✗ failed: {e}{Color.RESET}")
+            return
+
+        if result.skipped:
+            status = f"{Color.GREEN}= same{Color.RESET}"
+        elif result.success:
+            status = f"{Color.GREEN}✓ installed ({result.seconds:.1f}s){Color.RESET}"
+        else:
+            status = f"{Color.RED}✗ failed{Color.RESET}"
+        tracker.set_status(device.serial, status)
+
+    def on_ready(device: DeviceInfo):
+        if wanted and device.serial not in wanted:
+            tracker.set_status(device.serial, "not targeted", redraw=False)
+            return
+        tracker.set_status(device.serial, "queued", redraw=False)
+        pool.submit(provision, device)
+
+    print(f"\n{Color.BOLD}Provisioning {build_file.name} on every device plugged in "
+          f"(Ctrl-C to stop){Color.RESET}")
+    tracker = DeviceTracker(plt, on_ready=on_ready, on_change=show).start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n{Color.YELLOW}Stopped provisioning{Color.RESET}")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return True
+
+
+def resolve_target_devices(plt: Platform, connected: List[str],
+                           args: argparse.Namespace) -> Tuple[Optional[List[str]], str]:
+    """Work out which of the connected devices to install on from --all-devices/--devices
+
+    Returns (serials, error). serials (Android serials or iOS UDIDs) is None
+    for a plain single-device install; error is non-empty if the selection
+    cannot be satisfied.
+    """
+    if args.all_devices:
+        return connected, ""
+
+    if args.devices:
+        serials = [serial.strip() for serial in args.devices.split(",") if serial.strip()]
+        missing = [serial for serial in serials if serial not in connected]
+        if missing:
+            return None, f"{Color.RED}Device(s) not connected: {', '.join(missing)}{Color.RESET}"
+        return serials, ""
+
+    if len(connected) > 1:
+        name = "Android" if plt == Platform.ANDROID else "iOS"
+        return None, (f"{Color.RED}More than one {name} device connected{Color.RESET}\n\n"
+                      f"Use {Color.CYAN}--all-devices{Color.RESET} or "
+                      f"{Color.CYAN}--devices {','.join(connected)}{Color.RESET}")
+    return None, ""
+
+
+def install_build(build_file: Installable, plt: Platform, args: argparse.Namespace,
+                  serials: Optional[List[str]] = None) -> bool:
+    """Install a build file on the target device(s)
+
+    With serials (Android serials or iOS UDIDs) given, installs fan out to
+    every listed device and finish with a per-device result table.
+    """
+    if serials is None:
+        if plt == Platform.IOS:
+            return Deployer.deploy_ios(build_file, clean_install=args.clean_install, force=args.force)
+        return Deployer.deploy_android(build_file, clean_install=args.clean_install, force=args.force,
+                                       fast=args.fast)
+
+    if plt == Platform.IOS:
+        results = Deployer.deploy_ios_fanout(build_file, serials, args.clean_install, args.parallel,
+                                             force=args.force)
+    else:
+        results = Deployer.deploy_android_fanout(build_file, serials, args.clean_install, args.parallel,
+                                                 force=args.force, fast=args.fast)
+    print_device_results(results)
+    return all(r.success for r in results)
+
+
+def build_record_key(build: Build) -> Tuple[str, Optional[str]]:
+    """File name stem and commit that measurements of a build are saved under
+
+    GitHub builds are named after their run number and commit; local builds
+    use the checked-out commit.
+    """
+    commit = build.commit
+    if build.source == BuildSource.LOCAL:
+        result = run_command(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent)
+        commit = result.stdout.strip() if result.returncode == 0 else None
+        run = "local"
+    else:
+        run = f"run-{build.run_number or build.run_id}"
+    return f"{run}-{(commit or 'unknown')[:12]}", commit
+
+
+class StartupHistory:
+    """Startup benchmark results, one JSON file per build (run number + commit)
+
+    Each file holds every session measured for that build, so results of
+    different CI builds can be lined up to find where startup regressed.
+    """
+
+    @staticmethod
+    def directory() -> Path:
+        return user_cache_dir() / "startup"
+
+    @staticmethod
+    def save(build: Build, launches: int, results: List[StartupResult]) -> Path:
+        """Append a session to the build's file and return its path"""
+        stem, commit = build_record_key(build)
+        path = StartupHistory.directory() / f"{stem}.json"
+        try:
+            record = json.loads(path.read_text())
+        except (OSError, ValueError):
+            record = {
+                "run_number": build.run_number,
+                "run_id": build.run_id,
+                "commit": commit,
+                "build_type": build.build_type,
+                "artifact": build.artifact_name or (build.path.name if build.path else None),
+                "sessions": [],
+            }
+        record["sessions"].append({
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "launches": launches,
+            "devices": {
+                r.device: {
+                    "total_ms": r.total_ms,
+                    "wait_ms": r.wait_ms,
+                    "failed": r.failed,
+                    "total": StartupResult.stats(r.total_ms) if r.total_ms else None,
+                    "wait": StartupResult.stats(r.wait_ms) if r.wait_ms else None,
+                }
+                for r in results
+            },
+        })
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(record, indent=2))
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def previous(exclude: Path, device: str) -> Optional[Tuple[str, float]]:
+        """Label and median TotalTime of the latest session of another build on this device"""
+        latest = None
+        for path in StartupHistory.directory().glob("*.json"):
+            if path == exclude:
+                continue
+            try:
+                record = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for session in record.get("sessions", []):
+                total = (session.get("devices", {}).get(device) or {}).get("total")
+                if total and (latest is None or session["recorded_at"] > latest[0]):
+                    label = f"#{record['run_number']}" if record.get("run_number") else "local"
+                    commit = (record.get("commit") or "unknown")[:7]
+                    latest = (session["recorded_at"], f"{label} {commit}", total["median"])
+        return latest[1:] if latest else None
+
+
+def bench_startup(build: Build, serials: List[str], launches: int) -> bool:
+    """Measure cold starts of the installed build on each device and record them
+
+    Devices are measured in parallel. Returns False if any device had no
+    successful launch.
+    """
+    print(f"\n{Color.CYAN}Measuring cold start: {launches} launch(es) on {len(serials)} device(s)...{Color.RESET}")
+    with ThreadPoolExecutor(max_workers=max(1, len(serials))) as pool:
+        results = list(pool.map(lambda serial: Deployer.measure_cold_starts(serial, launches), serials))
+    path = StartupHistory.save(build, launches, results)
+
+    width = max([len("Device")] + [len(r.device) for r in results])
+    print(f"\n{Color.BOLD}{'':<{width}}  {'TotalTime (ms)':^22}  {'WaitTime (ms)':^22}{Color.RESET}")
+    print(f"{Color.BOLD}{'Device':<{width}}  {'median':>6} {'p90':>6} {'stdev':>8}  "
+          f"{'median':>6} {'p90':>6} {'stdev':>8}  Previous build{Color.RESET}")
+    for r in results:
+        if not r.total_ms:
+            print(f"{r.device:<{width}}  {Color.RED}✗ all {r.failed} launch(es) failed{Color.RESET}")
+            continue
+        total = StartupResult.stats(r.total_ms)
+        wait = StartupResult.stats(r.wait_ms) if r.wait_ms else {"median": 0, "p90": 0, "stdev": 0.0}
+        previous = StartupHistory.previous(path, r.device)
+        compare = f"{previous[0]}: {total['median'] - previous[1]:+.0f} ms" if previous else "-"
+        failed = f"  {Color.YELLOW}({r.failed} failed){Color.RESET}" if r.failed else ""
+        print(f"{r.device:<{width}}  {total['median']:>6.0f} {total['p90']:>6.0f} {total['stdev']:>8.1f}  "
+              f"{wait['median']:>6.0f} {wait['p90']:>6.0f} {wait['stdev']:>8.1f}  {compare}{failed}")
+    print(f"\nSaved to {path}")
+    return all(r.total_ms for r in results)
+
+
+def capture(build: Build, serials: List[str], seconds: int, trace: bool) -> bool:
+    """Capture frame, memory and (optionally) Perfetto data from each device in parallel
+
+    Results go to captures/<run>-<commit>/<timestamp>/ in the cache dir:
+    capture.json plus one trace per device. Returns False if any device
+    could not be captured.
+    """
+    stem, commit = build_record_key(build)
+    out_dir = user_cache_dir() / "captures" / stem / datetime.now().strftime("%Y%m%d-%H%M%S")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"\n{Color.CYAN}Capturing {seconds}s of app activity on {len(serials)} device(s)"
+          f"{' with a Perfetto trace' if trace else ''}...{Color.RESET}")
+    print("Use the app now (e.g. play a song) to exercise the screens you want measured.")
+    with ThreadPoolExecutor(max_workers=max(1, len(serials))) as pool:
+        results = list(pool.map(
+            lambda serial: Deployer.capture_telemetry(serial, seconds, out_dir if trace else None), serials))
+
+    (out_dir / "capture.json").write_text(json.dumps({
+        "run_number": build.run_number,
+        "run_id": build.run_id,
+        "commit": commit,
+        "build_type": build.build_type,
+        "artifact": build.artifact_name or (build.path.name if build.path else None),
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "seconds": seconds,
+        "devices": [asdict(r) for r in results],
+    }, indent=2))
+
+    def show(value, fmt: str = "{}") -> str:
+        return "-" if value is None else fmt.format(value)
+
+    width = max([len("Device")] + [len(r.device) for r in results])
+    print(f"\n{Color.BOLD}{'Device':<{width}}  {'Frames':>6} {'Janky':>6} {'p90':>5} {'p99':>5}  "
+          f"{'PSS MB':>7} {'Java MB':>7} {'Native MB':>9}{Color.RESET}")
+    for r in results:
+        if r.error:
+            print(f"{r.device:<{width}}  {Color.RED}✗ {r.error}{Color.RESET}")
+            continue
+        print(f"{r.device:<{width}}  {show(r.frames):>6} {show(r.janky_percent, '{:.1f}%'):>6} "
+              f"{show(r.frame_p90_ms, '{}ms'):>5} {show(r.frame_p99_ms, '{}ms'):>5}  "
+              f"{show(r.pss_kb and r.pss_kb / 1024, '{:.1f}'):>7} "
+              f"{show(r.java_heap_kb and r.java_heap_kb / 1024, '{:.1f}'):>7} "
+              f"{show(r.native_heap_kb and r.native_heap_kb / 1024, '{:.1f}'):>9}")
+    print(f"\nSaved to {out_dir}")
+    return not any(r.error for r in results)
+
+
+def prefetch(args: argparse.Namespace, finder: BuildFinder) -> int:
+    """Download the newest artifact of each kind into the artifact store
+
+    Looks through the last --depth successful runs for the newest build of
+    every artifact (android-debug-apk, android-release-apk, the iOS apps,
+    ...), and downloads the ones the store lacks, --prefetch-jobs at a time
+    and within --prefetch-rate together. With --prefetch-interval, repeats
+    until Ctrl-C. A later deploy of these builds then starts without a
+    download.
+    """
+    rate_limiter = RateLimiter(args.prefetch_rate) if args.prefetch_rate else None
+    store = ArtifactStore(user_cache_dir() / "artifacts", args.artifact_cache_size, finder.api, rate_limiter)
+    run_filter = RunFilter(branch=args.branch, event=args.event, since=args.since, until=args.until)
+
+    def fetch(build: Build) -> bool:
+        start = time.perf_counter()
+        try:
+            blob = store.fetch(build)
+        except ArtifactError as e:
+            print(f"{Color.RED}✗ {build.artifact_name} (run #{build.run_number}): {e}{Color.RESET}")
+            return False
+        print(f"{Color.GREEN}✓ {build.artifact_name} (run #{build.run_number}): "
+              f"{format_size(blob.stat().st_size)} in {time.perf_counter() - start:.1f}s{Color.RESET}")
+        return True
+
+    while True:
+        print(f"{Color.CYAN}[{datetime.now():%H:%M:%S}] Looking for new builds...{Color.RESET}")
+        newest: Dict[str, Build] = {}
+        for build in finder.find_github_builds(None, run_filter, args.depth):
+            if not args.build_type or build.build_type == args.build_type:
+                # Runs come newest first
+                newest.setdefault(build.artifact_name, build)
+
+        missing = []
+        for build in newest.values():
+            if store.lookup(build):
+                print(f"  {build.artifact_name} (run #{build.run_number}) is already cached")
+            else:
+                missing.append(build)
+
+        with ThreadPoolExecutor(max_workers=args.prefetch_jobs) as pool:
+            ok = all(list(pool.map(fetch, missing)))
+
+        if not args.prefetch_interval:
+            return 0 if ok else 1
+        time.sleep(args.prefetch_interval)
+
+
+def build_resolver(args: argparse.Namespace, plt: Platform,
+                   finder: BuildFinder) -> Callable[[str], Optional[Build]]:
+    """Resolver of build names on the command line (--size-report, --serve)
+
+    A name is a GitHub run number (within --depth, release artifact
+    preferred unless --build-type is given), "local" for the newest local
+    build, or the path of a build file (web: build directory).
+    """
+    github_builds: Optional[List[Build]] = None
+
+    def resolve(spec: str) -> Optional[Build]:
+        nonlocal github_builds
+        path = Path(spec)
+        if path.is_file() or (plt == Platform.WEB and (path / "index.html").is_file()):
+            return BuildFinder._local_build(path.resolve(), plt)
+        if spec == "local":
+            local = [b for b in finder.find_local_builds(plt) if not args.build_type or b.build_type == args.build_type]
+            return max(local, key=lambda b: b.date or datetime.min, default=None)
+        if spec.isdigit():
+            if github_builds is None:
+                run_filter = RunFilter(branch=args.branch, event=args.event, since=args.since, until=args.until)
+                github_builds = finder.find_github_builds(plt, run_filter, args.depth)
+            matches = [b for b in github_builds if spec in (str(b.run_number), b.run_id)
+                       and (not args.build_type or b.build_type == args.build_type)]
+            # Prefer the release artifact: it is what users download
+            matches.sort(key=lambda b: b.build_type != "release")
+            return matches[0] if matches else None
+        return None
+
+    return resolve
+
+
+def artifact_package(archive: Path, plt: Platform) -> Optional[Installable]:
+    """The APK (or its ABI splits) or AAB, or the IPA, in an artifact ZIP, left in place"""
+    suffixes = (".apk", ".aab") if plt == Platform.ANDROID else (".ipa",)
+    with zipfile.ZipFile(archive) as zf:
+        members = [ArtifactMember(archive, info.filename, info.file_size, info.CRC)
+                   for info in zf.infolist() if info.filename.lower().endswith(suffixes)]
+    apks = [member for member in members if member.name.lower().endswith(".apk")]
+    split_groups = AbiSplits.group(apks)
+    if split_groups:
+        return next(iter(split_groups.values()))
+    return (apks or members or [None])[0]
+
+
+def size_report(args: argparse.Namespace, plt: Platform, finder: BuildFinder) -> int:
+    """Compare the composition of two builds (or show one) and enforce --size-budget
+
+    Builds are given as GitHub run numbers, "local" for the newest local
+    build, or paths to an APK, AAB or IPA. Returns 1 if a build cannot be
+    read or the budget is exceeded.
+    """
+    if len(args.size_report) > 2:
+        print(f"{Color.RED}--size-report takes one or two builds{Color.RESET}")
+        return 1
+
+    resolve = build_resolver(args, plt, finder)
+    store = ArtifactStore(user_cache_dir() / "artifacts", args.artifact_cache_size, finder.api)
+    reports = []
+    for spec in args.size_report:
+        build = resolve(spec)
+        if build is None:
+            print(f"{Color.RED}✗ No {plt.value} build found for '{spec}' "
+                  f"(a run number within --depth, 'local', or a file){Color.RESET}")
+            return 1
+
+        try:
+            if build.source == BuildSource.LOCAL:
+                source = build.install_source()
+                label = "local" if spec == "local" else build.path.name
+            else:
+                # Read in place from the stored artifact: nothing is extracted
+                source = artifact_package(store.fetch(build), plt)
+                label = f"#{build.run_number} {(build.commit or '')[:7]}".strip()
+                if source is None:
+                    print(f"{Color.RED}✗ No {'APK or AAB' if plt == Platform.ANDROID else 'IPA'} "
+                          f"in the {build.artifact_name} artifact{Color.RESET}")
+                    return 1
+        except (ArtifactError, zipfile.BadZipFile) as e:
+            print(f"{Color.RED}✗ Cannot fetch {build.artifact_name}: {e}{Color.RESET}")
+            return 1
+        if isinstance(source, AbiSplits):
+            # Splits repeat the shared files; the universal APK has them once
+            source = source.universal or source.for_abis(["arm64-v8a"]) or next(iter(source.splits.values()))
+
+        try:
+            reports.append(SizeBreakdown.read(source, f"{label} {build.build_type or ''}".strip()))
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"{Color.RED}✗ Cannot read {source.name}: {e}{Color.RESET}")
+            return 1
+
+    old, new = (reports[0], reports[-1]) if len(reports) == 2 else (None, reports[0])
+    names = sorted(set(new.components) | set(old.components if old else ()),
+                   key=lambda n: -new.components.get(n, (0, 0))[0])
+    width = max(len(n) for n in names + ["Component"])
+
+    print(f"\n{Color.BOLD}Size report: {new.label}" + (f" vs {old.label}" if old else "") + Color.RESET)
+    header = f"{'Component':<{width}}  {'Compressed':>11} {'Uncompressed':>12}"
+    if old:
+        header += f"  {'Δ Compressed':>13} {'Δ Uncompressed':>14}"
+    print(f"\n{Color.BOLD}{header}{Color.RESET}")
+    rows = [(n, new.components.get(n, (0, 0)), old.components.get(n, (0, 0)) if old else None) for n in names]
+    rows.append(("Total", new.total, old.total if old else None))
+    for name, (compressed, uncompressed), before in rows:
+        line = f"{name:<{width}}  {format_size(compressed):>11} {format_size(uncompressed):>12}"
+        if before is not None:
+            dc, du = compressed - before[0], uncompressed - before[1]
+            color = Color.RED if dc > 0 else Color.GREEN if dc < 0 else ""
+            line += f"  {color}{format_size(dc, signed=True):>13}{Color.RESET if color else ''} " \
+                    f"{format_size(du, signed=True):>14}"
+        print(f"{Color.BOLD}{line}{Color.RESET}" if name == "Total" else line)
+
+    if args.size_budget is None:
+        return 0
+    # Compressed size is what gets downloaded and pushed to devices
+    measured = new.total[0] - old.total[0] if old else new.total[0]
+    what = "growth" if old else "size"
+    if measured > args.size_budget:
+        print(f"\n{Color.RED}✗ Compressed {what} {format_size(measured)} exceeds the budget of "
+              f"{format_size(args.size_budget)}{Color.RESET}")
+        return 1
+    print(f"\n{Color.GREEN}✓ Compressed {what} {format_size(measured, signed=bool(old))} is within the budget of "
+          f"{format_size(args.size_budget)}{Color.RESET}")
+    return 0
+
+
+# Text-like files worth precompressing for --platform web; media and
+# images are already compressed
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".mjs", ".css", ".json", ".wasm", ".svg", ".map", ".txt",
+                         ".xml", ".ttf", ".otf", ".frag", ".symbols"}
+# A content hash in the file name (main.3f2a9b1c.js, style-3f2a9b1c.css)
+# means the file never changes under that name. All-digit runs are dates or
+# counters (take-20240115.mp3), not hashes, so at least one letter is required.
+HASHED_NAME_RE = re.compile(r"[.-](?=[0-9]*[a-f])[0-9a-f]{8,}\.[a-z0-9]+$", re.IGNORECASE)
+
+
+@dataclass
+class WebFile:
+    """A file of a served web build"""
+    path: Path
+    size: int
+    etag: str
+    content_type: str
+    cache_control: str
+    variants: Dict[str, Path] = field(default_factory=dict)  # Content-Encoding -> precompressed file
+
+
+class WebSite:
+    """A web build prepared for serving
 
-        print(f"{Color.RED}✗ No iOS deployment tool available{Color.RESET}")
-        return False
+    Compressible files are compressed once, before serving starts, with gzip
+    and (if the brotli module is installed) brotli. The variants are kept in
+    a cache shared by all builds and named by the file's SHA-256, so files
+    that did not change between builds are not compressed again.
+    """
 
-    @staticmethod
-    def download_github_artifact(build: Build, temp_dir: Path) -> Optional[Path]:
-        """Download artifact from GitHub Actions"""
-        print(f"\n{Color.CYAN}Downloading build from GitHub Actions...{Color.RESET}")
-        run_display = f"#{build.run_number}" if build.run_number else f"ID {build.run_id}"
-        print(f"  Run: {run_display}")
-        print(f"  Artifact: {build.artifact_name}")
+    MIN_COMPRESS_SIZE = 1024
+    MAX_CACHE_BYTES = 512 * 1024 ** 2
 
-        try:
-            # Download artifact (gh downloads as ZIP)
-            download_dir = temp_dir / "download"
-            download_dir.mkdir(exist_ok=True)
+    def __init__(self, build: Build, root: Path):
+        self.build = build
+        self.root = root
+        self.files: Dict[str, WebFile] = {}
 
-            print(f"{Color.CYAN}Downloading artifact...{Color.RESET}")
-            result = subprocess.run(
-                ["gh", "run", "download", build.run_id, "--name", build.artifact_name, "--dir", str(download_dir)],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+    @staticmethod
+    def cache_dir() -> Path:
+        return user_cache_dir() / "web-compressed"
+
+    @staticmethod
+    def encoders() -> List[Tuple[str, str, Callable[[bytes], bytes]]]:
+        """(Content-Encoding, file suffix, compress) in order of preference"""
+        encoders = [("gzip", "gz", lambda data: gzip.compress(data, 9, mtime=0))]
+        if brotli:
+            encoders.insert(0, ("br", "br", lambda data: brotli.compress(data, quality=11)))
+        return encoders
+
+    def prepare(self):
+        """Index the build's files and create their compressed variants"""
+        mimetypes.add_type("application/wasm", ".wasm")
+        mimetypes.add_type("text/javascript", ".mjs")
+        self.cache_dir().mkdir(parents=True, exist_ok=True)
+        paths = [path for path in sorted(self.root.rglob("*")) if path.is_file()]
+
+        start = time.perf_counter()
+        with PROFILER.span("precompress web build", files=len(paths)), \
+                ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            for path, web_file in zip(paths, pool.map(self._prepare_file, paths)):
+                self.files[path.relative_to(self.root).as_posix()] = web_file
+
+        compressed = sum(1 for f in self.files.values() if f.variants)
+        encodings = "/".join(encoding for encoding, _, _ in self.encoders())
+        print(f"{Color.GREEN}✓ {len(self.files)} files, {compressed} precompressed ({encodings}) "
+              f"in {time.perf_counter() - start:.1f}s{Color.RESET}")
+        self.evict()
+
+    def lookup(self, url_path: str) -> Optional[WebFile]:
+        """File for a request path; unknown extensionless paths get index.html (app routes)"""
+        rel = url_path.lstrip("/")
+        if rel == "" or rel.endswith("/"):
+            rel += "index.html"
+        if rel in self.files:
+            return self.files[rel]
+        if f"{rel}/index.html" in self.files:
+            return self.files[f"{rel}/index.html"]
+        if "." not in PurePosixPath(rel).name:
+            return self.files.get("index.html")
+        return None
 
-            # The artifact content is downloaded directly into the directory
-            # Look for APK/IPA files recursively
-            if build.platform == Platform.ANDROID:
-                # Search for APK files recursively
-                apk_files = list(download_dir.rglob("*.apk"))
-
-                if not apk_files:
-                    # Check if there are any ZIP files that need extraction
-                    zip_files = list(download_dir.rglob("*.zip"))
-                    for zip_file in zip_files:
-                        print(f"{Color.CYAN}Extracting {zip_file.name}...{Color.RESET}")
-                        with zipfile.ZipFile(zip_file, 'r') as zf:
-                            zf.extractall(download_dir)
-
-                    # Try finding APK again
-                    apk_files = list(download_dir.rglob("*.apk"))
-
-                if apk_files:
-                    print(f"{Color.GREEN}✓ Found {apk_files[0].name}{Color.RESET}")
-                    return apk_files[0]
+    def _prepare_file(self, path: Path) -> WebFile:
+        st = path.stat()
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/json", "image/svg+xml"):
+            content_type += "; charset=utf-8"
+        web_file = WebFile(
+            path=path,
+            size=st.st_size,
+            etag=f'"{st.st_size:x}-{st.st_mtime_ns:x}"',
+            content_type=content_type,
+            # Unhashed names (index.html, main.dart.js, ...) must be revalidated
+            cache_control=("public, max-age=31536000, immutable" if HASHED_NAME_RE.search(path.name)
+                           else "no-cache"),
+        )
+        if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES or st.st_size < self.MIN_COMPRESS_SIZE:
+            return web_file
+
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        for encoding, suffix, compress in self.encoders():
+            variant = self.cache_dir() / f"{digest}.{suffix}"
+            try:
+                os.utime(variant)  # Mark as recently used
+            except OSError:
+                tmp_path = variant.with_name(f".{variant.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(compress(data))
+                os.replace(tmp_path, variant)
+            if variant.stat().st_size < st.st_size:
+                web_file.variants[encoding] = variant
+        return web_file
+
+    def evict(self):
+        """Delete least recently used variants until the cache fits MAX_CACHE_BYTES"""
+        variants = []
+        for variant in self.cache_dir().iterdir():
+            try:
+                st = variant.stat()
+            except OSError:
+                continue
+            variants.append((st.st_mtime, st.st_size, variant))
+
+        in_use = {v for f in self.files.values() for v in f.variants.values()}
+        total = sum(size for _, size, _ in variants)
+        for _, size, variant in sorted(variants):
+            if total <= self.MAX_CACHE_BYTES:
+                break
+            if variant not in in_use:
+                variant.unlink(missing_ok=True)
+                total -= size
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(first, last) byte of a single-range Range header, or None to ignore it
+
+    first is size or more if the range cannot be satisfied. Multiple ranges
+    are ignored (the whole file is sent, which the standard allows).
+    """
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", header)
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        return (max(0, size - int(last)), size - 1) if int(last) else (size, size)
+    if last and int(last) < int(first):
+        return None
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+class WebHandler(BaseHTTPRequestHandler):
+    """Serves one WebSite: precompressed variants, conditional and byte-range requests"""
+
+    protocol_version = "HTTP/1.1"
+    site: WebSite = None  # Set per server by serve_web()
+    COPY_CHUNK = 256 * 1024
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def serve(self, send_body: bool):
+        web_file = self.site.lookup(unquote(urlsplit(self.path).path))
+        if web_file is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        byte_range = None
+        if self.headers.get("Range") and self.headers.get("If-Range", web_file.etag) == web_file.etag:
+            byte_range = parse_byte_range(self.headers["Range"], web_file.size)
+
+        # Ranges always refer to the identity encoding; whole responses get
+        # the best precompressed variant the client accepts
+        encoding = None if byte_range else self._choose_encoding(web_file)
+        etag = web_file.etag[:-1] + f'-{encoding}"' if encoding else web_file.etag
+        headers = {"Cache-Control": web_file.cache_control, "ETag": etag, "Content-Type": web_file.content_type}
+        if web_file.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self._respond(304, headers)
+            return
+
+        if byte_range and byte_range[0] >= web_file.size:
+            self._respond(416, {"Content-Range": f"bytes */{web_file.size}"})
+            return
+
+        path = web_file.variants[encoding] if encoding else web_file.path
+        if byte_range:
+            first, last = byte_range
+            headers["Content-Range"] = f"bytes {first}-{last}/{web_file.size}"
+            status = 206
+        else:
+            first, last = 0, path.stat().st_size - 1
+            status = 200
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        else:
+            headers["Accept-Ranges"] = "bytes"
+        headers["Content-Length"] = str(last - first + 1)
+        self._respond(status, headers)
+        if send_body:
+            self._copy(path, first, last - first + 1)
+
+    def _choose_encoding(self, web_file: WebFile) -> Optional[str]:
+        accepted = set()
+        for part in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = part.partition(";")
+            if not re.search(r"q\s*=\s*0(\.0*)?\s*$", params):
+                accepted.add(name.strip().lower())
+        return next((encoding for encoding, _, _ in WebSite.encoders()
+                     if encoding in web_file.variants and encoding in accepted), None)
+
+    def _respond(self, status: int, headers: Dict[str, str]):
+        self.send_response(status)
+        headers.setdefault("Content-Length", "0")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _copy(self, path: Path, offset: int, length: int):
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                while length > 0:
+                    chunk = f.read(min(self.COPY_CHUNK, length))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    length -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The browser dropped the request, e.g. when seeking in audio
+
+
+def serve_web(sites: List[Tuple[Build, Path]], args: argparse.Namespace) -> bool:
+    """Serve web builds side by side, one port each from --serve-port on, until Ctrl-C"""
+    servers = []
+    port = args.serve_port
+    try:
+        for build, root in sites:
+            print(f"\n{Color.CYAN}Preparing {str(build).splitlines()[0]}...{Color.RESET}")
+            site = WebSite(build, root)
+            site.prepare()
+            handler = type("WebSiteHandler", (WebHandler,), {"site": site})
+
+            # Ports in use (e.g. by another deploy.py) are skipped
+            for port in range(port, port + 100):
+                try:
+                    server = ThreadingHTTPServer((args.serve_host, port), handler)
+                    break
+                except OSError:
+                    continue
+            else:
+                print(f"{Color.RED}✗ No free port from {args.serve_port} on{Color.RESET}")
+                return False
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append((server, build))
+            port += 1
+
+        print(f"\n{Color.BOLD}Serving (Ctrl-C to stop):{Color.RESET}")
+        for server, build in servers:
+            host, port = server.server_address[:2]
+            print(f"  {Color.GREEN}http://{host}:{port}/{Color.RESET}  {str(build).splitlines()[0]}")
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n{Color.YELLOW}Stopped serving{Color.RESET}")
+        return True
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def serve_builds(args: argparse.Namespace, finder: BuildFinder) -> int:
+    """Serve the web builds named by --serve side by side"""
+    resolve = build_resolver(args, Platform.WEB, finder)
+    store = ArtifactStore(user_cache_dir() / "artifacts", args.artifact_cache_size, finder.api)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sites = []
+        for index, spec in enumerate(args.serve):
+            build = resolve(spec)
+            if build is None:
+                print(f"{Color.RED}✗ No web build found for '{spec}' "
+                      f"(a run number within --depth, 'local', or a directory){Color.RESET}")
+                return 1
+            if build.source == BuildSource.LOCAL:
+                root = build.path
             else:
-                # Search for IPA files recursively
-                ipa_files = list(download_dir.rglob("*.ipa"))
+                root = Deployer.download_github_artifact(build, Path(temp_dir) / str(index), store)
+            if root is None:
+                return 1
+            sites.append((build, root))
+        return 0 if serve_web(sites, args) else 1
+
+
+class ThreadOutput:
+    """sys.stdout for the daemon: output of a thread working on a job goes to that job
+
+    Everything is also echoed to the console, prefixed with the job ID once
+    a line is complete.
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def bind(self, job: Optional["DeployJob"]):
+        """Send this thread's output to job (None: console only)"""
+        self._local.job = job
+        self._local.partial = ""
+
+    def write(self, text: str) -> int:
+        job = getattr(self._local, "job", None)
+        if job is None:
+            return self.console.write(text)
+        job.append_output(text)
+        lines = (self._local.partial + text).split("\n")
+        self._local.partial = lines.pop()
+        with self._lock:
+            for line in lines:
+                self.console.write(f"[job {job.id}] {line}\n")
+        return len(text)
+
+    def flush(self):
+        self.console.flush()
+
+    def isatty(self) -> bool:
+        return False
 
-                if not ipa_files:
-                    # Check if there are any ZIP files that need extraction
-                    zip_files = list(download_dir.rglob("*.zip"))
-                    for zip_file in zip_files:
-                        print(f"{Color.CYAN}Extracting {zip_file.name}...{Color.RESET}")
-                        with zipfile.ZipFile(zip_file, 'r') as zf:
-                            zf.extractall(download_dir)
 
-                    # Try finding IPA again
-                    ipa_files = list(download_dir.rglob("*.ipa"))
+@dataclass
+class DeployJob:
+    """One deploy request to the daemon: a build and the devices to install it on"""
+    id: int
+    platform: Platform
+    build: Build
+    devices: List[str]
+    clean_install: bool = False
+    force: bool = False
+    fast: bool = False
+    user: str = ""
+    created: float = field(default_factory=time.time)
+    # Per device: queued, waiting for download, installing, ok, skipped, failed, cancelled
+    device_states: Dict[str, str] = field(default_factory=dict)
+    device_seconds: Dict[str, float] = field(default_factory=dict)  # Install times
+    output: str = ""
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self.device_states = {serial: "queued" for serial in self.devices}
+
+    @property
+    def state(self) -> str:
+        states = set(self.device_states.values())
+        if states <= {"ok", "skipped"}:
+            return "done"
+        if states & {"queued", "waiting for download", "installing"}:
+            return "cancelling" if self.cancelled.is_set() else "running"
+        if "failed" in states:
+            return "failed"
+        return "cancelled"
+
+    def append_output(self, text: str):
+        with self._lock:
+            self.output += text
+
+    def set_device_state(self, serial: str, state: str, seconds: Optional[float] = None):
+        with self._lock:
+            self.device_states[serial] = state
+            if seconds is not None:
+                self.device_seconds[serial] = seconds
+
+    def to_json(self, since: int = 0) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "state": self.state,
+                "platform": self.platform.value,
+                "build": str(self.build).strip(),
+                "user": self.user,
+                "created": datetime.fromtimestamp(self.created).isoformat(timespec="seconds"),
+                "devices": dict(self.device_states),
+                "seconds": dict(self.device_seconds),
+                "output": self.output[since:],
+                "offset": len(self.output),
+            }
+
+
+class DeployDaemon:
+    """Owns the devices of a shared USB host and deploys builds to them in order
+
+    Every device has a FIFO queue worked off by one thread, so only one job
+    touches a device at a time and jobs reach it in submission order. Jobs
+    that need the same GitHub artifact share one download.
+    """
+
+    MAX_FINISHED_JOBS = 100
+
+    def __init__(self, finder: BuildFinder, store: ArtifactStore, output: ThreadOutput):
+        self.finder = finder
+        self.store = store
+        self.output = output
+        self.jobs: Dict[int, DeployJob] = {}
+        self._next_id = 1
+        self._lanes: Dict[str, "queue.Queue[DeployJob]"] = {}
+        self._busy: Dict[str, int] = {}
+        self._downloads: Dict[str, Tuple[Future, int]] = {}
+        self._lock = threading.Lock()
+        self._work_dir = Path(tempfile.mkdtemp(prefix="repertoire-coach-daemon-"))
+
+    def submit(self, request: dict) -> DeployJob:
+        """Validate a job request, queue it on its devices and return it
+
+        Raises ValueError if the request cannot be served.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("A job request must be a JSON object")
+        plt = Platform(request.get("platform", "android"))
+        if plt == Platform.WEB:
+            raise ValueError("Web builds are served by deploy.py --platform web, not the daemon")
+        build = self._resolve_build(request, plt)
+
+        ok, msg, connected = probe_devices(plt)
+        wanted = request.get("devices") or []
+        if wanted != "all" and not (isinstance(wanted, list) and all(isinstance(s, str) for s in wanted)):
+            raise ValueError('devices must be "all" or a list of serials')
+        if wanted == "all":
+            devices = connected
+        elif wanted:
+            devices = list(dict.fromkeys(wanted))
+            missing = [serial for serial in devices if serial not in connected]
+            if missing:
+                raise ValueError(f"Device(s) not connected: {', '.join(missing)}")
+        elif len(connected) == 1:
+            devices = connected
+        else:
+            raise ValueError(msg if not connected else
+                             f"{len(connected)} devices connected, name them or ask for all")
+        if not devices:
+            raise ValueError(msg or "No devices connected")
+
+        with self._lock:
+            job = DeployJob(self._next_id, plt, build, devices,
+                            clean_install=bool(request.get("clean_install")),
+                            force=bool(request.get("force")), fast=bool(request.get("fast")),
+                            user=str(request.get("user", "")))
+            self._next_id += 1
+            self.jobs[job.id] = job
+            self._prune()
+            label = f"run #{build.run_number} ({build.build_type})" if build.run_number else build.path.name
+            print(f"Job {job.id} from {job.user or 'unknown'}: {label} to {', '.join(devices)}")
+            self._acquire_download(job)
+            for serial in devices:
+                self._lane(serial).put(job)
+        return job
+
+    def cancel(self, job_id: int) -> Optional[DeployJob]:
+        """Drop the job from the queues of devices that have not started it"""
+        job = self.jobs.get(job_id)
+        if job:
+            job.cancelled.set()
+            for serial, state in job.device_states.items():
+                if state in ("queued", "waiting for download"):
+                    job.set_device_state(serial, "cancelled")
+        return job
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "devices": {serial: {"queued": lane.qsize(), "job": self._busy.get(serial)}
+                            for serial, lane in self._lanes.items()},
+                "jobs": [job.to_json(since=len(job.output)) for job in self.jobs.values()
+                         if job.state in ("running", "cancelling")],
+            }
+
+    def _resolve_build(self, request: dict, plt: Platform) -> Build:
+        """Build from a client's full description, or looked up by run number/ID"""
+        spec = request.get("build") or {}
+        if not isinstance(spec, dict):
+            raise ValueError("build must be a JSON object")
+        if spec.get("path"):
+            path = Path(spec["path"])
+            if not path.is_file():
+                raise ValueError(f"No such build file: {path}")
+            return self.finder.local_build(path, plt)
+        if spec.get("artifact_id"):
+            return Build(platform=plt, source=BuildSource.GITHUB,
+                         date=datetime.fromisoformat(spec["date"]) if spec.get("date") else None,
+                         **{key: spec.get(key) for key in ("run_id", "run_number", "commit", "commit_msg",
+                                                           "build_type", "artifact_name", "artifact_id",
+                                                           "artifact_digest")})
+
+        run = str(request.get("run", ""))
+        if not run:
+            raise ValueError("Give a build (path or artifact) or a run number")
+        builds = [b for b in self.finder.find_github_builds(plt) if run in (str(b.run_number), b.run_id)
+                  and (not request.get("build_type") or b.build_type == request["build_type"])]
+        if len(builds) != 1:
+            raise ValueError(f"{len(builds)} builds match run {run}"
+                             + (", give a build_type" if builds else ""))
+        return builds[0]
+
+    def _download_key(self, job: DeployJob) -> str:
+        return f"artifact-{job.build.artifact_id}" if job.build.artifact_id else f"local-{job.build.path}"
+
+    def _acquire_download(self, job: DeployJob):
+        """Start the job's download, or join one already under way (called with the lock held)
+
+        The download is referenced once per device the job is queued on.
+        """
+        key = self._download_key(job)
+        if key in self._downloads:
+            future, users = self._downloads[key]
+            self._downloads[key] = (future, users + len(job.devices))
+            if not future.done():
+                job.append_output("Sharing a download already in progress\n")
+            return
+        future = run_in_background(self._download, job, key)
+        self._downloads[key] = (future, len(job.devices))
+
+    def _release_download(self, job: DeployJob):
+        """Drop one device's reference; forget the download once nothing queued needs it"""
+        key = self._download_key(job)
+        with self._lock:
+            future, users = self._downloads[key]
+            if users > 1:
+                self._downloads[key] = (future, users - 1)
+                return
+            del self._downloads[key]
+        shutil.rmtree(self._work_dir / key, ignore_errors=True)
+
+    def _download(self, job: DeployJob, key: str) -> Optional[Installable]:
+        self.output.bind(job)
+        try:
+            if job.build.source == BuildSource.LOCAL:
+                return job.build.install_source()
+            temp_dir = self._work_dir / key
+            temp_dir.mkdir(exist_ok=True)
+            return Deployer.download_github_artifact(job.build, temp_dir, self.store)
+        finally:
+            self.output.bind(None)
+
+    def _lane(self, serial: str) -> "queue.Queue[DeployJob]":
+        """The device's queue, with its worker started on first use (called with the lock held)"""
+        lane = self._lanes.get(serial)
+        if lane is None:
+            lane = self._lanes[serial] = queue.Queue()
+            threading.Thread(target=self._work, args=(serial, lane), daemon=True).start()
+        return lane
+
+    def _work(self, serial: str, lane: "queue.Queue[DeployJob]"):
+        """Install jobs on one device, one at a time, in the order they were submitted"""
+        while True:
+            job = lane.get()
+            try:
+                if job.cancelled.is_set():
+                    job.set_device_state(serial, "cancelled")
+                    continue
+                with self._lock:
+                    self._busy[serial] = job.id
+                    future = self._downloads[self._download_key(job)][0]
+                # The device may have been swapped or changed by hand since the last job
+                Deployer.forget_android_device(serial)
+                job.set_device_state(serial, "waiting for download")
+                build_file = future.result()
+                if job.cancelled.is_set() or build_file is None:
+                    job.set_device_state(serial, "cancelled" if job.cancelled.is_set() else "failed")
+                    continue
 
-                if ipa_files:
-                    print(f"{Color.GREEN}✓ Found {ipa_files[0].name}{Color.RESET}")
-                    return ipa_files[0]
+                job.set_device_state(serial, "installing")
+                self.output.bind(job)
+                if job.platform == Platform.IOS:
+                    result = Deployer.deploy_ios_device(build_file, serial, job.clean_install, job.force)
+                else:
+                    result = Deployer.deploy_android_device(build_file, serial, job.clean_install,
+                                                            job.force, job.fast)
+                job.set_device_state(serial, "skipped" if result.skipped else "ok" if result.success else "failed",
+                                     result.seconds)
+            except Exception as e:
+                job.append_output(f"{Color.RED}[{serial}] ✗ {e}{Color.RESET}\n")
+                job.set_device_state(serial, "failed")
+            finally:
+                self.output.bind(None)
+                with self._lock:
+                    self._busy.pop(serial, None)
+                self._release_download(job)
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS (called with the lock held)"""
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.state in ("done", "failed", "cancelled")]
+        for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """JSON API of the deploy daemon
+
+    GET  /status             devices with queue lengths, running jobs
+    GET  /devices?platform=  connected devices, as probe_devices() sees them
+    GET  /jobs               all known jobs
+    POST /jobs               submit {"build"|"run", "platform", "devices", "clean_install", "force", "fast"}
+    GET  /jobs/<id>?since=N  one job, with its output from offset N
+    POST /jobs/<id>/cancel   cancel (also DELETE /jobs/<id>)
+    """
+
+    protocol_version = "HTTP/1.1"
+    daemon: DeployDaemon = None  # Set by serve_daemon()
+
+    def log_message(self, format, *args):
+        pass  # Jobs are reported on the console instead
+
+    def respond(self, status: int, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _from_local_client(self) -> bool:
+        """Refuse requests a web page could have sent, answering 403
+
+        Browsers add an Origin to cross-site requests, and a Host other than
+        localhost means the page reached us through a rebound DNS name.
+        """
+        host = self.headers.get("Host", "")
+        origin = self.headers.get("Origin")
+        if urlsplit(f"//{host}").hostname not in DAEMON_HOSTS or (origin and origin != f"http://{host}"):
+            self.respond(403, {"error": "Requests from web pages are not accepted"})
+            return False
+        return True
+
+    def _job(self, path: str) -> Optional[DeployJob]:
+        match = re.fullmatch(r"/jobs/(\d+)(?:/cancel)?", path)
+        job = self.daemon.jobs.get(int(match.group(1))) if match else None
+        if job is None:
+            self.respond(404, {"error": "No such job"})
+        return job
+
+    def do_GET(self):
+        if not self._from_local_client():
+            return
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            plt = Platform(query.get("platform", "android"))
+            since = int(query.get("since", "0"))
+            if since < 0:
+                raise ValueError(f"since must not be negative: {since}")
+        except ValueError as e:
+            self.respond(400, {"error": str(e)})
+            return
+        if url.path == "/status":
+            self.respond(200, self.daemon.status())
+        elif url.path == "/devices":
+            ok, msg, serials = probe_devices(plt)
+            self.respond(200, {"ok": ok, "message": msg, "devices": serials})
+        elif url.path == "/jobs":
+            self.respond(200, [job.to_json(since=len(job.output)) for job in list(self.daemon.jobs.values())])
+        else:
+            job = self._job(url.path)
+            if job:
+                self.respond(200, job.to_json(since=since))
+
+    def do_POST(self):
+        if not self._from_local_client():
+            return
+        url = urlsplit(self.path)
+        if url.path == "/jobs":
+            # HTML forms cannot send JSON, so this also rules out form posts
+            if self.headers.get_content_type() != "application/json":
+                self.respond(415, {"error": "Jobs must be submitted as application/json"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                job = self.daemon.submit(json.loads(self.rfile.read(length) or b"{}"))
+            except (ValueError, TypeError, KeyError) as e:
+                self.respond(400, {"error": str(e)})
+                return
+            self.respond(202, job.to_json())
+        elif url.path.endswith("/cancel") and self._job(url.path):
+            self.respond(200, self.daemon.cancel(int(url.path.split("/")[2])).to_json())
+        elif not url.path.endswith("/cancel"):
+            self.respond(404, {"error": "Not found"})
+
+    def do_DELETE(self):
+        if not self._from_local_client():
+            return
+        job = self._job(urlsplit(self.path).path)
+        if job:
+            self.respond(200, self.daemon.cancel(job.id).to_json())
+
+
+def serve_daemon(args: argparse.Namespace) -> int:
+    """Run the deploy daemon in the foreground until Ctrl-C"""
+    url = urlsplit(args.daemon_url)
+    if url.hostname not in DAEMON_HOSTS:
+        print(f"{Color.RED}The daemon only listens on localhost, not {url.hostname}{Color.RESET}")
+        return 1
 
-            print(f"{Color.RED}✗ Build file not found in artifact{Color.RESET}")
-            print(f"\nFiles in download directory:")
-            for f in download_dir.rglob("*"):
-                if f.is_file():
-                    print(f"  - {f.relative_to(download_dir)}")
-            return None
+    tools = [ok for ok, _ in (DependencyChecker.check_adb(), DependencyChecker.check_ios_deploy())]
+    if not any(tools):
+        print(DependencyChecker.check_adb()[1])
+        return 1
 
-        except subprocess.CalledProcessError as e:
-            print(f"{Color.RED}✗ Download failed: {e}{Color.RESET}")
-            if e.stderr:
-                print(e.stderr)
-            return None
-        except zipfile.BadZipFile as e:
-            print(f"{Color.RED}✗ Failed to extract ZIP: {e}{Color.RESET}")
-            return None
+    finder = make_finder(args)
+    output = ThreadOutput(sys.stdout)
+    DaemonHandler.daemon = DeployDaemon(
+        finder, ArtifactStore(user_cache_dir() / "artifacts", args.artifact_cache_size, finder.api), output)
+    try:
+        server = ThreadingHTTPServer((url.hostname, url.port or DEFAULT_DAEMON_PORT), DaemonHandler)
+    except OSError as e:
+        print(f"{Color.RED}Cannot listen on {args.daemon_url}: {e}{Color.RESET}")
+        return 1
 
+    sys.stdout = output
+    print(f"{Color.GREEN}Deploy daemon listening on {args.daemon_url} (Ctrl-C to stop){Color.RESET}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{Color.YELLOW}Daemon stopped{Color.RESET}")
+    finally:
+        sys.stdout = output.console
+        server.server_close()
+    return 0
 
-def show_menu(builds: List[Build]) -> Optional[Build]:
-    """Show interactive menu for build selection"""
-    if not builds:
-        print(f"{Color.YELLOW}No builds available{Color.RESET}")
-        return None
 
-    print(f"\n{Color.BOLD}Available builds:{Color.RESET}\n")
+class DaemonClient:
+    """Talks to a running deploy daemon, which the CLI hands its deploys to"""
 
-    for i, build in enumerate(builds, 1):
-        print(f"[{Color.CYAN}{i}{Color.RESET}] {build}\n")
+    def __init__(self, url: str):
+        self.url = urlsplit(url)
 
-    while True:
+    @staticmethod
+    def find(url: str) -> Optional["DaemonClient"]:
+        """A client if a daemon answers at url, else None"""
+        client = DaemonClient(url)
         try:
-            choice = input(f"Select build to deploy [1-{len(builds)}] (or 'q' to quit): ").strip()
-
-            if choice.lower() == 'q':
-                return None
+            client._request("GET", "/status", timeout=0.5)
+        except (OSError, GitHubApiError, ValueError):
+            return None
+        return client
 
-            index = int(choice) - 1
-            if 0 <= index < len(builds):
-                return builds[index]
-            else:
-                print(f"{Color.YELLOW}Invalid choice. Please enter a number between 1 and {len(builds)}{Color.RESET}")
+    def _request(self, method: str, path: str, body: Optional[dict] = None, timeout: float = 10):
+        conn = http.client.HTTPConnection(self.url.hostname, self.url.port or DEFAULT_DAEMON_PORT,
+                                          timeout=timeout)
+        try:
+            payload = json.dumps(body).encode() if body is not None else None
+            conn.request(method, path, body=payload,
+                         headers={"Content-Type": "application/json"} if payload else {})
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"null")
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise GitHubApiError(data.get("error") if isinstance(data, dict) else f"HTTP {response.status}")
+        return data
+
+    def probe_devices(self, plt: Platform) -> Tuple[bool, str, List[str]]:
+        """probe_devices() as seen by the daemon"""
+        data = self._request("GET", f"/devices?platform={plt.value}")
+        return data["ok"], data["message"], data["devices"]
+
+    def deploy(self, build: Build, plt: Platform, devices: Optional[List[str]],
+               args: argparse.Namespace) -> bool:
+        """Submit a job and print its output until it finishes; Ctrl-C cancels it"""
+        if build.source == BuildSource.LOCAL:
+            spec = {"path": str(build.path.resolve())}
+        else:
+            spec = {key: getattr(build, key) for key in ("run_id", "run_number", "commit", "commit_msg",
+                                                         "build_type", "artifact_name", "artifact_id",
+                                                         "artifact_digest")}
+            spec["date"] = build.date.isoformat() if build.date else None
+        try:
+            job = self._request("POST", "/jobs", {
+                "platform": plt.value, "build": spec, "devices": devices or [],
+                "clean_install": args.clean_install, "force": args.force, "fast": args.fast,
+                "user": os.environ.get("USER") or os.environ.get("USERNAME", ""),
+            })
+        except (OSError, GitHubApiError, ValueError) as e:
+            print(f"{Color.RED}✗ Daemon rejected the deploy: {e}{Color.RESET}")
+            return False
 
-        except ValueError:
-            print(f"{Color.YELLOW}Invalid input. Please enter a number or 'q'{Color.RESET}")
+        waiting = {serial: state for serial, state in job["devices"].items()}
+        print(f"{Color.CYAN}Queued as job {job['id']} on the deploy daemon "
+              f"({', '.join(waiting)}){Color.RESET}")
+        offset = 0
+        try:
+            while True:
+                job = self._request("GET", f"/jobs/{job['id']}?since={offset}")
+                sys.stdout.write(job["output"])
+                sys.stdout.flush()
+                offset = job["offset"]
+                if job["state"] in ("done", "failed", "cancelled"):
+                    break
+                time.sleep(0.5)
         except KeyboardInterrupt:
-            print("\n")
-            return None
+            self._request("POST", f"/jobs/{job['id']}/cancel")
+            print(f"\n{Color.YELLOW}Cancelled job {job['id']} (a device already installing finishes first){Color.RESET}")
+            return False
+
+        print_device_results([DeviceResult(serial, state in ("ok", "skipped"), job["seconds"].get(serial, 0.0),
+                                           skipped=state == "skipped")
+                              for serial, state in job["devices"].items()])
+        return job["state"] == "done"
 
 
 def main():
@@ -689,12 +4937,16 @@ Examples:
   %(prog)s --platform ios --local             # Deploy local iOS build
   %(prog)s --run 42 --build-type debug        # Deploy specific GitHub run by number
   %(prog)s --run-id 12345 --clean-install     # Clean install (removes app data)
+  %(prog)s --local --all-devices              # Install on every connected device
+  %(prog)s --github --branch main --depth 100 # Look further back on main
+  %(prog)s --watch --all-devices              # Deploy every new build as it lands
+  %(prog)s --local --hotplug                  # Provision each phone plugged into the rack
 """
     )
 
     parser.add_argument(
         "--platform",
-        choices=["android", "ios"],
+        choices=["android", "ios", "web"],
         default="android",
         help="Platform to deploy (default: android)"
     )
@@ -725,72 +4977,426 @@ Examples:
         help="Build type (debug or release)"
     )
 
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=DEFAULT_RUN_DEPTH,
+        help=f"How many successful GitHub runs to look back through (default: {DEFAULT_RUN_DEPTH})"
+    )
+
+    parser.add_argument(
+        "--branch",
+        help="Only GitHub runs on this branch"
+    )
+
+    parser.add_argument(
+        "--event",
+        help="Only GitHub runs triggered by this event (e.g. push, pull_request)"
+    )
+
+    parser.add_argument(
+        "--since",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="Only GitHub runs created on or after this date"
+    )
+
+    parser.add_argument(
+        "--until",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="Only GitHub runs created on or before this date"
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and deploy every new local or GitHub build as it appears"
+    )
+
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        metavar="SECONDS",
+        help=f"How often --watch checks GitHub for new runs (default: {DEFAULT_POLL_INTERVAL}, "
+             f"backing off to {WATCH_MAX_INTERVAL} while nothing changes)"
+    )
+
     parser.add_argument(
         "--clean-install",
         action="store_true",
         help="Force clean install (uninstall first). Normally not needed - the script auto-detects signature mismatches."
     )
 
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Install even if the device already runs an identical build"
+    )
+
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Android: upgrade with an incremental (--incremental) or delta (--fastdeploy) "
+             "install where the device supports it, else a full install"
+    )
+
+    parser.add_argument(
+        "--bench-startup",
+        type=int,
+        metavar="N",
+        help="Android: after installing, cold-start the app N times per device and "
+             "record TotalTime/WaitTime for the build's run and commit"
+    )
+
+    parser.add_argument(
+        "--capture",
+        action="store_true",
+        help="Android: after installing, launch the app and record frame stats (gfxinfo) and "
+             "memory (meminfo) per device over --capture-seconds"
+    )
+
+    parser.add_argument(
+        "--capture-seconds",
+        type=int,
+        default=DEFAULT_CAPTURE_SECONDS,
+        metavar="SECONDS",
+        help=f"Length of the --capture window (default: {DEFAULT_CAPTURE_SECONDS})"
+    )
+
+    parser.add_argument(
+        "--perfetto",
+        action="store_true",
+        help="With --capture, also record a Perfetto trace of the window and pull it to the host"
+    )
+
+    parser.add_argument(
+        "--size-report",
+        nargs="+",
+        metavar="BUILD",
+        help="Show the size of each component of OLD [NEW] and the change between them, "
+             "without deploying. BUILD is a GitHub run number, 'local' or a file"
+    )
+
+    parser.add_argument(
+        "--size-budget",
+        type=parse_size,
+        metavar="SIZE",
+        help="With --size-report, fail if the compressed size grows by more than SIZE "
+             "(or, for a single build, exceeds SIZE)"
+    )
+
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Download the newest GitHub artifact of each kind into the artifact cache "
+             "and exit, so later deploys start without a download"
+    )
+
+    parser.add_argument(
+        "--prefetch-interval",
+        type=float,
+        metavar="SECONDS",
+        help="With --prefetch, look for new builds again every SECONDS until Ctrl-C"
+    )
+
+    parser.add_argument(
+        "--prefetch-rate",
+        type=parse_size,
+        metavar="SIZE",
+        help="With --prefetch, limit the combined download rate to SIZE per second, e.g. 5M"
+    )
+
+    parser.add_argument(
+        "--prefetch-jobs",
+        type=int,
+        default=DEFAULT_PREFETCH_JOBS,
+        help=f"With --prefetch, artifacts downloaded at the same time (default: {DEFAULT_PREFETCH_JOBS})"
+    )
+
+    parser.add_argument(
+        "--serve",
+        nargs="+",
+        metavar="BUILD",
+        help="With --platform web, serve these builds side by side, one port each. "
+             "BUILD is a GitHub run number, 'local' or a build directory"
+    )
+
+    parser.add_argument(
+        "--serve-port",
+        type=int,
+        default=DEFAULT_SERVE_PORT,
+        help=f"First port web builds are served on; ports in use are skipped (default: {DEFAULT_SERVE_PORT})"
+    )
+
+    parser.add_argument(
+        "--serve-host",
+        default="127.0.0.1",
+        metavar="ADDRESS",
+        help="Address web builds are served on, e.g. 0.0.0.0 to reach them from phones "
+             "on the network (default: 127.0.0.1)"
+    )
+
+    daemon_group = parser.add_mutually_exclusive_group()
+    daemon_group.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run the shared deploy daemon: queue deploys per device and share downloads "
+             "between them. Other invocations hand their deploys to it"
+    )
+    daemon_group.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Deploy directly even if a deploy daemon is running"
+    )
+
+    parser.add_argument(
+        "--daemon-url",
+        metavar="URL",
+        default=os.environ.get("REPERTOIRE_COACH_DAEMON_URL", DEFAULT_DAEMON_URL),
+        help=f"Where the deploy daemon listens (default: $REPERTOIRE_COACH_DAEMON_URL or {DEFAULT_DAEMON_URL})"
+    )
+
+    device_group = parser.add_mutually_exclusive_group()
+    device_group.add_argument(
+        "--all-devices",
+        action="store_true",
+        help="Install on every connected device"
+    )
+    device_group.add_argument(
+        "--devices",
+        metavar="SERIALS",
+        help="Comma-separated Android serials or iOS UDIDs to install on"
+    )
+
+    parser.add_argument(
+        "--hotplug",
+        action="store_true",
+        help="Keep running and install the chosen build on every device as it is plugged in "
+             "(limited to --devices if given)"
+    )
+
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=DEFAULT_PARALLEL_INSTALLS,
+        help=f"Maximum devices installed to at the same time (default: {DEFAULT_PARALLEL_INSTALLS})"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of concurrent GitHub API calls (default: {DEFAULT_JOBS})"
+    )
+
+    parser.add_argument(
+        "--artifact-cache-size",
+        type=parse_size,
+        default=DEFAULT_ARTIFACT_CACHE_SIZE,
+        metavar="SIZE",
+        help="Byte budget of the downloaded artifact cache, e.g. 500M or 4G (default: 2G)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-phase timing summary at the end"
+    )
+
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="FILE",
+        help="Write a Chrome trace-event JSON file of all phases and subprocesses"
+    )
+
+    parser.add_argument(
+        "--api-url",
+        metavar="URL",
+        help=f"GitHub API root for the built-in HTTP client "
+             f"(default: $REPERTOIRE_COACH_API_URL or {DEFAULT_API_URL})"
+    )
+
+    parser.add_argument(
+        "--gh-cli",
+        action="store_true",
+        help="Talk to GitHub through gh subprocesses instead of the built-in HTTP client"
+    )
+
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate all cached GitHub metadata with the server"
+    )
+    cache_group.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only use cached GitHub metadata (no network access)"
+    )
+
     args = parser.parse_args()
 
+    PROFILER.enabled = args.profile or bool(args.trace)
+    try:
+        return deploy(args)
+    finally:
+        if args.profile:
+            PROFILER.print_summary()
+        if args.trace:
+            PROFILER.write_trace(args.trace)
+            print(f"Trace written to {args.trace}")
+
+
+def make_finder(args: argparse.Namespace) -> BuildFinder:
+    """BuildFinder for the repository, with the GitHub client and cache mode from args"""
+    # Find repository root
+    repo_root = Path(__file__).parent.parent
+    if args.offline:
+        cache_mode = CacheMode.OFFLINE
+    elif args.refresh:
+        cache_mode = CacheMode.REFRESH
+    else:
+        cache_mode = CacheMode.NORMAL
+    transport = GhCliTransport() if args.gh_cli else HttpTransport(args.api_url, repo_root)
+    api = GitHubApi(MetadataCache(user_cache_dir() / "github-metadata.json"), cache_mode, transport, repo_root)
+    return BuildFinder(repo_root, jobs=args.jobs, api=api)
+
+
+def deploy(args: argparse.Namespace) -> int:
+    """Find, select and deploy a build as requested on the command line"""
     # Determine platform
     platform_choice = Platform(args.platform)
 
     # Check dependencies based on what user wants to do
-    if args.github or args.run_id:
+    # gh is needed unless the HTTP client has a token from the environment
+    needs_gh = args.gh_cli or not env_github_token()
+    if (args.github or args.run_id or args.prefetch) and not args.offline and needs_gh:
         ok, msg = DependencyChecker.check_gh()
         if not ok:
             print(msg)
             return 1
 
-    if platform_choice == Platform.ANDROID:
+    if args.size_report:
+        if platform_choice == Platform.WEB:
+            print(f"{Color.RED}--size-report compares APKs, App Bundles and IPAs, not web builds{Color.RESET}")
+            return 1
+        # Only reads archives: no devices involved
+        return size_report(args, platform_choice, make_finder(args))
+
+    if args.prefetch:
+        if args.offline or args.local or args.prefetch_jobs < 1:
+            print(f"{Color.RED}--prefetch downloads from GitHub: it cannot be combined with --offline "
+                  f"or --local, and needs --prefetch-jobs of 1 or more{Color.RESET}")
+            return 1
+        return prefetch(args, make_finder(args))
+
+    if platform_choice == Platform.WEB and (args.watch or args.hotplug or args.all_devices or args.devices):
+        print(f"{Color.RED}Web builds are served locally: --watch, --hotplug, --all-devices "
+              f"and --devices do not apply{Color.RESET}")
+        return 1
+
+    if args.serve:
+        if platform_choice != Platform.WEB:
+            print(f"{Color.RED}--serve is for web builds: add --platform web{Color.RESET}")
+            return 1
+        return serve_builds(args, make_finder(args))
+
+    if args.daemon:
+        return serve_daemon(args)
+
+    # A running daemon owns the devices; modes that stay attached to them work locally
+    local_only = (args.no_daemon or args.watch or args.hotplug or args.bench_startup is not None or args.capture
+                  or platform_choice == Platform.WEB)
+    daemon = None if local_only else DaemonClient.find(args.daemon_url)
+    if daemon:
+        print(f"{Color.CYAN}Using the deploy daemon at {args.daemon_url}{Color.RESET}")
+    elif platform_choice == Platform.ANDROID:
         ok, msg = DependencyChecker.check_adb()
         if not ok:
             print(msg)
             return 1
-    else:
+    elif platform_choice == Platform.IOS:
         ok, msg = DependencyChecker.check_ios_deploy()
         if not ok:
             print(msg)
             return 1
 
-    # Find repository root
-    repo_root = Path(__file__).parent.parent
-    finder = BuildFinder(repo_root)
+    if args.watch and (args.run_id or args.offline or args.hotplug):
+        print(f"{Color.RED}--watch cannot be combined with --run-id, --offline or --hotplug{Color.RESET}")
+        return 1
+
+    if args.fast and platform_choice != Platform.ANDROID:
+        print(f"{Color.RED}--fast is only supported for Android{Color.RESET}")
+        return 1
+
+    if (args.capture or args.perfetto) and (platform_choice != Platform.ANDROID or args.hotplug
+                                            or not args.capture or args.capture_seconds < 1):
+        print(f"{Color.RED}--capture works for Android without --hotplug, needs a positive "
+              f"--capture-seconds, and is required by --perfetto{Color.RESET}")
+        return 1
+
+    if args.bench_startup is not None:
+        if platform_choice != Platform.ANDROID or args.hotplug or args.bench_startup < 1:
+            print(f"{Color.RED}--bench-startup needs a launch count of 1 or more, "
+                  f"and works for Android without --hotplug{Color.RESET}")
+            return 1
+
+    finder = make_finder(args)
+    api = finder.api
+
+    # Start the slow parts right away: device probing and GitHub discovery
+    # run in the background while local builds are scanned
+    device_probe = run_in_background(daemon.probe_devices if daemon else probe_devices, platform_choice)
+
+    def accept(build: Build) -> bool:
+        # Match a run number first (shorter), then fall back to the run ID
+        if args.run_id and not ((build.run_number and str(build.run_number) == args.run_id)
+                                or build.run_id == args.run_id):
+            return False
+        if (args.github or args.run_id) and args.build_type and build.build_type != args.build_type:
+            return False
+        return True
+
+    run_filter = RunFilter(branch=args.branch, event=args.event, since=args.since, until=args.until)
+    use_github = not args.local and (args.github or args.run_id or args.offline or not needs_gh
+                                     or DependencyChecker.check_command("gh"))
+    github_feed = None
+    if use_github and not args.watch:
+        github_feed = BuildFeed(finder.iter_github_builds(platform_choice, run_filter, args.depth), accept)
 
     # Find available builds
     builds = []
 
-    if args.local:
-        # Only local builds
-        if platform_choice == Platform.ANDROID:
-            builds = finder.find_local_android_builds()
-        else:
-            builds = finder.find_local_ios_builds()
-    elif args.github or args.run_id:
-        # Only GitHub builds
-        builds = finder.find_github_builds(platform_choice)
+    if not args.watch and (args.local or not (args.github or args.run_id)):
+        builds.extend(finder.find_local_builds(platform_choice))
+
+    # Report missing devices before anyone spends time choosing a build
+    ok, msg, connected = device_probe.result()
+    if not ok and not args.hotplug:
+        print(f"\n{msg}")
+        return 1
+
+    print(f"{Color.GREEN}{msg}{Color.RESET}" if ok else f"\n{msg}")
+
+    # In hotplug mode the device tracker picks the targets as they appear
+    serials, error = (None, "") if args.hotplug else resolve_target_devices(platform_choice, connected, args)
+    if error:
+        print(f"\n{error}")
+        return 1
 
-        # Filter by run ID or run number if specified
+    if args.watch:
+        return watch(args, platform_choice, finder, accept, run_filter, use_github)
+
+    if github_feed:
         if args.run_id:
-            # Try to match as run number first (shorter), then fall back to run ID
-            builds = [b for b in builds if
-                     (b.run_number and str(b.run_number) == args.run_id) or
-                     b.run_id == args.run_id]
-
-        # Filter by build type if specified
-        if args.build_type:
-            builds = [b for b in builds if b.build_type == args.build_type]
-    else:
-        # All builds
-        if platform_choice == Platform.ANDROID:
-            builds.extend(finder.find_local_android_builds())
+            # The requested run may be on any page
+            builds.extend(github_feed.wait_all())
         else:
-            builds.extend(finder.find_local_ios_builds())
-
-        # Only try GitHub if gh is available
-        if DependencyChecker.check_command("gh"):
-            builds.extend(finder.find_github_builds(platform_choice))
+            # Show the newest page right away; older pages keep loading
+            builds.extend(github_feed.wait_first())
 
     # Sort builds by date (newest first)
     builds.sort(key=lambda b: b.date or datetime.min, reverse=True)
@@ -802,7 +5408,8 @@ Examples:
         return 1
 
     # Auto-select if only one build or specific run/build-type given
-    auto_select = len(builds) == 1 or (args.run_id and args.build_type)
+    auto_select = ((len(builds) == 1 and (github_feed is None or github_feed.done))
+                   or (args.run_id and args.build_type))
 
     if auto_select:
         selected_build = builds[0]
@@ -810,43 +5417,41 @@ Examples:
         print(f"{selected_build}\n")
     else:
         # Show interactive menu
-        selected_build = show_menu(builds)
+        selected_build = show_menu(builds, github_feed)
         if not selected_build:
             print("Cancelled")
             return 0
 
-    # Check for connected devices
-    if selected_build.platform == Platform.ANDROID:
-        ok, msg = Deployer.check_android_devices()
-    else:
-        ok, msg = Deployer.check_ios_devices()
-
-    if not ok:
-        print(f"\n{msg}")
-        return 1
-
-    print(f"{Color.GREEN}{msg}{Color.RESET}")
+    def deliver(build_file: InstallSource) -> bool:
+        if selected_build.platform == Platform.WEB:
+            return serve_web([(selected_build, build_file)], args)
+        if args.hotplug:
+            return hotplug(build_file, selected_build.platform, args)
+        return install_build(build_file, selected_build.platform, args, serials)
 
     # Deploy
-    if selected_build.source == BuildSource.LOCAL:
+    if daemon:
+        # The daemon downloads (once for all jobs needing it) and installs
+        success = daemon.deploy(selected_build, platform_choice, serials, args)
+    elif selected_build.source == BuildSource.LOCAL:
         # Deploy local build
-        if selected_build.platform == Platform.ANDROID:
-            success = Deployer.deploy_android(selected_build.path, clean_install=args.clean_install)
-        else:
-            success = Deployer.deploy_ios(selected_build.path, clean_install=args.clean_install)
+        success = deliver(selected_build.install_source())
     else:
         # Download and deploy GitHub build
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
-            build_file = Deployer.download_github_artifact(selected_build, temp_path)
+            store = ArtifactStore(user_cache_dir() / "artifacts", args.artifact_cache_size, api)
+            build_file = Deployer.download_github_artifact(selected_build, temp_path, store)
 
             if not build_file:
                 return 1
 
-            if selected_build.platform == Platform.ANDROID:
-                success = Deployer.deploy_android(build_file, clean_install=args.clean_install)
-            else:
-                success = Deployer.deploy_ios(build_file, clean_install=args.clean_install)
+            success = deliver(build_file)
+
+    if success and args.bench_startup:
+        success = bench_startup(selected_build, serials or connected, args.bench_startup)
+    if success and args.capture:
+        success = capture(selected_build, serials or connected, args.capture_seconds, args.perfetto)
 
     return 0 if success else 1
 